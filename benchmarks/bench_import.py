@@ -0,0 +1,69 @@
+"""
+Bank statement import throughput (rows/sec) by number of parser processes,
+next to the row-at-a-time TransactionManager.create() path.
+
+    python -m benchmarks.bench_import [--rows 300000] [--workers 1,2,4,8]
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import storage.bank_import as bank_import
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from models.transaction import Transaction
+from storage.bank_import import ImportSpec, import_statement
+from benchmarks.synthetic import make_accounts, make_transactions
+
+
+def _managers():
+    am, tm = AccountManager(), TransactionManager()
+    for a in make_accounts(100):
+        am.create(a)
+    return am, tm
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({w for w in (1, 2, 4, 8) if w <= cpus} | {cpus})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "statement.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Account", "Booking date", "Amount", "Memo"])
+            for t in make_transactions(args.rows):
+                signed = t.amount if t.category == "income" else -t.amount
+                writer.writerow([t.account_id, t.date, f"{signed:.2f}", t.description])
+        spec = ImportSpec({"account_id": "Account", "date": "Booking date", "amount": "Amount",
+                           "description": "Memo"}, id_prefix="S")
+        print(f"{args.rows} rows, {os.path.getsize(path) / 1e6:.1f} MB, {cpus} CPU(s)")
+
+        am, tm = _managers()
+        start = time.perf_counter()
+        with open(path, newline="", encoding="utf-8") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                amount = float(row["Amount"])
+                category = "expense" if amount < 0 else "income"
+                tm.create(Transaction(f"S{i + 2}", row["Account"], row["Booking date"], abs(amount),
+                                      category, row["Memo"]))
+                am.adjust_balance(row["Account"], -abs(amount) if amount < 0 else amount)
+        elapsed = time.perf_counter() - start
+        print(f"{'row-at-a-time create':24s} {args.rows / elapsed:12,.0f} rows/s")
+
+        bank_import.MIN_PARALLEL_BYTES = 0
+        for workers in (int(w) for w in args.workers.split(",")):
+            am, tm = _managers()
+            result = import_statement(path, tm, am, spec, workers=workers)
+            assert result.imported == args.rows, result
+            print(f"{f'import, {workers} worker(s)':24s} {result.rows_per_sec:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Loading and saving the three CSV datasets one after another vs. through the
+storage coordinator's thread pool.
+
+    python -m benchmarks.bench_load_save [--rows 200000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+from storage.coordinator import run_concurrently
+from benchmarks.synthetic import make_accounts, make_transactions, make_budgets
+
+
+def _best(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="transactions; accounts and budgets get rows/20")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        paths = {name: os.path.join(d, name + ".csv") for name in ("accounts", "transactions", "budgets")}
+        managers = {"accounts": AccountManager(), "transactions": TransactionManager(), "budgets": BudgetManager()}
+        for a in make_accounts(max(args.rows // 20, 1)):
+            managers["accounts"].create(a)
+        for t in make_transactions(args.rows):
+            managers["transactions"].create(t)
+        for b in make_budgets(max(args.rows // 20, 1)):
+            managers["budgets"].create(b)
+
+        def save_jobs():
+            return {name: (lambda m=m, p=paths[name]: m.save(p, force=True)) for name, m in managers.items()}
+
+        def load_jobs():
+            return {name: (lambda m=m, p=paths[name]: m.load(p)) for name, m in managers.items()}
+
+        print(f"{args.rows} transactions, {args.rows // 20} accounts and budgets")
+        for label, jobs in (("save", save_jobs), ("load", load_jobs)):
+            singles = {name: _best(job) for name, job in jobs().items()}
+            serial = _best(lambda: [job() for job in jobs().values()])
+            concurrent = _best(lambda: run_concurrently(jobs()))
+            print(f"{label}: slowest file {max(singles.values()):.3f} s, "
+                  f"one after another {serial:.3f} s, coordinator {concurrent:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
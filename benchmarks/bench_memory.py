@@ -0,0 +1,70 @@
+"""
+Heap bytes per loaded transaction: the previous dict-backed model vs. the
+slotted model with interned strings and ordinal dates.
+
+    python -m benchmarks.bench_memory [--rows 1000000]
+"""
+import argparse
+import csv
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from managers.transaction_manager import TRANSACTION_FIELDS
+from models.transaction import Transaction
+from benchmarks.synthetic import make_transactions
+
+
+class LegacyTransaction:
+    """The model as it was before __slots__: a __dict__ and own copies of every string."""
+
+    def __init__(self, id, account_id, date, amount, category, description):
+        self.id = id
+        self.account_id = account_id
+        self.date = date
+        self.amount = amount
+        self.category = category
+        self.description = description
+
+
+def _legacy_from_row(row):
+    return LegacyTransaction(row["id"], row["account_id"], row["date"], float(row["amount"]),
+                             row["category"], row["description"])
+
+
+def _measure(path, build):
+    gc.collect()
+    tracemalloc.start()
+    with open(path, newline="", encoding="utf-8") as f:
+        ledger = [build(row) for row in csv.DictReader(f)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(ledger)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "transactions.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=TRANSACTION_FIELDS)
+            writer.writeheader()
+            for start in range(0, args.rows, 100000):
+                for i, t in enumerate(make_transactions(min(100000, args.rows - start), seed=start)):
+                    t.id = f"T{start + i}"
+                    writer.writerow(t.to_dict())
+
+        before = _measure(path, _legacy_from_row)
+        after = _measure(path, lambda row: Transaction.from_row(row, trusted=True))
+        print(f"{args.rows} transactions, bytes per row held on the heap")
+        print(f"{'dict-backed model':20s} {before:8.1f}")
+        print(f"{'slotted + interned':20s} {after:8.1f}  ({after / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Cold-start load time: CSV files vs. the binary snapshot.
+
+    python -m benchmarks.bench_snapshot [--rows 200000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from managers.account_manager import AccountManager, ACCOUNT_FIELDS
+from managers.transaction_manager import TransactionManager, TRANSACTION_FIELDS
+from managers.budget_manager import BudgetManager, BUDGET_FIELDS
+from storage.snapshot import open_snapshot, write_snapshot
+from benchmarks.synthetic import make_accounts, make_transactions, make_budgets
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        sources = {name: os.path.join(d, name + ".csv") for name in ("accounts", "transactions", "budgets")}
+        am, tm, bm = AccountManager(), TransactionManager(), BudgetManager()
+        for a in make_accounts(100):
+            am.create(a)
+        for t in make_transactions(args.rows):
+            tm.create(t)
+        for b in make_budgets(500):
+            bm.create(b)
+        am.save(sources["accounts"])
+        tm.save(sources["transactions"])
+        bm.save(sources["budgets"])
+        snap_path = os.path.join(d, "snapshot.bin")
+        write_snapshot(snap_path, {
+            "accounts": (ACCOUNT_FIELDS, (a.to_dict() for a in am.list_all())),
+            "transactions": (TRANSACTION_FIELDS, (t.to_dict() for t in tm.list_all())),
+            "budgets": (BUDGET_FIELDS, (b.to_dict() for b in bm.list_all())),
+        }, sources)
+
+        def load_csv(trusted):
+            AccountManager().load(sources["accounts"], trusted)
+            TransactionManager().load(sources["transactions"], trusted)
+            BudgetManager().load(sources["budgets"], trusted)
+
+        def load_snapshot():
+            snap = open_snapshot(snap_path, sources)
+            assert snap is not None
+            AccountManager().load_from(snap, trusted=True)
+            TransactionManager().load_from(snap, trusted=True)
+            BudgetManager().load_from(snap, trusted=True)
+
+        csv_bytes = sum(os.path.getsize(p) for p in sources.values())
+        print(f"{args.rows} transactions, CSV {csv_bytes / 1e6:.1f} MB, snapshot {os.path.getsize(snap_path) / 1e6:.1f} MB")
+        for label, fn in (("csv (validated)", lambda: load_csv(False)),
+                          ("csv (trusted)", lambda: load_csv(True)),
+                          ("snapshot", load_snapshot)):
+            best = min(_timed(fn) for _ in range(3))
+            print(f"{label:16s} {best:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
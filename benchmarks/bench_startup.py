@@ -0,0 +1,91 @@
+"""
+Start-up cost of the scripted subcommands: wall time per invocation and the
+total module import time reported by ``python -X importtime``, next to the
+import cost of the interactive menu (which needs rich).
+
+    python -m benchmarks.bench_startup [--rows 10000] [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+from benchmarks.synthetic import make_accounts, make_transactions, make_budgets
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+
+def _import_stats(stderr: str):
+    """Total import microseconds (top-level modules only) and the set of top-level packages imported."""
+    total = 0
+    packages = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        packages.add(name.strip().split(".")[0])
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total, packages
+
+
+def _run(args):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=ROOT,
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise SystemExit(f"{' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+    return elapsed, _import_stats(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as d:
+        am, tm, bm = AccountManager(), TransactionManager(), BudgetManager()
+        for a in make_accounts(100):
+            am.create(a)
+        for t in make_transactions(args.rows):
+            tm.create(t)
+        for b in make_budgets(200):
+            bm.create(b)
+        am.save(os.path.join(d, "accounts.csv"))
+        tm.save(os.path.join(d, "transactions.csv"))
+        bm.save(os.path.join(d, "budgets.csv"))
+
+        base = [MAIN, "--plain", "--data-dir", d]
+        commands = [
+            ("interactive (import)", lambda i: ["-c", "import main; main._load_rich()"]),
+            ("account list", lambda i: base + ["account", "list"]),
+            ("budget list", lambda i: base + ["budget", "list"]),
+            ("tx list --account", lambda i: base + ["tx", "list", "--account", "A1"]),
+            ("tx add", lambda i: base + ["tx", "add", f"BENCH{i}", "--account", "A1", "--date", "2025-01-01",
+                                          "--amount", "1", "--category", "expense"]),
+            ("summary", lambda i: base + ["summary"]),
+            ("export transactions", lambda i: base + ["export", "transactions", "-o", os.path.join(d, "out.csv")]),
+        ]
+        print(f"{args.rows} transactions, best of {args.repeat}")
+        print(f"{'command':22s} {'wall ms':>8s} {'import ms':>10s}  rich  numpy")
+        for label, argv in commands:
+            runs = [_run(argv(i)) for i in range(args.repeat)]
+            wall = min(r[0] for r in runs)
+            imports = min(r[1][0] for r in runs)
+            packages = runs[0][1][1]
+            print(f"{label:22s} {wall * 1000:8.1f} {imports / 1000:10.1f}  "
+                  f"{'yes' if 'rich' in packages else 'no':4s}  {'yes' if 'numpy' in packages else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
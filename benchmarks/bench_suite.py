@@ -0,0 +1,192 @@
+"""
+Scale benchmarks for every manager on deterministic synthetic data:
+create, get, list, delete, save and load, plus the balance summary.
+
+    python -m benchmarks.bench_suite [--sizes 10000,100000,1000000] [--output results.json]
+                                     [--baseline benchmarks/baseline.json] [--threshold 0.25]
+
+Each size is the transaction count; accounts and budgets get size/20 rows,
+as in the other benchmarks. get and delete time a seeded random sample of
+ids; create, list, save, load and the summary report the best of
+--repeat runs.
+Per-item operations stop at --op-timeout seconds and are reported as
+timed out, so a quadratic path shows up instead of stalling the run.
+
+Results are written as JSON keyed "<dataset>.<operation>@<size>". With a
+baseline (a previous --output), every timing more than --threshold slower
+per operation is reported as a regression and the exit status is 1.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Sequence
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+from benchmarks.synthetic import make_accounts, make_transactions, make_budgets
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+SAMPLE = 10000
+CHUNK = 500
+# timings below this are mostly timer noise and never count as regressions
+NOISE_FLOOR = 0.005
+
+
+def _timed(fn) -> float:
+    # like timeit: a collection landing inside one run would swamp it
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def _per_item(fn: Callable, items: Sequence, timeout: float) -> Dict:
+    """Apply fn to each item in chunks, giving up once timeout seconds have passed."""
+    elapsed = 0.0
+    done = 0
+    while done < len(items):
+        chunk = items[done:done + CHUNK]
+        elapsed += _timed(lambda: [fn(item) for item in chunk])
+        done += len(chunk)
+        if elapsed > timeout and done < len(items):
+            return {"seconds": elapsed, "ops": done, "timed_out": True}
+    return {"seconds": elapsed, "ops": done}
+
+
+def _best(fn, repeat: int) -> Dict:
+    return {"seconds": min(_timed(fn) for _ in range(repeat)), "ops": 1}
+
+
+def _summary(am, tm, bm, repeat: int) -> Dict:
+    import main
+    main._load_rich()
+    from rich.console import Console
+    quiet = Console(file=io.StringIO(), width=120)
+    real, main.console = main.console, quiet
+    try:
+        return _best(lambda: main.show_balance_summary(am, tm, bm), repeat)
+    finally:
+        main.console = real
+
+
+def run_suite(sizes: List[int], seed: int = 0, timeout: float = 30.0, repeat: int = 3, log=None) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    for size in sizes:
+        small = max(size // 20, 1)
+        datasets = {
+            "accounts": (AccountManager, make_accounts(small, seed=seed)),
+            "transactions": (TransactionManager, make_transactions(size, n_accounts=small, seed=seed)),
+            "budgets": (BudgetManager, make_budgets(small, seed=seed)),
+        }
+        managers = {}
+        samples = {}
+        with tempfile.TemporaryDirectory() as d:
+            for name, (factory, items) in datasets.items():
+                created = None
+                for _ in range(repeat):
+                    fresh = factory()
+                    run = _per_item(fresh.create, items, timeout)
+                    if created is None or run["seconds"] / run["ops"] < created["seconds"] / created["ops"]:
+                        created, m = run, fresh
+                    if run.get("timed_out"):
+                        break
+                managers[name] = m
+                # after a timeout only the first rows exist; sample from those
+                ids = [x.id for x in items[:created["ops"]]]
+                samples[name] = random.Random(seed).sample(ids, min(SAMPLE, len(ids)))
+                path = os.path.join(d, name + ".csv")
+                fresh = factory()
+                results[f"{name}.create@{size}"] = created
+                results[f"{name}.get@{size}"] = _per_item(m.get, samples[name], timeout)
+                results[f"{name}.list@{size}"] = _best(m.list_all, repeat)
+                results[f"{name}.save@{size}"] = _best(lambda: m.save(path, force=True), repeat)
+                results[f"{name}.load@{size}"] = _best(lambda: fresh.load(path), repeat)
+            results[f"summary.show_balance_summary@{size}"] = _summary(
+                managers["accounts"], managers["transactions"], managers["budgets"], repeat)
+            for name, m in managers.items():
+                results[f"{name}.delete@{size}"] = _per_item(m.delete, samples[name][:SAMPLE // 10], timeout)
+        if log:
+            for key, r in results.items():
+                if key.endswith(f"@{size}"):
+                    log(_line(key, r))
+    return results
+
+
+def _line(key: str, r: Dict) -> str:
+    per_op = r["seconds"] / r["ops"] * 1e6 if r["ops"] else 0.0
+    note = "  TIMED OUT" if r.get("timed_out") else ""
+    return f"{key:42} {r['seconds']:10.4f} s {r['ops']:8} ops {per_op:12.2f} us/op{note}"
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Keys whose time per operation grew by more than threshold over the baseline."""
+    regressions = []
+    for key, r in results.items():
+        base = baseline.get(key)
+        if base is None or not r["ops"] or not base["ops"]:
+            continue
+        now, then = r["seconds"] / r["ops"], base["seconds"] / base["ops"]
+        if r.get("timed_out") and not base.get("timed_out"):
+            regressions.append(f"{key}: timed out after {r['ops']} ops")
+        elif r["seconds"] >= NOISE_FLOOR and now > then * (1 + threshold):
+            regressions.append(f"{key}: {now * 1e6:.2f} us/op vs {then * 1e6:.2f} baseline "
+                               f"(+{(now / then - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated transaction counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--op-timeout", type=float, default=30.0,
+                        help="seconds before a per-item operation is cut short")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per whole-dataset operation")
+    parser.add_argument("--output", "-o", help="write the results as JSON")
+    parser.add_argument("--baseline", help=f"results to compare against (default: {BASELINE} if present)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown per operation before flagging, as a fraction")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    # read before running: --output may overwrite the baseline itself
+    baseline_path = args.baseline or (BASELINE if os.path.exists(BASELINE) else None)
+    baseline = None
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = run_suite(sizes, seed=args.seed, timeout=args.op_timeout, repeat=args.repeat, log=print)
+    if args.output:
+        report = {
+            "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                     "cpus": os.cpu_count(), "sizes": sizes, "seed": args.seed,
+                     "created": time.strftime("%Y-%m-%dT%H:%M:%S")},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print("REGRESSION " + line)
+        if regressions:
+            return 1
+        print(f"No regressions against {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Deterministic synthetic ledgers for the benchmarks."""
+import random
+from datetime import date, timedelta
+
+from models.account import CashAccount, BankAccount
+from models.transaction import Transaction
+from models.budget import Budget
+
+CURRENCIES = ("HUF", "EUR", "USD")
+DESCRIPTIONS = ("Grocery", "Rent", "Salary", "Internet", "Transport", "Coffee", "Refund", "Utilities")
+START = date(2020, 1, 1)
+
+
+def make_accounts(n, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        cls = CashAccount if i % 2 == 0 else BankAccount
+        name = "Account " + "".join(rng.choice("abcdefgh") for _ in range(5))
+        out.append(cls(f"A{i}", name, CURRENCIES[i % len(CURRENCIES)], float(rng.randint(0, 100000))))
+    return out
+
+
+def make_transactions(n, n_accounts=100, seed=0, days=6 * 365):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        d = (START + timedelta(days=rng.randrange(days))).isoformat()
+        category = "income" if rng.random() < 0.2 else "expense"
+        out.append(Transaction(
+            f"T{i}", f"A{rng.randrange(n_accounts)}", d,
+            float(rng.randint(1, 500000)), category, rng.choice(DESCRIPTIONS),
+        ))
+    return out
+
+
+def make_budgets(n, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        month = f"{2020 + rng.randrange(6)}-{rng.randrange(1, 13):02d}"
+        out.append(Budget(f"B{i}", month, rng.choice(DESCRIPTIONS), float(rng.randint(1000, 100000))))
+    return out
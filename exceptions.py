@@ -9,3 +9,20 @@ class NotFoundError(FinanceError):
 
 class StorageError(FinanceError):
     pass
+
+class ConsistencyError(FinanceError):
+    pass
+
+class ConflictError(FinanceError):
+    """Another process changed the data first; datasets names what changed."""
+
+    def __init__(self, message, datasets=()):
+        self.datasets = tuple(datasets)
+        super().__init__(message)
+
+class StorageErrors(StorageError):
+    """Several storage jobs failed; errors maps each job's name to its exception."""
+
+    def __init__(self, errors):
+        self.errors = dict(errors)
+        super().__init__("; ".join(f"{name}: {e}" for name, e in self.errors.items()))
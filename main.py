@@ -1,22 +1,32 @@
 # main.py (updated)
+import argparse
+import csv
+import json
 import os
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.prompt import Prompt
-
-from managers.account_manager import AccountManager
-from managers.transaction_manager import TransactionManager
-from managers.budget_manager import BudgetManager
+import sys
+
+from managers.account_manager import AccountManager, ACCOUNT_FIELDS
+from managers.transaction_manager import TransactionManager, TRANSACTION_FIELDS
+from managers.budget_manager import BudgetManager, BUDGET_FIELDS
+from managers.ledger_totals import LedgerTotals
+from managers.budget_rollups import MonthlyRollups
+from managers.currency import CurrencyConverter
+from managers.balance_history import BalanceHistory
+from managers.reconcile import LedgerOverlay, fix, reconcile, reconcile_manager, without_duplicates
+from storage.journal import Journal
+from storage.csv_storage import SaveStats, iter_dicts_from_csv, write_csv_atomic
+from storage.snapshot import open_snapshot, write_snapshot
+from storage.coordinator import run_concurrently
 from models.account import Account, CashAccount, BankAccount
 from models.transaction import Transaction
 from models.budget import Budget
 
 from validators import (
     validate_name, validate_currency, validate_positive_int,
-    validate_date_ymd, validate_month_yyyy_mm, validate_category_choice
+    validate_date_ymd, validate_month_yyyy_mm, validate_category_choice,
+    ordinal_ymd, parse_date_ymd, ymd_ordinal
 )
-from exceptions import ValidationError
+from exceptions import ConflictError, FinanceError, NotFoundError, ValidationError
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(ROOT, "data")
@@ -25,8 +35,43 @@ os.makedirs(DATA_DIR, exist_ok=True)
 ACC_CSV = os.path.join(DATA_DIR, "accounts.csv")
 TX_CSV = os.path.join(DATA_DIR, "transactions.csv")
 BUD_CSV = os.path.join(DATA_DIR, "budgets.csv")
+JOURNAL = os.path.join(DATA_DIR, "journal.jsonl")
+SNAPSHOT = os.path.join(DATA_DIR, "snapshot.bin")
+RATES_CSV = os.path.join(DATA_DIR, "rates.csv")
+
+# lock-free reads retried while other processes commit, before waiting on the lock
+READ_RETRIES = 5
+
+# ledgers longer than this are listed a page at a time in the menu
+PAGE_SIZE = 50
+
+# rich is imported on first render (see _load_rich); scripted commands with
+# plain output never import it
+console = None
+Table = Panel = Prompt = None
+
+
+def _load_rich():
+    global console, Table, Panel, Prompt
+    if console is None:
+        from rich.console import Console
+        from rich.table import Table
+        from rich.panel import Panel
+        from rich.prompt import Prompt
+        console = Console()
+
+
+def set_data_dir(path: str):
+    """Point every data file at path instead of the data/ folder next to main.py."""
+    global DATA_DIR, ACC_CSV, TX_CSV, BUD_CSV, JOURNAL, SNAPSHOT, RATES_CSV
+    DATA_DIR = path
+    ACC_CSV = os.path.join(path, "accounts.csv")
+    TX_CSV = os.path.join(path, "transactions.csv")
+    BUD_CSV = os.path.join(path, "budgets.csv")
+    JOURNAL = os.path.join(path, "journal.jsonl")
+    SNAPSHOT = os.path.join(path, "snapshot.bin")
+    RATES_CSV = os.path.join(path, "rates.csv")
 
-console = Console()
 
 def main_menu():
     table = Table(expand=True, show_header=False, box=None)
@@ -38,9 +83,11 @@ def main_menu():
     inner.add_row("2", "Manage Transactions")
     inner.add_row("3", "Manage Budgets")
     inner.add_row("4", "Check Balance Summary")
-    inner.add_row("5", "Save to CSV")
-    inner.add_row("6", "Load from CSV")
+    inner.add_row("5", "Save changes")
+    inner.add_row("6", "Reload saved data")
     inner.add_row("7", "Exit")
+    inner.add_row("8", "Compact journal into CSV")
+    inner.add_row("9", "Budget status")
     table.add_row(inner)
     console.print(Panel(table, title="[bold cyan]Personal Finance Manager[/bold cyan]", title_align="center", border_style="cyan"))
 
@@ -81,7 +128,43 @@ def budgets_menu():
     console.print(table)
 
 
+def _account_rows(am: AccountManager):
+    for a in am.list_all():
+        yield a.id, a.name, a.account_type, f"{a.balance:.2f} {a.currency}", a.currency, a.__class__.__name__
+
+
+def _transaction_rows(txs, am: AccountManager):
+    currencies = am.currency_map()
+    for tx in txs:
+        cur = currencies.get(tx.account_id, "")
+        yield tx.id, tx.account_id, tx.date, f"{tx.amount:.2f} {cur}", tx.category, tx.description
+
+
+def _budget_rows(bm: BudgetManager, am: AccountManager):
+    first = am.first()
+    default_cur = first.currency if first else "N/A"
+    for b in bm.list_all():
+        yield b.id, b.month, b.category, f"{b.limit_amount:.2f} {default_cur}"
+
+
+def _summary_rows(snapshot):
+    currency_totals = snapshot["balance"]
+    income_totals = snapshot["income"]
+    expense_totals = snapshot["expense"]
+    budget_totals = snapshot["budget"]
+    all_curr = set(currency_totals.keys()) | set(income_totals.keys()) | set(expense_totals.keys()) | set(budget_totals.keys())
+    for cur in all_curr:
+        yield (
+            cur,
+            f"{budget_totals.get(cur, 0):.2f} {cur}",
+            f"{income_totals.get(cur, 0):.2f} {cur}",
+            f"{expense_totals.get(cur, 0):.2f} {cur}",
+            f"{currency_totals.get(cur, 0):.2f} {cur}",
+        )
+
+
 def print_accounts(am: AccountManager):
+    _load_rich()
     table = Table(title="[bold green]Accounts[/bold green]", title_justify="center")
     table.add_column("ID", style="cyan", justify="center")
     table.add_column("Name", style="white")
@@ -89,77 +172,340 @@ def print_accounts(am: AccountManager):
     table.add_column("Balance", style="green", justify="right")
     table.add_column("Currency", style="white", justify="center")
     table.add_column("Class", style="magenta", justify="center")
-    for a in am.list_all():
-        table.add_row(a.id, a.name, a.account_type, f"{a.balance:.2f} {a.currency}", a.currency, a.__class__.__name__)
+    for row in _account_rows(am):
+        table.add_row(*row)
     console.print(table)
 
 
-def print_transactions(tm: TransactionManager, am: AccountManager):
-    table = Table(title="[bold magenta]Transactions[/bold magenta]", title_justify="center")
+def print_transactions(tm: TransactionManager, am: AccountManager, txs=None, caption=None):
+    """Render txs (default: the whole ledger in insertion order)."""
+    _load_rich()
+    table = Table(title="[bold magenta]Transactions[/bold magenta]", title_justify="center", caption=caption)
     table.add_column("ID", justify="center")
     table.add_column("Account", justify="center")
     table.add_column("Date", justify="center")
     table.add_column("Amount", justify="right")
     table.add_column("Category", justify="center")
     table.add_column("Description", justify="left")
-    for tx in tm.list_all():
-        acc = am.get_by_id(tx.account_id)
-        cur = acc.currency if acc else ""
-        table.add_row(tx.id, tx.account_id, tx.date, f"{tx.amount:.2f} {cur}", tx.category, tx.description)
+    for row in _transaction_rows(tm.list_all() if txs is None else txs, am):
+        table.add_row(*row)
     console.print(table)
 
 
+def _consolidated_row(totals: LedgerTotals, rates: CurrencyConverter, currency: str):
+    # raises NotFoundError when a currency in use has no exchange rate
+    c = totals.consolidated(rates, currency)
+    return (f"All in {currency}", f"{c['budget']:.2f} {currency}", f"{c['income']:.2f} {currency}",
+            f"{c['expense']:.2f} {currency}", f"{c['balance']:.2f} {currency}")
+
+
+def _budget_status_rows(statuses):
+    for st in statuses:
+        cur = st.currency
+        other = ", ".join(f"{v:.2f} {c}" for c, v in sorted(st.other_spending.items()))
+        row = (st.budget.id, st.budget.category, f"{st.budget.limit_amount:.2f} {cur}", f"{st.spent:.2f} {cur}",
+               f"{st.remaining:.2f} {cur}", f"{st.percent_used:.1f}%", other)
+        if st.total_spent is not None:
+            row += (f"{st.total_spent:.2f} {cur}",)
+        yield row
+
+
+def print_budget_status(month: str, statuses):
+    _load_rich()
+    table = Table(title=f"[bold blue]Budget status {month}[/bold blue]", title_justify="center")
+    table.add_column("ID", justify="center")
+    table.add_column("Category")
+    table.add_column("Limit", justify="right")
+    table.add_column("Spent", justify="right")
+    table.add_column("Remaining", justify="right")
+    table.add_column("Used", justify="right")
+    table.add_column("Other currencies", justify="right")
+    if statuses and statuses[0].total_spent is not None:
+        table.add_column("Total spent", justify="right")
+    for st, row in zip(statuses, _budget_status_rows(statuses)):
+        style = "red" if st.remaining < 0 else ("yellow" if st.percent_used >= 80 else None)
+        table.add_row(*row, style=style)
+    console.print(table)
+
+
+def browse_transactions(tm: TransactionManager, am: AccountManager, page_size: int = PAGE_SIZE):
+    """
+    Page through the ledger in (date, id) order. Only the page on screen is
+    fetched and rendered, so each step costs the same however big the
+    ledger is. Pages are keyed by their first/last (date, id), so edits
+    elsewhere in the ledger do not shift what "next" and "prev" show.
+    """
+    _load_rich()
+    txs = tm.page_after(None, page_size)
+    while True:
+        total = len(tm)
+        if txs:
+            first = tm.position((txs[0].date, txs[0].id))
+            pages = (total + page_size - 1) // page_size
+            caption = (f"rows {first + 1}-{first + len(txs)} of {total}, "
+                       f"page {first // page_size + 1} of {pages}")
+        else:
+            caption = f"no rows here ({total} in total)"
+        print_transactions(tm, am, txs, caption=caption)
+        action = Prompt.ask("[n]ext, [p]rev, [j]ump to page or date, [q]uit",
+                            choices=["n", "p", "j", "q"], default="n")
+        if action == "q":
+            return
+        if action == "n":
+            nxt = tm.page_after((txs[-1].date, txs[-1].id), page_size) if txs else []
+            if nxt:
+                txs = nxt
+            else:
+                console.print("[yellow]Already on the last page.[/yellow]")
+        elif action == "p":
+            prev = tm.page_before((txs[0].date, txs[0].id), page_size) if txs else tm.page_after(None, page_size)
+            if prev:
+                txs = prev
+            else:
+                console.print("[yellow]Already on the first page.[/yellow]")
+        else:
+            target = Prompt.ask("Page number or date (YYYY-MM-DD)").strip()
+            if target.isdigit() and int(target) >= 1:
+                txs = tm.page((int(target) - 1) * page_size, page_size)
+            else:
+                try:
+                    # ("date", "") sorts before every id on that date
+                    txs = tm.page_after((validate_date_ymd(target, "Date"), ""), page_size)
+                except ValidationError as e:
+                    console.print(f"[red]{e}[/red]")
+
+
 def print_budgets(bm: BudgetManager, am: AccountManager):
+    _load_rich()
     table = Table(title="[bold blue]Budgets[/bold blue]", title_justify="center")
     table.add_column("ID", justify="center")
     table.add_column("Month", justify="center")
     table.add_column("Category")
     table.add_column("Limit", justify="right")
-    default_cur = next((a.currency for a in am.list_all()), "N/A")
-    for b in bm.list_all():
-        table.add_row(b.id, b.month, b.category, f"{b.limit_amount:.2f} {default_cur}")
+    for row in _budget_rows(bm, am):
+        table.add_row(*row)
     console.print(table)
 
 
-def show_balance_summary(am: AccountManager, tm: TransactionManager, bm: BudgetManager):
-    currency_totals = {}
-    for acc in am.list_all():
-        currency_totals.setdefault(acc.currency, 0)
-        currency_totals[acc.currency] += acc.balance
-    income_totals = {}
-    expense_totals = {}
-    for tx in tm.list_all():
-        acc = am.get_by_id(tx.account_id)
-        if not acc:
-            continue
-        cur = acc.currency
-        if tx.category.lower() == "income":
-            income_totals.setdefault(cur, 0)
-            income_totals[cur] += tx.amount
-        else:
-            expense_totals.setdefault(cur, 0)
-            expense_totals[cur] += tx.amount
-    budget_totals = {}
-    default_cur = next((a.currency for a in am.list_all()), "N/A")
-    for b in bm.list_all():
-        budget_totals.setdefault(default_cur, 0)
-        budget_totals[default_cur] += b.limit_amount
+def show_balance_summary(am: AccountManager, tm: TransactionManager, bm: BudgetManager, totals: LedgerTotals = None,
+                         rates: CurrencyConverter = None, currency: str = None):
+    """With exchange rates, a last row totals everything in currency (default: the first account's)."""
+    _load_rich()
+    if totals is not None:
+        _render_summary(am, totals, totals.snapshot(), rates, currency)
+        return
+    # a one-off: unsubscribe again, or every call leaves a listener behind
+    totals = LedgerTotals(am, tm, bm)
+    try:
+        _render_summary(am, totals, totals.snapshot(), rates, currency)
+    finally:
+        totals.close()
+
+
+def _render_summary(am: AccountManager, totals: LedgerTotals, snapshot, rates, currency):
     table = Table(title="[bold cyan]Financial Summary[/bold cyan]", title_justify="center")
     table.add_column("Currency", justify="center")
     table.add_column("Total Budget", justify="center", style="yellow")
     table.add_column("Total Income", justify="center", style="green")
     table.add_column("Total Expense", justify="center", style="red")
     table.add_column("Total Balance inAccounts", justify="center", style="cyan")
-    all_curr = set(currency_totals.keys()) | set(income_totals.keys()) | set(expense_totals.keys()) | set(budget_totals.keys())
-    for cur in all_curr:
-        table.add_row(
-            cur,
-            f"{budget_totals.get(cur, 0):.2f} {cur}",
-            f"{income_totals.get(cur, 0):.2f} {cur}",
-            f"{expense_totals.get(cur, 0):.2f} {cur}",
-            f"{currency_totals.get(cur, 0):.2f} {cur}",
-        )
+    for row in _summary_rows(snapshot):
+        table.add_row(*row)
+    note = None
+    first = am.first()
+    if rates and (currency or first):
+        try:
+            table.add_row(*_consolidated_row(totals, rates, currency or first.currency), style="bold")
+        except NotFoundError as e:
+            note = f"[yellow]No consolidated total: {e}[/yellow]"
     console.print(table)
+    if note:
+        console.print(note)
+
+
+def _balance_rows(am: AccountManager, history: BalanceHistory, as_of: str, account_id=None, since=None):
+    accounts = [am.get(account_id)] if account_id else am.list_all()
+    balances = history.balances_as_of(as_of)
+    for a in accounts:
+        row = (a.id, a.name, f"{balances[a.id]:.2f}", a.currency)
+        if since is not None:
+            row += (f"{history.net_flow(a.id, since, as_of):+.2f}",)
+        yield row
+
+
+def print_balances(am: AccountManager, history: BalanceHistory, as_of: str, account_id=None, since=None):
+    _load_rich()
+    table = Table(title=f"[bold green]Balances as of {as_of}[/bold green]", title_justify="center")
+    table.add_column("ID", style="cyan", justify="center")
+    table.add_column("Name", style="white")
+    table.add_column("Balance", style="green", justify="right")
+    table.add_column("Currency", justify="center")
+    if since is not None:
+        table.add_column(f"Net flow since {since}", justify="right")
+    for row in _balance_rows(am, history, as_of, account_id, since):
+        table.add_row(*row)
+    console.print(table)
+
+
+def _reconcile_rows(report):
+    for check in report.accounts:
+        a = check.account
+        expected = "-" if check.expected is None else f"{check.expected:.2f}"
+        drift = "no opening balance" if check.drift is None else f"{check.drift:+.2f}"
+        yield a.id, a.name, f"{a.balance:.2f} {a.currency}", expected, drift, str(check.transactions)
+
+
+def _reconcile_notes(report):
+    for account_id, ids in report.orphans.items():
+        shown = ", ".join(ids[:5]) + (", ..." if len(ids) > 5 else "")
+        yield f"{len(ids)} transaction(s) of missing account {account_id}: {shown}"
+    for tx_id, extra in report.duplicates.items():
+        yield f"Transaction id {tx_id} appears {extra + 1} times; only the first counts"
+
+
+def print_reconciliation(report):
+    _load_rich()
+    table = Table(title=f"[bold blue]Reconciliation of {report.rows} transaction(s)[/bold blue]",
+                  title_justify="center")
+    table.add_column("ID", style="cyan", justify="center")
+    table.add_column("Name", style="white")
+    table.add_column("Stored", justify="right")
+    table.add_column("Expected", justify="right")
+    table.add_column("Drift", justify="right")
+    table.add_column("Transactions", justify="right")
+    for check, row in zip(report.accounts, _reconcile_rows(report)):
+        style = "red" if check.drifted else ("yellow" if check.drift is None else None)
+        table.add_row(*row, style=style)
+    console.print(table)
+    for note in _reconcile_notes(report):
+        console.print(f"[yellow]{note}[/yellow]")
+
+
+def load_rates():
+    """The exchange rates in RATES_CSV, or None when there are none."""
+    rates = CurrencyConverter.load(RATES_CSV)
+    return rates if rates else None
+
+
+def _csv_sources():
+    return {"accounts": ACC_CSV, "transactions": TX_CSV, "budgets": BUD_CSV}
+
+
+def load_all(am: AccountManager, tm: TransactionManager, bm: BudgetManager, journal: Journal) -> int:
+    """
+    Load the CSV snapshot, then replay the journal on top of it. Unsaved
+    changes are dropped. Returns the number of journal records replayed.
+    """
+    return load_datasets({"accounts": am, "transactions": tm, "budgets": bm}, journal)
+
+
+def load_datasets(managers, journal: Journal) -> int:
+    """
+    Like load_all() for just the given managers ({dataset name: manager}),
+    so a command only reads the files it needs.
+
+    Takes no lock, so a slow writer never holds it up. If another process
+    commits while the files are being read, they are read again; after
+    READ_RETRIES busy attempts it waits for the writers' lock instead.
+    """
+    for _ in range(READ_RETRIES):
+        before = journal.versions()
+        replayed = _read_datasets(managers, journal)
+        after = journal.versions()
+        if after == before:
+            journal.loaded = after
+            return replayed
+    with journal.lock:
+        replayed = _read_datasets(managers, journal)
+        journal.loaded = journal.versions()
+        return replayed
+
+
+def _read_datasets(managers, journal: Journal) -> int:
+    journal.discard_pending()
+    sources = _csv_sources()
+    snapshot = None
+    # the snapshot holds every dataset; it only pays off when the ledger,
+    # by far the largest file, is among the ones being read
+    if "transactions" in managers:
+        snapshot = open_snapshot(SNAPSHOT, sources)
+
+    def job(name, manager):
+        if snapshot is not None:
+            # verified to mirror the CSVs, which this app wrote itself
+            return lambda: manager.load_from(snapshot, trusted=True)
+        return lambda: manager.load(sources[name])
+
+    # independent files: their reads overlap, though parsing takes turns on the GIL
+    run_concurrently({name: job(name, manager) for name, manager in managers.items()})
+    return journal.replay(managers)
+
+
+def save_changes(managers, journal: Journal) -> int:
+    """
+    Flush the journal. When another process committed first, pending
+    transaction inserts (and the balance changes they made) are rebased:
+    holding the writers' lock, so the rebase cannot go stale in turn, the
+    managers are reloaded with the other process's work and the inserts are
+    applied again on top. Any other kind of conflict raises ConflictError.
+    Returns the number of records written.
+    """
+    try:
+        return journal.flush()
+    except ConflictError:
+        if "transactions" not in managers or "accounts" not in managers:
+            raise
+    with journal.lock:
+        rows, deltas = journal.take_inserts()
+        load_datasets(managers, journal)
+        am, tm = managers["accounts"], managers["transactions"]
+        taken = [row["id"] for row in rows if row["id"] in tm]
+        if taken:
+            raise ConflictError(f"Transaction id(s) {', '.join(taken)} were added by another process; "
+                                f"nothing was saved", ["transactions"])
+        try:
+            am.adjust_balances(deltas)
+        except NotFoundError as e:
+            raise ConflictError(f"{e}: deleted by another process; nothing was saved", ["accounts"])
+        tm.create_many(Transaction.from_row(row, trusted=True) for row in rows)
+        return journal.flush()
+
+
+def save_all(am: AccountManager, tm: TransactionManager, bm: BudgetManager) -> SaveStats:
+    """Write the CSV files of the managers that changed; untouched files are skipped."""
+    stats = SaveStats()
+    written = run_concurrently({
+        "accounts": lambda: am.save(ACC_CSV),
+        "transactions": lambda: tm.save(TX_CSV),
+        "budgets": lambda: bm.save(BUD_CSV),
+    })
+    for name in ("accounts", "transactions", "budgets"):
+        stats.record(written[name])
+    if stats.files_written or not os.path.exists(SNAPSHOT):
+        # binary mirror of the CSVs for fast startup
+        stats.record(write_snapshot(SNAPSHOT, {
+            "accounts": (ACCOUNT_FIELDS, (a.to_dict() for a in am.list_all())),
+            "transactions": (TRANSACTION_FIELDS, (t.to_dict() for t in tm.list_all())),
+            "budgets": (BUDGET_FIELDS, (b.to_dict() for b in bm.list_all())),
+        }, _csv_sources()))
+    return stats
+
+
+def compact(am: AccountManager, tm: TransactionManager, bm: BudgetManager, journal: Journal) -> SaveStats:
+    """
+    Fold the journal into a fresh CSV snapshot. Pending changes are saved
+    first; then, holding the writers' lock, the state is brought up to date
+    with whatever other processes committed, written out whole, and the
+    journal is dropped.
+    """
+    managers = {"accounts": am, "transactions": tm, "budgets": bm}
+    save_changes(managers, journal)
+    with journal.lock:
+        if journal.stale(managers):
+            load_datasets(managers, journal)
+        stats = save_all(am, tm, bm)
+        journal.truncate()
+    return stats
 
 
 def prompt_until_valid(prompt_text: str, validator_func, *vargs, **vkwargs):
@@ -176,17 +522,24 @@ def prompt_until_valid(prompt_text: str, validator_func, *vargs, **vkwargs):
 
 
 def run_cli():
+    _load_rich()
     am = AccountManager()
     tm = TransactionManager()
     bm = BudgetManager()
+    totals = LedgerTotals(am, tm, bm)
+    rollups = MonthlyRollups(am, tm, bm)
+    journal = Journal(JOURNAL)
+    journal.attach("accounts", am)
+    journal.attach("transactions", tm)
+    journal.attach("budgets", bm)
+    managers = {"accounts": am, "transactions": tm, "budgets": bm}
     # auto-load if files exist
-    am.load(ACC_CSV)
-    tm.load(TX_CSV)
-    bm.load(BUD_CSV)
+    load_all(am, tm, bm, journal)
+    rates = load_rates()
 
     while True:
         main_menu()
-        choice = Prompt.ask("Choose option", choices=[str(i) for i in range(1, 8)])
+        choice = Prompt.ask("Choose option", choices=[str(i) for i in range(1, 10)])
         if choice == "1":
             # Accounts
             while True:
@@ -207,7 +560,7 @@ def run_cli():
                     elif acc_type == "bank":
                         acc = BankAccount(id_, name, currency, float(balance))
                     else:
-                        acc = Account(id_, name, acc_type, currency, float(balance))
+                        acc = Account(id_, name, currency, float(balance), account_type=acc_type)
                     try:
                         am.create(acc)
                         console.print("[green]Account created successfully![/green]")
@@ -226,7 +579,7 @@ def run_cli():
                             break
                         try:
                             validated = validate_name(new_name, "New Name", 15)
-                            acc.name = validated
+                            am.update(id_, name=validated)
                             console.print("[green]Name updated.[/green]")
                             break
                         except ValidationError as e:
@@ -238,7 +591,7 @@ def run_cli():
                             break
                         try:
                             nb = validate_positive_int(new_bal, "New Balance")
-                            acc.balance = float(nb)
+                            am.update(id_, balance=float(nb))
                             console.print("[green]Balance set.[/green]")
                             break
                         except ValidationError as e:
@@ -258,7 +611,10 @@ def run_cli():
                 transactions_menu()
                 c = Prompt.ask("Choose", choices=["1", "2", "3", "4", "5"])
                 if c == "1":
-                    print_transactions(tm, am)
+                    if len(tm) > PAGE_SIZE:
+                        browse_transactions(tm, am)
+                    else:
+                        print_transactions(tm, am)
                 elif c == "2":
                     id_ = Prompt.ask("Transaction ID").strip()
                     account_id = Prompt.ask("Account ID").strip()
@@ -276,9 +632,9 @@ def run_cli():
                         tm.create(tx)
                         # update balance
                         if cat_choice == "income":
-                            acc.balance += float(amount)
+                            am.adjust_balance(account_id, float(amount))
                         else:
-                            acc.balance -= float(amount)
+                            am.adjust_balance(account_id, -float(amount))
                         console.print("[green]Transaction created and balance updated.[/green]")
                     except Exception as e:
                         console.print(f"[red]{e}[/red]")
@@ -295,14 +651,15 @@ def run_cli():
                     acc = am.get_by_id(tx.account_id)
                     old_amount = tx.amount
                     old_category = tx.category.lower()
+                    # collect edits and apply them through the manager so its indexes stay in sync
+                    changes = {}
                     # Date
                     while True:
                         new_date = Prompt.ask(f"New date [{tx.date}] (blank to keep)")
                         if not new_date.strip():
                             break
                         try:
-                            nx = validate_date_ymd(new_date, "Date")
-                            tx.date = nx
+                            changes["date"] = validate_date_ymd(new_date, "Date")
                             break
                         except ValidationError as e:
                             console.print(f"[red]{e}[/red]")
@@ -313,7 +670,7 @@ def run_cli():
                             break
                         try:
                             na = validate_positive_int(new_amt, "Amount")
-                            tx.amount = float(na)
+                            changes["amount"] = float(na)
                             break
                         except ValidationError as e:
                             console.print(f"[red]{e}[/red]")
@@ -324,27 +681,21 @@ def run_cli():
                         if not new_cat.strip():
                             break
                         try:
-                            nc = validate_category_choice(new_cat)
-                            tx.category = nc
+                            changes["category"] = validate_category_choice(new_cat)
                             break
                         except ValidationError as e:
                             console.print(f"[red]{e}[/red]")
                     # Description
                     nd = Prompt.ask(f"New description [{tx.description}] (blank to keep)", default="")
                     if nd.strip():
-                        tx.description = nd
+                        changes["description"] = nd
+                    tm.update(txid, **changes)
                     # now adjust balance if category/amount changed
                     if acc:
-                        # remove old effect
-                        if old_category == "income":
-                            acc.balance -= old_amount
-                        else:
-                            acc.balance += old_amount
-                        # apply new effect
-                        if tx.category.lower() == "income":
-                            acc.balance += tx.amount
-                        else:
-                            acc.balance -= tx.amount
+                        # remove old effect, apply new effect
+                        delta = -old_amount if old_category == "income" else old_amount
+                        delta += tx.amount if tx.category.lower() == "income" else -tx.amount
+                        am.adjust_balance(acc.id, delta)
                     console.print("[green]Transaction updated.[/green]")
                 elif c == "4":
                     txid = Prompt.ask("Transaction ID to delete").strip()
@@ -354,9 +705,9 @@ def run_cli():
                         acc = am.get_by_id(tx.account_id)
                         if acc:
                             if tx.category.lower() == "income":
-                                acc.balance -= tx.amount
+                                am.adjust_balance(acc.id, -tx.amount)
                             else:
-                                acc.balance += tx.amount
+                                am.adjust_balance(acc.id, tx.amount)
                         tm.delete(txid)
                         console.print("[green]Transaction deleted and balance adjusted.[/green]")
                     except Exception as e:
@@ -385,13 +736,14 @@ def run_cli():
                     except Exception as e:
                         console.print(f"[red]{e}[/red]")
                         continue
+                    changes = {}
                     # update month
                     while True:
                         nm = Prompt.ask(f"New month [{b.month}] (blank to keep)", default="")
                         if not nm.strip():
                             break
                         try:
-                            b.month = validate_month_yyyy_mm(nm, "Month")
+                            changes["month"] = validate_month_yyyy_mm(nm, "Month")
                             break
                         except ValidationError as e:
                             console.print(f"[red]{e}[/red]")
@@ -401,10 +753,11 @@ def run_cli():
                         if not nl.strip():
                             break
                         try:
-                            b.limit_amount = float(validate_positive_int(nl, "Limit amount"))
+                            changes["limit_amount"] = float(validate_positive_int(nl, "Limit amount"))
                             break
                         except ValidationError as e:
                             console.print(f"[red]{e}[/red]")
+                    bm.update(bid, **changes)
                     console.print("[green]Budget updated.[/green]")
                 elif c == "4":
                     bid = Prompt.ask("Budget ID to delete").strip()
@@ -416,27 +769,423 @@ def run_cli():
                 else:
                     break
         elif choice == "4":
-            show_balance_summary(am, tm, bm)
+            show_balance_summary(am, tm, bm, totals, rates)
         elif choice == "5":
-            am.save(ACC_CSV)
-            tm.save(TX_CSV)
-            bm.save(BUD_CSV)
-            console.print("[green]All data saved to CSV![/green]")
+            # appends only what changed; see option 8 for a full rewrite
+            try:
+                written = save_changes(managers, journal)
+            except ConflictError as e:
+                console.print(f"[red]Not saved: {e}. Reload (6) to see the other changes.[/red]")
+            else:
+                console.print(f"[green]Saved {written} change(s) to the journal.[/green]")
         elif choice == "6":
-            am.load(ACC_CSV)
-            tm.load(TX_CSV)
-            bm.load(BUD_CSV)
-            console.print("[green]All data loaded from CSV![/green]")
+            replayed = load_all(am, tm, bm, journal)
+            rates = load_rates()
+            console.print(f"[green]All data loaded from CSV ({replayed} journal record(s) replayed)![/green]")
         elif choice == "7":
             # auto-save on exit
             try:
-                am.save(ACC_CSV)
-                tm.save(TX_CSV)
-                bm.save(BUD_CSV)
+                save_changes(managers, journal)
+            except ConflictError as e:
+                # unsaved work would be lost silently; stay so it can be redone
+                console.print(f"[red]Not saved: {e}. Reload (6) to discard your changes, then exit.[/red]")
+                continue
             except Exception:
                 pass
             console.print("[bold cyan]Goodbye![/bold cyan]")
             break
+        elif choice == "8":
+            try:
+                stats = compact(am, tm, bm, journal)
+            except ConflictError as e:
+                console.print(f"[red]Not compacted: {e}. Reload (6) first.[/red]")
+                continue
+            console.print(
+                f"[green]Journal compacted into CSV files: {stats.files_written} written "
+                f"({stats.bytes_written} bytes), {stats.files_skipped} unchanged.[/green]"
+            )
+        elif choice == "9":
+            month = prompt_until_valid("Month (YYYY-MM)", validate_month_yyyy_mm, "Month")
+            try:
+                statuses = bm.status(month, rollups, rates)
+            except NotFoundError as e:
+                # a currency without exchange rates: report without converting
+                console.print(f"[yellow]{e}; other currencies are not converted.[/yellow]")
+                statuses = bm.status(month, rollups)
+            if statuses:
+                print_budget_status(month, statuses)
+            else:
+                console.print(f"[yellow]No budgets for {month}.[/yellow]")
+
+
+# ---- non-interactive subcommands (python main.py <command> ...)
+
+ACCOUNT_HEADERS = ("ID", "Name", "Type", "Balance", "Currency", "Class")
+TRANSACTION_HEADERS = ("ID", "Account", "Date", "Amount", "Category", "Description")
+BUDGET_HEADERS = ("ID", "Month", "Category", "Limit")
+BUDGET_STATUS_HEADERS = ("ID", "Category", "Limit", "Spent", "Remaining", "Used", "Other currencies")
+BALANCE_HEADERS = ("ID", "Name", "Balance", "Currency")
+RECONCILE_HEADERS = ("ID", "Name", "Stored", "Expected", "Drift", "Transactions")
+SUMMARY_HEADERS = ("Currency", "Total Budget", "Total Income", "Total Expense", "Total Balance")
+DATASET_FIELDS = {"accounts": ACCOUNT_FIELDS, "transactions": TRANSACTION_FIELDS, "budgets": BUDGET_FIELDS}
+
+
+def _print_plain(headers, rows):
+    # tab-separated, one record per line: easy to cut/awk from scripts
+    out = sys.stdout
+    out.write("\t".join(headers) + "\n")
+    for row in rows:
+        out.write("\t".join(str(v) for v in row) + "\n")
+
+
+def _plain(args) -> bool:
+    return args.plain or not sys.stdout.isatty()
+
+
+def _load(journal: Journal, *datasets: str):
+    factories = {"accounts": AccountManager, "transactions": TransactionManager, "budgets": BudgetManager}
+    managers = {name: factories[name]() for name in datasets}
+    load_datasets(managers, journal)
+    return managers
+
+
+def _rates(args):
+    rates = load_rates()
+    if rates is None and getattr(args, "currency", None):
+        raise NotFoundError(f"No exchange rates in {RATES_CSV}")
+    return rates
+
+
+def cmd_summary(args, journal: Journal) -> int:
+    m = _load(journal, "accounts", "transactions", "budgets")
+    am, tm, bm = m["accounts"], m["transactions"], m["budgets"]
+    rates = _rates(args)
+    if _plain(args):
+        totals = LedgerTotals(am, tm, bm)
+        try:
+            rows = list(_summary_rows(totals.snapshot()))
+            first = am.first()
+            if rates and (args.currency or first):
+                rows.append(_consolidated_row(totals, rates, args.currency or first.currency))
+        finally:
+            totals.close()
+        _print_plain(SUMMARY_HEADERS, rows)
+    else:
+        show_balance_summary(am, tm, bm, rates=rates, currency=args.currency)
+    return 0
+
+
+def cmd_tx_add(args, journal: Journal) -> int:
+    m = _load(journal, "accounts", "transactions")
+    am, tm = m["accounts"], m["transactions"]
+    journal.attach("accounts", am)
+    journal.attach("transactions", tm)
+    if am.get_by_id(args.account) is None:
+        raise ValidationError(f"Account {args.account} not found")
+    date = validate_date_ymd(args.date, "Date")
+    tx = Transaction(args.id, args.account, date, args.amount, args.category, args.description)
+    tm.create(tx)
+    am.adjust_balance(args.account, args.amount if args.category == "income" else -args.amount)
+    # same durability as "Save changes" in the menu: appended to the journal
+    save_changes(m, journal)
+    print(f"Transaction {tx.id} added")
+    return 0
+
+
+def _column_map(pairs):
+    columns = {}
+    for pair in pairs or []:
+        field, sep, column = pair.partition("=")
+        if not sep or not field.strip() or not column.strip():
+            raise ValidationError(f"Column mapping must look like field=Column, got {pair!r}")
+        columns[field.strip()] = column.strip()
+    return columns
+
+
+def cmd_tx_import(args, journal: Journal) -> int:
+    # pulls in multiprocessing; every other command would pay for it at startup
+    from storage.bank_import import ImportSpec, import_statement
+    m = _load(journal, "accounts", "transactions")
+    am, tm = m["accounts"], m["transactions"]
+    journal.attach("accounts", am)
+    journal.attach("transactions", tm)
+    prefix = args.id_prefix
+    if prefix is None:
+        prefix = os.path.splitext(os.path.basename(args.path))[0] + "-"
+    spec = ImportSpec(_column_map(args.map), account=args.account, date_format=args.date_format,
+                      decimal=args.decimal, delimiter=args.delimiter, id_prefix=prefix)
+    result = import_statement(args.path, tm, am, spec, workers=args.workers)
+    save_changes(m, journal)
+    for line, reason in result.rejected:
+        print(f"{args.path}:{line}: {reason}", file=sys.stderr)
+    print(f"Imported {result.imported} of {result.rows} row(s), {len(result.rejected)} rejected "
+          f"({result.rows_per_sec:.0f} rows/s)")
+    return 0 if not result.rejected else 2
+
+
+def _date_bound(value):
+    # stored dates are zero-padded; "2025-1-5" must bound the same day
+    return None if value is None else ordinal_ymd(ymd_ordinal(parse_date_ymd(value)))
+
+
+def cmd_tx_list(args, journal: Journal) -> int:
+    filters = (args.account, args.category, _date_bound(args.date_from), _date_bound(args.date_to))
+    m = _load(journal, "accounts", "transactions")
+    am, tm = m["accounts"], m["transactions"]
+    paged = args.limit is not None or args.offset
+    if any(f is not None for f in filters):
+        txs = tm.query(*filters)
+        if paged:
+            txs = txs[args.offset:None if args.limit is None else args.offset + args.limit]
+    elif paged:
+        # straight off the date index: only the requested rows are touched
+        txs = tm.page(args.offset, len(tm) if args.limit is None else args.limit)
+    else:
+        txs = tm.list_all()
+    if _plain(args):
+        _print_plain(TRANSACTION_HEADERS, _transaction_rows(txs, am))
+    else:
+        print_transactions(tm, am, txs)
+    return 0
+
+
+def cmd_tx_find(args, journal: Journal) -> int:
+    m = _load(journal, "accounts", "transactions")
+    am, tm = m["accounts"], m["transactions"]
+    if args.explain:
+        print(tm.explain(args.query))
+        return 0
+    txs = tm.find(args.query)
+    if _plain(args):
+        _print_plain(TRANSACTION_HEADERS, _transaction_rows(txs, am))
+    else:
+        print_transactions(tm, am, txs, caption=args.query)
+    return 0
+
+
+def cmd_account_list(args, journal: Journal) -> int:
+    am = _load(journal, "accounts")["accounts"]
+    if _plain(args):
+        _print_plain(ACCOUNT_HEADERS, _account_rows(am))
+    else:
+        print_accounts(am)
+    return 0
+
+
+def cmd_budget_list(args, journal: Journal) -> int:
+    m = _load(journal, "accounts", "budgets")
+    if _plain(args):
+        _print_plain(BUDGET_HEADERS, _budget_rows(m["budgets"], m["accounts"]))
+    else:
+        print_budgets(m["budgets"], m["accounts"])
+    return 0
+
+
+def cmd_balance(args, journal: Journal) -> int:
+    m = _load(journal, "accounts", "transactions")
+    am, tm = m["accounts"], m["transactions"]
+    as_of = validate_date_ymd(args.as_of, "Date")
+    since = None if args.since is None else validate_date_ymd(args.since, "Date")
+    if args.account:
+        am.get(args.account)  # unknown ids fail before any output
+    history = BalanceHistory(am, tm)
+    if _plain(args):
+        headers = BALANCE_HEADERS + (("Net flow",) if since else ())
+        _print_plain(headers, _balance_rows(am, history, as_of, args.account, since))
+    else:
+        print_balances(am, history, as_of, args.account, since)
+    return 0
+
+
+def cmd_reconcile(args, journal: Journal) -> int:
+    am = _load(journal, "accounts")["accounts"]
+    overlay = LedgerOverlay()
+    journal.replay({"transactions": overlay})
+    # streamed from the CSV rather than loaded: a ledger with duplicate ids
+    # does not load, and this stays linear on ledgers of any size
+    report = reconcile(am, overlay.apply(iter_dicts_from_csv(TX_CSV)))
+    if _plain(args):
+        _print_plain(RECONCILE_HEADERS, _reconcile_rows(report))
+        for note in _reconcile_notes(report):
+            print(note, file=sys.stderr)
+    else:
+        print_reconciliation(report)
+    if not args.fix:
+        return 0 if report.clean else 2
+
+    if report.duplicates:
+        with journal.lock:
+            write_csv_atomic(TX_CSV, TRANSACTION_FIELDS, without_duplicates(iter_dicts_from_csv(TX_CSV)))
+            journal.bump_generation()
+    m = _load(journal, "accounts", "transactions")
+    am, tm = m["accounts"], m["transactions"]
+    journal.attach("accounts", am)
+    journal.attach("transactions", tm)
+    done = fix(reconcile_manager(am, tm), am, tm, drop_orphans=args.drop_orphans)
+    save_changes(m, journal)
+    print(f"Removed {sum(report.duplicates.values())} duplicate row(s), set {done['baselined']} opening "
+          f"balance(s), corrected {done['rebalanced']} balance(s), dropped {done['orphans_dropped']} "
+          f"orphaned transaction(s)")
+    return 2 if report.orphans and not args.drop_orphans else 0
+
+
+def cmd_budget_status(args, journal: Journal) -> int:
+    m = _load(journal, "accounts", "transactions", "budgets")
+    rollups = MonthlyRollups(m["accounts"], m["transactions"], m["budgets"])
+    statuses = m["budgets"].status(args.month, rollups, _rates(args))
+    if _plain(args):
+        headers = BUDGET_STATUS_HEADERS
+        if statuses and statuses[0].total_spent is not None:
+            headers += ("Total spent",)
+        _print_plain(headers, _budget_status_rows(statuses))
+    else:
+        print_budget_status(args.month, statuses)
+    return 0
+
+
+def cmd_export(args, journal: Journal) -> int:
+    manager = _load(journal, args.dataset)[args.dataset]
+    fields = DATASET_FIELDS[args.dataset]
+    rows = (r.to_dict() for r in manager.list_all())
+    if args.format == "json":
+        text = json.dumps(list(rows), indent=2) + "\n"
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text)
+    elif args.output:
+        write_csv_atomic(args.output, fields, rows)
+    else:
+        writer = csv.DictWriter(sys.stdout, fieldnames=fields, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    return 0
+
+
+def _non_negative(value: str) -> int:
+    n = int(value)
+    if n < 0:
+        raise argparse.ArgumentTypeError("must be 0 or more")
+    return n
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Personal Finance Manager. Without a command, starts the interactive menu.")
+    parser.add_argument("--data-dir", help="directory holding the CSV files (default: data/ next to main.py)")
+    parser.add_argument("--plain", action="store_true",
+                        help="tab-separated output without tables (the default when not writing to a terminal)")
+    parser.add_argument("--profile", action="store_true",
+                        help="on exit, print call counts, p50/p95/max latency and rows/s per operation to stderr")
+    parser.add_argument("--profile-dump", metavar="FILE",
+                        help="also run cProfile and write its stats to FILE (implies --profile)")
+    sub = parser.add_subparsers(dest="command", metavar="command")
+
+    p = sub.add_parser("summary", help="per-currency balance, income, expense and budget totals")
+    p.add_argument("--currency", type=str.upper,
+                   help="reporting currency of the consolidated row (needs rates.csv; default: the first "
+                        "account's currency)")
+    p.set_defaults(func=cmd_summary)
+
+    tx = sub.add_parser("tx", help="transactions").add_subparsers(dest="tx_command", metavar="command", required=True)
+    p = tx.add_parser("add", help="record a transaction and update the account balance")
+    p.add_argument("id")
+    p.add_argument("--account", required=True)
+    p.add_argument("--date", required=True, help="YYYY-MM-DD")
+    p.add_argument("--amount", required=True, type=float)
+    p.add_argument("--category", required=True, choices=["income", "expense"])
+    p.add_argument("--description", default="")
+    p.set_defaults(func=cmd_tx_add)
+    p = tx.add_parser("import", help="bulk-import a bank statement CSV")
+    p.add_argument("path")
+    p.add_argument("--account", help="account for every row when the statement has no account column")
+    p.add_argument("--map", action="append", metavar="FIELD=COLUMN",
+                   help="statement column for one of id, account_id, date, amount, category, description "
+                        "(repeatable); without a category column the amount's sign decides income/expense")
+    p.add_argument("--date-format", default="%Y-%m-%d", help="strptime format of the date column")
+    p.add_argument("--decimal", default=".", help="decimal separator of the amount column")
+    p.add_argument("--delimiter", default=",")
+    p.add_argument("--id-prefix", help="prefix for line-number ids when there is no id column "
+                                       "(default: the file name)")
+    p.add_argument("--workers", type=int, help="parser processes (default: one per CPU)")
+    p.set_defaults(func=cmd_tx_import)
+    p = tx.add_parser("list", help="list transactions, optionally filtered")
+    p.add_argument("--account")
+    p.add_argument("--category")
+    p.add_argument("--from", dest="date_from", help="YYYY-MM-DD, inclusive")
+    p.add_argument("--to", dest="date_to", help="YYYY-MM-DD, inclusive")
+    p.add_argument("--limit", type=_non_negative, help="show at most this many rows, in (date, id) order")
+    p.add_argument("--offset", type=_non_negative, default=0, help="skip this many rows first")
+    p.set_defaults(func=cmd_tx_list)
+    p = tx.add_parser("find", help="filter with a query, e.g. \"account=11 amount>500 desc~grocery "
+                                   "order by amount desc limit 10\"")
+    p.add_argument("query", help="field<op>value terms (id, account, category, date, amount, desc; "
+                                 "= != < <= > >= ~), then optional 'order by FIELD [asc|desc]' and 'limit N'")
+    p.add_argument("--explain", action="store_true", help="print the query plan instead of running it")
+    p.set_defaults(func=cmd_tx_find)
+
+    account = sub.add_parser("account", help="accounts").add_subparsers(dest="account_command", metavar="command", required=True)
+    account.add_parser("list", help="list accounts").set_defaults(func=cmd_account_list)
+
+    budget = sub.add_parser("budget", help="budgets").add_subparsers(dest="budget_command", metavar="command", required=True)
+    budget.add_parser("list", help="list budgets").set_defaults(func=cmd_budget_list)
+    p = budget.add_parser("status", help="spent, remaining and percent used per budget of a month")
+    p.add_argument("month", help="YYYY-MM")
+    p.set_defaults(func=cmd_budget_status)
+
+    p = sub.add_parser("balance", help="account balances at the end of a past date")
+    p.add_argument("--as-of", required=True, help="YYYY-MM-DD")
+    p.add_argument("--account", help="only this account")
+    p.add_argument("--since", help="YYYY-MM-DD; also show each account's net flow from this date through --as-of")
+    p.set_defaults(func=cmd_balance)
+
+    p = sub.add_parser("reconcile", help="check stored balances against the ledger; exit status 2 on problems")
+    p.add_argument("--fix", action="store_true",
+                   help="drop duplicate ids, set missing opening balances and correct drifted balances")
+    p.add_argument("--drop-orphans", action="store_true",
+                   help="with --fix, also delete transactions of accounts that no longer exist")
+    p.set_defaults(func=cmd_reconcile)
+
+    p = sub.add_parser("export", help="write a dataset as CSV or JSON")
+    p.add_argument("dataset", choices=list(DATASET_FIELDS))
+    p.add_argument("--format", choices=["csv", "json"], default="csv")
+    p.add_argument("--output", "-o", help="file to write (default: stdout)")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def _run(args) -> int:
+    if args.command is None:
+        run_cli()
+        return 0
+    try:
+        return args.func(args, Journal(JOURNAL))
+    except FinanceError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.data_dir:
+        set_data_dir(args.data_dir)
+    if not (args.profile or args.profile_dump):
+        return _run(args)
+    # only imported when asked for: without --profile nothing is wrapped
+    import metrics
+    metrics.enable(cprofile=bool(args.profile_dump), app=sys.modules[__name__])
+    try:
+        command = [args.command or "menu", getattr(args, f"{args.command}_command", None)]
+        with metrics.span("command " + " ".join(filter(None, command))):
+            return _run(args)
+    finally:
+        collected = metrics.disable(dump=args.profile_dump)
+        print(collected.report(), file=sys.stderr)
+        if args.profile_dump:
+            print(f"cProfile stats written to {args.profile_dump} (python -m pstats {args.profile_dump})",
+                  file=sys.stderr)
+
 
 if __name__ == "__main__":
-    run_cli()
+    sys.exit(main())
@@ -1,10 +1,15 @@
-import csv
 import os
-from typing import List, Optional
+from sys import intern
+from typing import Dict, Iterable, List, Optional
 
 from models.account import Account, CashAccount, BankAccount
+from managers.events import ChangeNotifier
+from storage.backend import StorageBackend
+from storage.csv_storage import iter_dicts_from_csv, write_csv_atomic
 from exceptions import ValidationError, NotFoundError, StorageError
 
+ACCOUNT_FIELDS = ["id", "name", "account_type", "currency", "balance", "opening_balance"]
+
 # helper validators
 def _validate_name(name: str):
     if not isinstance(name, str):
@@ -25,7 +30,7 @@ def _validate_currency(currency: str):
         raise ValidationError("Currency must be 1..3 characters")
     if not cur.isalpha():
         raise ValidationError("Currency must be alphabetic")
-    return cur
+    return intern(cur)
 
 def _validate_balance(balance):
     try:
@@ -37,108 +42,221 @@ def _validate_balance(balance):
     # tests expect integers sometimes; but we accept floats too
     return b
 
-class AccountManager:
+def _validate_opening_balance(balance):
+    # may be negative: it is derived from the ledger when first reconciled
+    if balance is None or balance == "":
+        return None
+    try:
+        return float(balance)
+    except Exception:
+        raise ValidationError("Opening balance must be a number")
+
+def _account_from_row(row, trusted=False) -> Account:
+    # safe parsing with defaults
+    balance = float(row.get("balance") or 0.0)
+    atype = (row.get("account_type") or "").lower()
+    name = row.get("name") or ""
+    currency = row.get("currency") or ""
+    # files written before opening balances were kept lack the column
+    opening = _validate_opening_balance(row.get("opening_balance"))
+    if not trusted:
+        # validate loaded data (will raise ValidationError if file corrupt)
+        name = _validate_name(name)
+        currency = _validate_currency(currency)
+        balance = _validate_balance(balance)
+
+    if atype == "cash":
+        return CashAccount(row["id"], name, currency, balance, opening)
+    if atype == "bank":
+        return BankAccount(row["id"], name, currency, balance, opening)
+    return Account(row["id"], name, currency, balance, account_type=row.get("account_type") or "general",
+                   opening_balance=opening)
+
+class AccountManager(ChangeNotifier):
     def __init__(self):
-        self.accounts: List[Account] = []
+        # id -> Account, in insertion order
+        self._by_id: Dict[str, Account] = {}
+        # the delta being applied while adjust_balance() notifies, so
+        # listeners can tell it from an absolute update(balance=...)
+        self.balance_delta: Optional[float] = None
+        self._init_notifier()
+
+    @property
+    def accounts(self) -> List[Account]:
+        return list(self._by_id.values())
+
+    def __len__(self):
+        return len(self._by_id)
 
     def create(self, acc: Account):
         # validate id uniqueness
-        if any(a.id == acc.id for a in self.accounts):
+        if acc.id in self._by_id:
             raise ValidationError(f"Account with id {acc.id} already exists")
 
         # validate fields
         acc.name = _validate_name(acc.name)
         acc.currency = _validate_currency(acc.currency)
         acc.balance = _validate_balance(acc.balance)
+        # a new account has no transactions yet: what it starts with is its opening balance
+        opening = _validate_opening_balance(acc.opening_balance)
+        acc.opening_balance = acc.balance if opening is None else opening
 
         # ensure proper subclass based on account_type
         atype = (acc.account_type or "").lower()
         if atype == "cash" and not isinstance(acc, CashAccount):
-            acc = CashAccount(acc.id, acc.name, acc.currency, acc.balance)
+            acc = CashAccount(acc.id, acc.name, acc.currency, acc.balance, acc.opening_balance)
         elif atype == "bank" and not isinstance(acc, BankAccount):
-            acc = BankAccount(acc.id, acc.name, acc.currency, acc.balance)
+            acc = BankAccount(acc.id, acc.name, acc.currency, acc.balance, acc.opening_balance)
 
-        self.accounts.append(acc)
+        self._by_id[acc.id] = acc
+        self._changed("create", None, acc)
 
     def list_all(self) -> List[Account]:
-        return list(self.accounts)
+        return list(self._by_id.values())
 
     def get(self, account_id: str) -> Account:
-        for a in self.accounts:
-            if a.id == account_id:
-                return a
-        raise NotFoundError(f"Account {account_id} not found")
+        acc = self._by_id.get(account_id)
+        if acc is None:
+            raise NotFoundError(f"Account {account_id} not found")
+        return acc
 
     def get_by_id(self, account_id: str) -> Optional[Account]:
-        for a in self.accounts:
-            if a.id == account_id:
-                return a
-        return None
+        return self._by_id.get(account_id)
+
+    def get_many(self, account_ids: Iterable[str]) -> Dict[str, Account]:
+        """
+        Resolve many ids at once. Unknown ids are left out of the result.
+        """
+        by_id = self._by_id
+        return {i: by_id[i] for i in set(account_ids) if i in by_id}
+
+    def currency_map(self) -> Dict[str, str]:
+        return {a.id: a.currency for a in self._by_id.values()}
+
+    def first(self) -> Optional[Account]:
+        return next(iter(self._by_id.values()), None)
 
     def update(self, account_id: str, **kwargs):
         """
         Update attributes of an account. Validates name and currency and balance when provided.
+        Setting balance does not record a transaction; reconcile() reports the drift.
         """
         acc = self.get(account_id)
+        changes = {}
         if "name" in kwargs and kwargs["name"] is not None:
-            acc.name = _validate_name(kwargs["name"])
+            changes["name"] = _validate_name(kwargs["name"])
         if "currency" in kwargs and kwargs["currency"] is not None:
-            acc.currency = _validate_currency(kwargs["currency"])
+            changes["currency"] = _validate_currency(kwargs["currency"])
         if "balance" in kwargs and kwargs["balance"] is not None:
-            acc.balance = _validate_balance(kwargs["balance"])
+            changes["balance"] = _validate_balance(kwargs["balance"])
+        if "opening_balance" in kwargs and kwargs["opening_balance"] is not None:
+            changes["opening_balance"] = _validate_opening_balance(kwargs["opening_balance"])
+        old = acc.to_dict()
+        for field, value in changes.items():
+            setattr(acc, field, value)
+        self._changed("update", old, acc)
+        return acc
+
+    def adjust_balance(self, account_id: str, delta: float):
+        """
+        Add delta (negative for money going out) to the balance. Unlike
+        update(balance=...), this may take the balance below zero.
+        """
+        acc = self.get(account_id)
+        old = acc.to_dict()
+        acc.balance += delta
+        self.balance_delta = delta
+        try:
+            self._changed("update", old, acc)
+        finally:
+            self.balance_delta = None
         return acc
 
+    def adjust_balances(self, deltas: Dict[str, float]):
+        """
+        adjust_balance() for many accounts at once ({account_id: delta}). All
+        ids are checked first, so an unknown one leaves every balance as it was.
+        """
+        for account_id in deltas:
+            self.get(account_id)
+        for account_id, delta in deltas.items():
+            self.adjust_balance(account_id, delta)
+
     def delete(self, account_id: str):
         acc = self.get(account_id)
-        self.accounts.remove(acc)
+        del self._by_id[account_id]
+        self._changed("delete", acc, None)
+
+    def restore(self, row: Dict):
+        """
+        Insert or replace an account from a row this app wrote (journal replay).
+        No validation and no balance rules are applied.
+        """
+        acc = _account_from_row(row, trusted=True)
+        old = self._by_id.get(acc.id)
+        self._by_id[acc.id] = acc
+        if old is None:
+            self._changed("create", None, acc)
+        else:
+            self._changed("update", old.to_dict(), acc)
 
     # backward-compatible save/load names expected by tests
-    def save_csv(self, path: str):
-        return self.save(path)
+    def save_csv(self, path: str, force: bool = False):
+        return self.save(path, force)
 
-    def load_csv(self, path: str):
-        return self.load(path)
+    def load_csv(self, path: str, trusted: bool = False):
+        return self.load(path, trusted)
 
     # actual implementations
-    def save(self, path: str):
-        try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["id", "name", "account_type", "currency", "balance"])
-                writer.writeheader()
-                for acc in self.accounts:
-                    writer.writerow(acc.to_dict())
-        except Exception as e:
-            raise StorageError(e)
+    def save(self, path: str, force: bool = False) -> int:
+        """
+        Atomically write the accounts to path. Returns the bytes written, or 0
+        when nothing changed since this file was last loaded or saved.
+        """
+        if not force and not self.is_dirty(path):
+            return 0
+        written = write_csv_atomic(path, ACCOUNT_FIELDS, (acc.to_dict() for acc in self._by_id.values()))
+        self._mark_saved(path)
+        return written
 
-    def load(self, path: str):
-        self.accounts = []
+    def load(self, path: str, trusted: bool = False):
+        """
+        Replace the accounts with the file's contents. trusted=True skips the
+        field re-validation; use it only for files this app wrote itself.
+        """
         if not os.path.exists(path):
+            self._load_rows([], trusted)
             return
+        self._load_rows(iter_dicts_from_csv(path), trusted)
+        self._mark_saved(path)
+
+    def save_to(self, backend: StorageBackend, force: bool = False) -> Optional[int]:
+        """Like save(), against any storage backend, but a skipped write returns None."""
+        location = backend.location("accounts")
+        if not force and not self._is_dirty_at(location, backend.exists("accounts")):
+            return None
+        written = backend.save_rows("accounts", ACCOUNT_FIELDS, (acc.to_dict() for acc in self._by_id.values()))
+        self._mark_saved_at(location)
+        return written
+
+    def load_from(self, backend: StorageBackend, trusted: bool = False):
+        """Like load(), against any storage backend."""
+        self._load_rows(backend.iter_rows("accounts"), trusted)
+        self._mark_saved_at(backend.location("accounts"))
+
+    def _load_rows(self, chunks: Iterable[List[Dict]], trusted: bool):
+        self._by_id = {}
         try:
-            with open(path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # safe parsing with defaults
-                    balance = float(row.get("balance") or 0.0)
-                    atype = (row.get("account_type") or "").lower()
-                    name = row.get("name") or ""
-                    currency = row.get("currency") or ""
-                    # validate loaded data (will raise ValidationError if file corrupt)
-                    name = _validate_name(name)
-                    currency = _validate_currency(currency)
-                    balance = _validate_balance(balance)
-
-                    if atype == "cash":
-                        acc = CashAccount(row["id"], name, currency, balance)
-                    elif atype == "bank":
-                        acc = BankAccount(row["id"], name, currency, balance)
-                    else:
-                        acc = Account(row["id"], name, row.get("account_type", ""), currency, balance)
-
-                    self.accounts.append(acc)
+            for rows in chunks:
+                for row in rows:
+                    acc = _account_from_row(row, trusted)
+                    if acc.id in self._by_id:
+                        raise ValidationError(f"Account with id {acc.id} already exists")
+                    self._by_id[acc.id] = acc
         except ValidationError:
             # re-raise validation errors to caller
             raise
         except Exception as e:
             raise StorageError(e)
+        finally:
+            self._changed("load")
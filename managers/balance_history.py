@@ -0,0 +1,177 @@
+from typing import Dict, List, Optional
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from validators import parse_date_ymd, ymd_ordinal
+
+
+def _signed(category: str, amount: float) -> float:
+    return amount if category.lower() == "income" else -amount
+
+
+class _Series:
+    """
+    A Fenwick tree of one account's net flow per day, indexed by the day's
+    offset from origin (a date ordinal); tree is 1-based and values holds
+    each day's flow. Every flow, backdated or not, is a point update in
+    O(log d) for d days spanned. A date outside the span grows it: past the
+    end the capacity doubles, before origin the origin moves back by at
+    least the current capacity. Each growth is one O(d) rebuild and at least
+    doubles d, so a series grows O(log d) times in all.
+    """
+
+    __slots__ = ("origin", "values", "tree")
+
+    def __init__(self, origin: int, capacity: int = 64):
+        self.origin = origin
+        self.values: List[float] = [0.0] * capacity
+        self.tree: List[float] = [0.0] * (capacity + 1)
+
+    def add(self, ordinal: int, delta: float):
+        i = ordinal - self.origin
+        if not 0 <= i < len(self.values):
+            self._grow(ordinal)
+            i = ordinal - self.origin
+        self.values[i] += delta
+        tree = self.tree
+        n = len(tree)
+        i += 1
+        while i < n:
+            tree[i] += delta
+            i += i & -i
+
+    def _grow(self, ordinal: int):
+        size = len(self.values)
+        if ordinal < self.origin:
+            shift = max(self.origin - ordinal, size)
+            self.values[:0] = [0.0] * shift
+            self.origin -= shift
+        else:
+            capacity = size
+            while ordinal - self.origin >= capacity:
+                capacity *= 2
+            self.values.extend([0.0] * (capacity - size))
+        self._rebuild()
+
+    def _rebuild(self):
+        tree = [0.0] + self.values
+        n = len(tree)
+        for k in range(1, n):
+            parent = k + (k & -k)
+            if parent < n:
+                tree[parent] += tree[k]
+        self.tree = tree
+
+    def _prefix(self, k: int) -> float:
+        total = 0.0
+        while k > 0:
+            total += self.tree[k]
+            k -= k & -k
+        return total
+
+    def through(self, ordinal: int) -> float:
+        """Net flow of every date up to and including ordinal."""
+        return self._prefix(min(max(ordinal - self.origin + 1, 0), len(self.values)))
+
+    def total(self) -> float:
+        return self._prefix(len(self.values))
+
+
+class BalanceHistory:
+    """
+    Point-in-time balances and period net flows per account, answered in
+    O(log d) from a Fenwick tree over the d days each account's signed
+    amounts (income positive, expense negative) span.
+
+    Account.balance holds the current balance with every transaction
+    applied, so the balance on a date is the current balance minus the net
+    flow dated after it. Kept up to date from the transaction manager's
+    change events; a load marks it stale and it is rebuilt on next read.
+    """
+
+    def __init__(self, am: AccountManager, tm: TransactionManager):
+        self.am = am
+        self.tm = tm
+        self._stale = True
+        tm.subscribe(self._on_transaction)
+
+    def close(self):
+        self.tm.unsubscribe(self._on_transaction)
+
+    # ---- reading
+
+    def net_flow(self, account_id: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> float:
+        """Income minus expenses of account_id dated within the inclusive bounds."""
+        series = self._series_of(account_id)
+        if series is None:
+            return 0.0
+        upper = series.total() if date_to is None else series.through(self._ordinal(date_to))
+        lower = 0.0 if date_from is None else series.through(self._ordinal(date_from) - 1)
+        return upper - lower
+
+    def balance_as_of(self, account_id: str, date: str) -> float:
+        """Balance of account_id at the end of date (YYYY-MM-DD)."""
+        acc = self.am.get(account_id)
+        series = self._series_of(account_id)
+        if series is None:
+            return acc.balance
+        return acc.balance - (series.total() - series.through(self._ordinal(date)))
+
+    def balances_as_of(self, date: str) -> Dict[str, float]:
+        """balance_as_of() for every account, as {account_id: balance}."""
+        ordinal = self._ordinal(date)
+        if self._stale:
+            self.rebuild()
+        out = {}
+        for acc in self.am.list_all():
+            series = self._series.get(acc.id)
+            out[acc.id] = acc.balance if series is None else acc.balance - (series.total() - series.through(ordinal))
+        return out
+
+    def rebuild(self):
+        self._series: Dict[str, _Series] = {}
+        flows: Dict[str, Dict[int, float]] = {}
+        for tx in self.tm.list_all():
+            by_date = flows.setdefault(tx.account_id, {})
+            ordinal = tx.date_ordinal
+            by_date[ordinal] = by_date.get(ordinal, 0.0) + _signed(tx.category, tx.amount)
+        for account_id, by_date in flows.items():
+            origin = min(by_date)
+            series = self._series[account_id] = _Series(origin, max(by_date) - origin + 1)
+            for ordinal, flow in by_date.items():
+                series.values[ordinal - origin] = flow
+            series._rebuild()
+        self._stale = False
+
+    def _series_of(self, account_id: str) -> Optional[_Series]:
+        if self._stale:
+            self.rebuild()
+        return self._series.get(account_id)
+
+    @staticmethod
+    def _ordinal(date: str) -> int:
+        return ymd_ordinal(parse_date_ymd(date))
+
+    # ---- incremental maintenance
+
+    def _apply(self, account_id: str, date: str, category: str, amount: float, sign: int):
+        ordinal = ymd_ordinal(date)
+        series = self._series.get(account_id)
+        if series is None:
+            series = self._series[account_id] = _Series(ordinal)
+        series.add(ordinal, sign * _signed(category, amount))
+
+    def _on_transaction(self, _manager, event, old, new):
+        if self._stale:
+            return
+        if event == "load":
+            self._stale = True
+            return
+        if old is not None:
+            # update passes a dict snapshot, delete the removed object
+            if isinstance(old, dict):
+                self._apply(old["account_id"], old["date"], old["category"], old["amount"], -1)
+            else:
+                self._apply(old.account_id, old.date, old.category, old.amount, -1)
+        if new is not None:
+            self._apply(new.account_id, new.date, new.category, new.amount, 1)
@@ -1,94 +1,186 @@
-import csv
 import os
-from typing import List
-from datetime import datetime
+from sys import intern
+from typing import Dict, Iterable, List, Optional
 
 from models.budget import Budget
-from exceptions import ValidationError, StorageError
-
-def _validate_month(month_str: str):
-    # expect YYYY-MM
-    try:
-        datetime.strptime(month_str, "%Y-%m")
-    except Exception:
-        raise ValidationError("Month must be in YYYY-MM format")
-    return month_str
-
-def _validate_limit(limit):
-    try:
-        l = float(limit)
-    except Exception:
-        raise ValidationError("Limit must be a number")
-    if l <= 0:
-        raise ValidationError("Limit must be positive")
-    return l
-
-class BudgetManager:
+from managers.events import ChangeNotifier
+from managers.currency import month_end_ordinal
+from storage.backend import StorageBackend
+from storage.csv_storage import iter_dicts_from_csv, write_csv_atomic
+from validators import parse_limit, parse_month_ym
+from exceptions import ValidationError, NotFoundError, StorageError
+
+BUDGET_FIELDS = ["id", "month", "category", "limit_amount"]
+
+
+class BudgetStatus:
+    """A budget next to what was spent against it in its month."""
+
+    def __init__(self, budget: Budget, currency: str, spent: float, other_spending: Dict[str, float],
+                 total_spent: Optional[float] = None):
+        self.budget = budget
+        self.currency = currency
+        self.spent = spent
+        # spending from accounts in other currencies, as {currency: amount}
+        self.other_spending = other_spending
+        # spent plus other_spending converted into currency, when rates were given
+        self.total_spent = total_spent
+        used = spent if total_spent is None else total_spent
+        self.remaining = budget.limit_amount - used
+        self.percent_used = 100.0 * used / budget.limit_amount if budget.limit_amount else 0.0
+
+    def __repr__(self):
+        return (f"BudgetStatus({self.budget.id}, spent={self.spent:.2f} {self.currency}, "
+                f"remaining={self.remaining:.2f}, percent_used={self.percent_used:.1f})")
+
+class BudgetManager(ChangeNotifier):
     def __init__(self):
-        self.budgets: List[Budget] = []
+        # id -> Budget, in insertion order
+        self._by_id: Dict[str, Budget] = {}
+        self._init_notifier()
+
+    @property
+    def budgets(self) -> List[Budget]:
+        return list(self._by_id.values())
+
+    def __len__(self):
+        return len(self._by_id)
 
     def create(self, b: Budget):
         # no duplicate-check here; tests might expect duplicate allowed or not.
         # We'll check duplicates by id to be safe:
-        if any(x.id == b.id for x in self.budgets):
+        if b.id in self._by_id:
             raise ValidationError(f"Budget with id {b.id} already exists")
 
-        b.month = _validate_month(b.month)
-        b.limit_amount = _validate_limit(b.limit_amount)
+        b.month = parse_month_ym(b.month)
+        b.limit_amount = parse_limit(b.limit_amount)
         if not isinstance(b.category, str) or not b.category:
             raise ValidationError("Category must be a non-empty string")
 
-        self.budgets.append(b)
+        self._by_id[b.id] = b
+        self._changed("create", None, b)
 
     def list_all(self) -> List[Budget]:
-        return list(self.budgets)
+        return list(self._by_id.values())
 
     def get(self, budget_id: str) -> Budget:
-        for b in self.budgets:
-            if b.id == budget_id:
-                return b
-        raise KeyError("Budget not found")
+        b = self._by_id.get(budget_id)
+        if b is None:
+            raise NotFoundError(f"Budget {budget_id} not found")
+        return b
+
+    def update(self, budget_id: str, **kwargs):
+        b = self.get(budget_id)
+        changes = {}
+        if "month" in kwargs and kwargs["month"] is not None:
+            changes["month"] = parse_month_ym(kwargs["month"])
+        if "limit_amount" in kwargs and kwargs["limit_amount"] is not None:
+            changes["limit_amount"] = parse_limit(kwargs["limit_amount"])
+        if "category" in kwargs and kwargs["category"] is not None:
+            if not isinstance(kwargs["category"], str) or not kwargs["category"]:
+                raise ValidationError("Category must be a non-empty string")
+            changes["category"] = intern(kwargs["category"])
+        old = b.to_dict()
+        for field, value in changes.items():
+            setattr(b, field, value)
+        self._changed("update", old, b)
+        return b
+
+    def status(self, month: str, rollups, converter=None) -> List[BudgetStatus]:
+        """
+        Spent, remaining and percent used for each budget of month (YYYY-MM),
+        read from a MonthlyRollups: one lookup per budget, no ledger scan.
+        With a CurrencyConverter, spending in other currencies is converted at
+        the month-end rates and counts towards remaining and percent used.
+        """
+        month = parse_month_ym(month)
+        currency = rollups.budget_currency()
+        month_end = month_end_ordinal(month)
+        result = []
+        for b in self._by_id.values():
+            if b.month != month:
+                continue
+            spending = rollups.spending(month, b.category)
+            spent = spending.pop(currency, 0.0)
+            total = None
+            if converter is not None:
+                total = spent + sum(amount * converter.factor(cur, currency, month_end)
+                                    for cur, amount in spending.items())
+            result.append(BudgetStatus(b, currency, spent, spending, total))
+        return result
 
     def delete(self, budget_id: str):
         b = self.get(budget_id)
-        self.budgets.remove(b)
+        del self._by_id[budget_id]
+        self._changed("delete", b, None)
+
+    def restore(self, row: Dict):
+        """
+        Insert or replace a budget from a row this app wrote (journal replay).
+        """
+        b = Budget.from_row(row, trusted=True)
+        old = self._by_id.get(b.id)
+        self._by_id[b.id] = b
+        if old is None:
+            self._changed("create", None, b)
+        else:
+            self._changed("update", old.to_dict(), b)
 
     # compatibility
-    def save_csv(self, path: str):
-        return self.save(path)
+    def save_csv(self, path: str, force: bool = False):
+        return self.save(path, force)
 
-    def load_csv(self, path: str):
-        return self.load(path)
+    def load_csv(self, path: str, trusted: bool = False):
+        return self.load(path, trusted)
 
-    def save(self, path: str):
-        try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["id", "month", "category", "limit_amount"])
-                writer.writeheader()
-                for b in self.budgets:
-                    writer.writerow(b.to_dict())
-        except Exception as e:
-            raise StorageError(e)
+    def save(self, path: str, force: bool = False) -> int:
+        """
+        Atomically write the budgets to path. Returns the bytes written, or 0
+        when nothing changed since this file was last loaded or saved.
+        """
+        if not force and not self.is_dirty(path):
+            return 0
+        written = write_csv_atomic(path, BUDGET_FIELDS, (b.to_dict() for b in self._by_id.values()))
+        self._mark_saved(path)
+        return written
 
-    def load(self, path: str):
-        self.budgets = []
+    def load(self, path: str, trusted: bool = False):
+        """
+        Replace the budgets with the file's contents. trusted=True skips
+        per-row validation; use it only for files this app wrote itself.
+        """
         if not os.path.exists(path):
+            self._load_rows([], trusted)
             return
+        self._load_rows(iter_dicts_from_csv(path), trusted)
+        self._mark_saved(path)
+
+    def save_to(self, backend: StorageBackend, force: bool = False) -> Optional[int]:
+        """Like save(), against any storage backend, but a skipped write returns None."""
+        location = backend.location("budgets")
+        if not force and not self._is_dirty_at(location, backend.exists("budgets")):
+            return None
+        written = backend.save_rows("budgets", BUDGET_FIELDS, (b.to_dict() for b in self._by_id.values()))
+        self._mark_saved_at(location)
+        return written
+
+    def load_from(self, backend: StorageBackend, trusted: bool = False):
+        """Like load(), against any storage backend."""
+        self._load_rows(backend.iter_rows("budgets"), trusted)
+        self._mark_saved_at(backend.location("budgets"))
+
+    def _load_rows(self, chunks: Iterable[List[Dict]], trusted: bool):
+        self._by_id = {}
         try:
-            with open(path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    month = _validate_month(row.get("month", ""))
-                    limit = _validate_limit(row.get("limit_amount", 0))
-                    b = Budget(
-                        id=row.get("id", ""),
-                        month=month,
-                        category=row.get("category", ""),
-                        limit_amount=limit
-                    )
-                    self.budgets.append(b)
-        except ValidationError:
+            for rows in chunks:
+                for row in rows:
+                    b = Budget.from_row(row, trusted)
+                    if b.id in self._by_id:
+                        raise ValidationError(f"Budget with id {b.id} already exists")
+                    self._by_id[b.id] = b
+        except (ValidationError, StorageError):
             raise
         except Exception as e:
             raise StorageError(e)
+        finally:
+            self._changed("load")
@@ -0,0 +1,151 @@
+from typing import Dict, List, Set, Tuple
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+
+# (YYYY-MM, lower-cased category) -> {currency: [sum, number of transactions]}
+Rollups = Dict[Tuple[str, str], Dict[str, List[float]]]
+
+
+def _add(rollups: Rollups, month: str, category: str, cur: str, amount: float, count: int):
+    # buckets nothing contributes to any more are dropped, as in a rebuild
+    by_cur = rollups.get((month, category))
+    if by_cur is None:
+        by_cur = rollups[(month, category)] = {}
+    entry = by_cur.get(cur)
+    if entry is None:
+        entry = by_cur[cur] = [0.0, 0]
+    entry[0] += amount
+    entry[1] += count
+    if entry[1] <= 0:
+        del by_cur[cur]
+        if not by_cur:
+            del rollups[(month, category)]
+
+
+def _keys(category: str, description: str, wanted: Set[str]) -> Tuple[str, ...]:
+    # the menu only offers income/expense as a transaction's category, so
+    # budgets name what was bought ("Grocery"), which lands in the
+    # description; an expense counts towards a budget matching either
+    cat = category.lower()
+    desc = (description or "").strip().lower()
+    keys = (cat,) if cat in wanted else ()
+    if desc != cat and desc in wanted:
+        keys += (desc,)
+    return keys
+
+
+class MonthlyRollups:
+    """
+    Expense totals per (month, category, account currency), kept up to date
+    from the transaction and account managers' change events, so budget
+    status never scans the ledger. Income is not rolled up, and only the
+    categories some budget names get buckets, so their number follows the
+    budget set rather than the ledger's free-text descriptions. A manager
+    load, or a budget change that alters those categories, marks the
+    rollups stale and they are rebuilt on next read.
+    """
+
+    def __init__(self, am: AccountManager, tm: TransactionManager, bm: BudgetManager):
+        self.am = am
+        self.tm = tm
+        self.bm = bm
+        self._stale = True
+        am.subscribe(self._on_account)
+        tm.subscribe(self._on_transaction)
+        bm.subscribe(self._on_budget)
+
+    def close(self):
+        self.am.unsubscribe(self._on_account)
+        self.tm.unsubscribe(self._on_transaction)
+        self.bm.unsubscribe(self._on_budget)
+
+    # ---- reading
+
+    def spending(self, month: str, category: str) -> Dict[str, float]:
+        """
+        Expenses in month (YYYY-MM) matching category, as {currency: total}.
+        Only categories named by a budget are tracked; others read as {}.
+        """
+        if self._stale:
+            self.rebuild()
+        return {cur: entry[0] for cur, entry in self._rollups.get((month, category.lower()), {}).items()}
+
+    def totals(self) -> Dict[Tuple[str, str, str], float]:
+        """Every rollup as {(month, category, currency): total}."""
+        if self._stale:
+            self.rebuild()
+        return {(month, cat, cur): entry[0]
+                for (month, cat), by_cur in self._rollups.items() for cur, entry in by_cur.items()}
+
+    def budget_currency(self) -> str:
+        # budgets carry no currency; they are shown in the first account's
+        first = self.am.first()
+        return first.currency if first else "N/A"
+
+    def rebuild(self):
+        self._rollups: Rollups = {}
+        self._wanted = self._budget_categories()
+        currencies = self.am.currency_map()
+        for tx in self.tm.list_all():
+            cur = currencies.get(tx.account_id)
+            if cur is not None:
+                self._apply(tx.date, tx.category, tx.description, tx.amount, cur, 1)
+        self._stale = False
+
+    # ---- incremental maintenance
+
+    def _apply(self, date: str, category: str, description: str, amount: float, cur: str, sign: int):
+        if category.lower() == "income":
+            return
+        month = date[:7]
+        for key in _keys(category, description, self._wanted):
+            _add(self._rollups, month, key, cur, sign * amount, sign)
+
+    def _budget_categories(self) -> Set[str]:
+        return {b.category.lower() for b in self.bm.list_all()}
+
+    def _apply_account(self, account_id: str, cur: str, sign: int):
+        for tx in self.tm.query(account_id=account_id):
+            self._apply(tx.date, tx.category, tx.description, tx.amount, cur, sign)
+
+    def _on_account(self, _manager, event, old, new):
+        if self._stale:
+            return
+        if event == "load":
+            self._stale = True
+        elif event == "create":
+            self._apply_account(new.id, new.currency, 1)
+        elif event == "update":
+            if old["currency"] != new.currency:
+                self._apply_account(new.id, old["currency"], -1)
+                self._apply_account(new.id, new.currency, 1)
+        elif event == "delete":
+            self._apply_account(old.id, old.currency, -1)
+
+    def _on_transaction(self, _manager, event, old, new):
+        if self._stale:
+            return
+        if event == "load":
+            self._stale = True
+            return
+        if old is not None:
+            # update passes a dict snapshot, delete the removed object
+            if isinstance(old, dict):
+                fields = (old["account_id"], old["date"], old["category"], old["description"], old["amount"])
+            else:
+                fields = (old.account_id, old.date, old.category, old.description, old.amount)
+            acc = self.am.get_by_id(fields[0])
+            if acc is not None:
+                self._apply(fields[1], fields[2], fields[3], fields[4], acc.currency, -1)
+        if new is not None:
+            acc = self.am.get_by_id(new.account_id)
+            if acc is not None:
+                self._apply(new.date, new.category, new.description, new.amount, acc.currency, 1)
+
+    def _on_budget(self, _manager, event, old, new):
+        if self._stale:
+            return
+        if event == "load" or self._budget_categories() != self._wanted:
+            self._stale = True
@@ -0,0 +1,138 @@
+import bisect
+import calendar
+from array import array
+from functools import lru_cache
+from sys import intern
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from storage.csv_storage import iter_dicts_from_csv
+from validators import ymd_ordinal
+from exceptions import NotFoundError, StorageError
+
+if TYPE_CHECKING:
+    from managers.transaction_columns import TransactionColumns
+
+RATES_FIELDS = ["date", "currency", "rate"]
+
+# ordinal for "as late as possible": the latest rate of every currency
+LATEST = 1 << 31
+
+
+def month_end_ordinal(month: str) -> int:
+    """Ordinal of the last day of a YYYY-MM month."""
+    year, mon = int(month[:4]), int(month[5:7])
+    return ymd_ordinal(f"{month}-{calendar.monthrange(year, mon)[1]:02d}")
+
+
+class CurrencyConverter:
+    """
+    Dated exchange rates, from rows of (date, currency, rate) where rate is
+    what one unit of the currency is worth in a common base currency; list
+    the base itself with rate 1. A conversion on a date uses each currency's
+    latest rate on or before that date, or its earliest rate for older dates.
+
+    Single rates are looked up through an LRU cache keyed by (currency, date
+    ordinal). convert_columns() converts a whole TransactionColumns per
+    currency group at once.
+    """
+
+    def __init__(self, rates: Iterable[Tuple[str, str, float]] = (), cache_size: int = 1 << 14):
+        points: Dict[str, List[Tuple[int, float]]] = {}
+        for date, currency, rate in rates:
+            ordinal = ymd_ordinal(date)
+            if ordinal is None:
+                raise StorageError(f"Invalid rate date {date!r} (expected YYYY-MM-DD)")
+            if not rate > 0:
+                raise StorageError(f"Rate for {currency} on {date} must be positive")
+            points.setdefault(intern(currency.strip().upper()), []).append((ordinal, float(rate)))
+        self._ordinals: Dict[str, array] = {}
+        self._rates: Dict[str, array] = {}
+        for currency, series in points.items():
+            series.sort()
+            self._ordinals[currency] = array("q", (o for o, _ in series))
+            self._rates[currency] = array("d", (r for _, r in series))
+        self._columns = {}  # numpy copies of the series, built on first batch conversion
+        self.rate = lru_cache(maxsize=cache_size)(self._rate)
+
+    @classmethod
+    def load(cls, path: str, cache_size: int = 1 << 14) -> "CurrencyConverter":
+        """Read a date,currency,rate CSV. A missing file gives a converter with no rates."""
+        rows = []
+        for chunk in iter_dicts_from_csv(path):
+            for row in chunk:
+                try:
+                    rows.append((row["date"], row["currency"], float(row["rate"])))
+                except (KeyError, TypeError, ValueError):
+                    raise StorageError(f"Bad exchange rate row in {path}: {row}")
+        return cls(rows, cache_size)
+
+    def __bool__(self):
+        return bool(self._rates)
+
+    @property
+    def currencies(self) -> List[str]:
+        return sorted(self._rates)
+
+    def _rate(self, currency: str, ordinal: int) -> float:
+        ordinals = self._ordinals.get(currency)
+        if ordinals is None:
+            raise NotFoundError(f"No exchange rate for {currency}")
+        return self._rates[currency][max(bisect.bisect_right(ordinals, ordinal) - 1, 0)]
+
+    def factor(self, from_cur: str, to_cur: str, ordinal: int = LATEST) -> float:
+        """What one unit of from_cur is worth in to_cur on the given date ordinal."""
+        if from_cur == to_cur:
+            return 1.0
+        return self.rate(from_cur, ordinal) / self.rate(to_cur, ordinal)
+
+    def convert(self, amount: float, from_cur: str, to_cur: str, on: Optional[str] = None) -> float:
+        """amount of from_cur in to_cur, at the rates of date on (YYYY-MM-DD; default: latest)."""
+        ordinal = LATEST if on is None else ymd_ordinal(on)
+        if ordinal is None:
+            raise StorageError(f"Invalid date {on!r} (expected YYYY-MM-DD)")
+        return amount * self.factor(from_cur, to_cur, ordinal)
+
+    def convert_columns(self, cols: "TransactionColumns", currency_map: Dict[str, str], to_cur: str):
+        """
+        Every amount of cols in to_cur at its own date's rates, as a column
+        like cols.amounts. Rows of accounts missing from currency_map are 0.
+
+        The account -> currency mapping is resolved once per account label,
+        not per row. With numpy, each currency's rates are found for all its
+        rows with one searchsorted. Without numpy, each row is a cached
+        (currency, date) lookup.
+        """
+        from managers.transaction_columns import np
+        row_currency = [currency_map.get(label) for label in cols.account_labels]
+        foreign = set(row_currency) - {None, to_cur}
+        for cur in sorted(foreign | {to_cur} if foreign else ()):
+            if cur not in self._rates:
+                raise NotFoundError(f"No exchange rate for {cur}")
+
+        if np is None:
+            factor = self.factor
+            return [amount * factor(row_currency[acc], to_cur, ordinal) if row_currency[acc] else 0.0
+                    for amount, acc, ordinal in zip(cols.amounts, cols.account_codes, cols.date_ordinals)]
+
+        labels = sorted(set(row_currency) - {None})
+        code_of = {cur: i for i, cur in enumerate(labels)}
+        per_account = np.array([code_of.get(cur, -1) for cur in row_currency] or [-1], dtype=np.int32)
+        codes = per_account[cols.account_codes] if len(cols) else np.zeros(0, dtype=np.int32)
+        out = np.zeros(len(cols), dtype=np.float64)
+        for i, cur in enumerate(labels):
+            mask = codes == i
+            if cur == to_cur:
+                out[mask] = cols.amounts[mask]
+                continue
+            ordinals = cols.date_ordinals[mask]
+            out[mask] = cols.amounts[mask] * self._rates_at(np, cur, ordinals) / self._rates_at(np, to_cur, ordinals)
+        return out
+
+    def _rates_at(self, np, currency: str, ordinals):
+        series = self._columns.get(currency)
+        if series is None:
+            series = self._columns[currency] = (np.frombuffer(self._ordinals[currency], dtype=np.int64),
+                                                np.frombuffer(self._rates[currency], dtype=np.float64))
+        days, rates = series
+        index = np.searchsorted(days, ordinals, side="right") - 1
+        return rates[np.maximum(index, 0)]
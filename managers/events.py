@@ -0,0 +1,56 @@
+import os
+from typing import Callable, List, Optional
+
+# listener(manager, event, old, new)
+#   event "create": old is None, new is the created object
+#   event "update": old is a to_dict() snapshot taken before the change, new is the object
+#   event "delete": old is the removed object, new is None
+#   event "load":   old and new are None; the whole dataset was replaced
+Listener = Callable[[object, str, object, object], None]
+
+
+class ChangeNotifier:
+    """
+    Mixin for the managers: keeps a version counter that is bumped on every
+    mutation and tells subscribed listeners what changed. The version last
+    loaded from / saved to a file tells save() whether a rewrite is needed.
+    """
+
+    def _init_notifier(self):
+        self._listeners: List[Listener] = []
+        self.version = 0
+        self._saved_at: Optional[tuple] = None  # (location, version)
+
+    @property
+    def dirty(self) -> bool:
+        return self.is_dirty()
+
+    def is_dirty(self, path: Optional[str] = None) -> bool:
+        """True if memory differs from the last file loaded/saved (or from path)."""
+        if path is None:
+            return self._saved_at is None or self.version != self._saved_at[1]
+        return self._is_dirty_at(os.path.abspath(path), os.path.exists(path))
+
+    def _is_dirty_at(self, location: str, exists: bool) -> bool:
+        if self._saved_at is None or not exists:
+            return True
+        saved_location, saved_version = self._saved_at
+        return location != saved_location or self.version != saved_version
+
+    def _mark_saved(self, path: str):
+        self._mark_saved_at(os.path.abspath(path))
+
+    def _mark_saved_at(self, location: str):
+        self._saved_at = (location, self.version)
+
+    def subscribe(self, listener: Listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _changed(self, event: str, old=None, new=None):
+        self.version += 1
+        for listener in list(self._listeners):
+            listener(self, event, old, new)
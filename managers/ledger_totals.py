@@ -0,0 +1,228 @@
+from typing import Dict, List, Tuple
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+from managers.currency import CurrencyConverter, month_end_ordinal
+from exceptions import ConsistencyError
+
+# totals are compared with a small tolerance: incremental float updates can
+# drift from a fresh sum by rounding noise
+_TOLERANCE = 1e-6
+
+# below this many transactions a plain loop is cheaper than importing numpy
+# and building the columnar view
+COLUMNAR_MIN_ROWS = 20_000
+
+
+def _add(totals: Dict[str, List[float]], cur: str, amount: float, count: int):
+    # each entry is [sum, number of contributing rows]; a currency disappears
+    # once nothing contributes to it any more, like in a fresh recompute
+    entry = totals.get(cur)
+    if entry is None:
+        entry = totals[cur] = [0.0, 0]
+    entry[0] += amount
+    entry[1] += count
+    if entry[1] <= 0:
+        del totals[cur]
+
+
+def _is_income(category: str) -> bool:
+    return category.lower() == "income"
+
+
+class LedgerTotals:
+    """
+    Materialized per-currency balance, income, expense and budget totals.
+
+    Subscribes to the three managers and applies every create/update/delete
+    as an O(1) delta, so reading the summary does not touch the ledger. A
+    manager load marks the totals stale and they are rebuilt on next read.
+    With check=True every snapshot() is verified against a full recompute.
+    """
+
+    def __init__(self, am: AccountManager, tm: TransactionManager, bm: BudgetManager, check: bool = False):
+        self.am = am
+        self.tm = tm
+        self.bm = bm
+        self.check = check
+        self._stale = True
+        am.subscribe(self._on_account)
+        tm.subscribe(self._on_transaction)
+        bm.subscribe(self._on_budget)
+
+    def close(self):
+        self.am.unsubscribe(self._on_account)
+        self.tm.unsubscribe(self._on_transaction)
+        self.bm.unsubscribe(self._on_budget)
+
+    # ---- reading
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return {"balance"|"income"|"expense"|"budget": {currency: total}}.
+        Budgets carry no currency and are reported in the first account's
+        currency, as the budget listing does.
+        """
+        if self._stale:
+            self.rebuild()
+        result = {
+            "balance": {c: e[0] for c, e in self._balance.items()},
+            "income": {c: e[0] for c, e in self._income.items()},
+            "expense": {c: e[0] for c, e in self._expense.items()},
+            "budget": {},
+        }
+        if self._budget_count:
+            first = self.am.first()
+            result["budget"][first.currency if first else "N/A"] = self._budget_total
+        if self.check:
+            drift = self.verify(result)
+            if drift:
+                raise ConsistencyError(f"Ledger totals drifted: {drift}")
+        return result
+
+    def verify(self, snapshot=None) -> Dict[Tuple[str, str], Tuple[float, float]]:
+        """
+        Recompute every total from scratch and diff against the maintained
+        values. Returns {(kind, currency): (maintained, recomputed)} for each
+        mismatch; an empty dict means the totals are consistent.
+        """
+        if snapshot is None:
+            check, self.check = self.check, False
+            try:
+                snapshot = self.snapshot()
+            finally:
+                self.check = check
+        fresh = self.recompute()
+        drift = {}
+        for kind, totals in fresh.items():
+            for cur in set(totals) | set(snapshot[kind]):
+                kept = snapshot[kind].get(cur)
+                want = totals.get(cur)
+                if kept is None or want is None or abs(kept - want) > _TOLERANCE:
+                    drift[(kind, cur)] = (kept, want)
+        return drift
+
+    def recompute(self) -> Dict[str, Dict[str, float]]:
+        balance: Dict[str, float] = {}
+        for acc in self.am.list_all():
+            balance[acc.currency] = balance.get(acc.currency, 0.0) + acc.balance
+        income, expense = self.tm.columns().totals_by_currency(self.am.currency_map())
+        budget: Dict[str, float] = {}
+        budgets = self.bm.list_all()
+        if budgets:
+            first = self.am.first()
+            budget[first.currency if first else "N/A"] = sum(b.limit_amount for b in budgets)
+        return {"balance": balance, "income": income, "expense": expense, "budget": budget}
+
+    def consolidated(self, converter: CurrencyConverter, currency: str) -> Dict[str, float]:
+        """
+        Balance, income, expense and budget totals converted into one
+        reporting currency: flows at the rates of their own dates, balances at
+        the latest rates and budgets at the end of their month. Large ledgers
+        convert their flows in one batch over the columnar view.
+        """
+        currency_map = self.am.currency_map()
+        balance = sum(converter.convert(a.balance, a.currency, currency) for a in self.am.list_all())
+        if len(self.tm) >= COLUMNAR_MIN_ROWS:
+            cols = self.tm.columns()
+            income, expense = cols.income_expense(converter.convert_columns(cols, currency_map, currency))
+        else:
+            income = expense = 0.0
+            factor = converter.factor
+            for tx in self.tm.list_all():
+                cur = currency_map.get(tx.account_id)
+                if cur is None:
+                    continue
+                amount = tx.amount * factor(cur, currency, tx.date_ordinal)
+                if _is_income(tx.category):
+                    income += amount
+                else:
+                    expense += amount
+        budget = 0.0
+        first = self.am.first()
+        if first is not None:
+            # budgets are in the first account's currency, as in snapshot()
+            budget = sum(b.limit_amount * converter.factor(first.currency, currency, month_end_ordinal(b.month))
+                         for b in self.bm.list_all())
+        return {"balance": balance, "income": income, "expense": expense, "budget": budget}
+
+    def rebuild(self):
+        self._balance: Dict[str, List[float]] = {}
+        self._income: Dict[str, List[float]] = {}
+        self._expense: Dict[str, List[float]] = {}
+        self._budget_total = 0.0
+        self._budget_count = 0
+        currencies = {}
+        for acc in self.am.list_all():
+            currencies[acc.id] = acc.currency
+            _add(self._balance, acc.currency, acc.balance, 1)
+        for tx in self.tm.list_all():
+            cur = currencies.get(tx.account_id)
+            if cur is not None:
+                self._apply_tx(cur, tx.category, tx.amount, 1)
+        for b in self.bm.list_all():
+            self._budget_total += b.limit_amount
+            self._budget_count += 1
+        self._stale = False
+
+    # ---- incremental maintenance
+
+    def _apply_tx(self, cur: str, category: str, amount: float, sign: int):
+        target = self._income if _is_income(category) else self._expense
+        _add(target, cur, sign * amount, sign)
+
+    def _apply_account_flows(self, account_id: str, cur: str, sign: int):
+        for tx in self.tm.query(account_id=account_id):
+            self._apply_tx(cur, tx.category, tx.amount, sign)
+
+    def _on_account(self, _manager, event, old, new):
+        if self._stale:
+            return
+        if event == "load":
+            self._stale = True
+        elif event == "create":
+            _add(self._balance, new.currency, new.balance, 1)
+            self._apply_account_flows(new.id, new.currency, 1)
+        elif event == "update":
+            _add(self._balance, old["currency"], -old["balance"], -1)
+            _add(self._balance, new.currency, new.balance, 1)
+            if old["currency"] != new.currency:
+                self._apply_account_flows(new.id, old["currency"], -1)
+                self._apply_account_flows(new.id, new.currency, 1)
+        elif event == "delete":
+            _add(self._balance, old.currency, -old.balance, -1)
+            self._apply_account_flows(old.id, old.currency, -1)
+
+    def _on_transaction(self, _manager, event, old, new):
+        if self._stale:
+            return
+        if event == "load":
+            self._stale = True
+            return
+        if old is not None:
+            # update passes a dict snapshot, delete the removed object
+            if isinstance(old, dict):
+                account_id, category, amount = old["account_id"], old["category"], old["amount"]
+            else:
+                account_id, category, amount = old.account_id, old.category, old.amount
+            acc = self.am.get_by_id(account_id)
+            if acc is not None:
+                self._apply_tx(acc.currency, category, amount, -1)
+        if new is not None:
+            acc = self.am.get_by_id(new.account_id)
+            if acc is not None:
+                self._apply_tx(acc.currency, new.category, new.amount, 1)
+
+    def _on_budget(self, _manager, event, old, new):
+        if self._stale:
+            return
+        if event == "load":
+            self._stale = True
+            return
+        if old is not None:
+            self._budget_total -= old["limit_amount"] if isinstance(old, dict) else old.limit_amount
+            self._budget_count -= 1
+        if new is not None:
+            self._budget_total += new.limit_amount
+            self._budget_count += 1
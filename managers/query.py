@@ -0,0 +1,242 @@
+"""
+A small filter language over TransactionManager, e.g.
+
+    account=11 category=expense date>=2025-11-01 amount>500 desc~grocery order by amount desc limit 10
+
+Terms are field<op>value, separated by spaces (quote values that contain
+spaces). Fields: id, account, category, date, amount, desc. Operators:
+= != > >= < <= and ~ (case-insensitive substring). Category and desc
+compare case-insensitively. "order by <field> [asc|desc]" and
+"limit <n>" are optional; without an order, rows come in (date, id) order.
+
+compile_query() parses the text, plan() picks the cheapest access path the
+manager's indexes offer (id lookup, account or category set, date range,
+or a full scan) and leaves the other terms as residual filters; execute()
+runs it, using a bounded heap for ORDER BY ... LIMIT.
+"""
+import bisect
+import heapq
+import re
+import shlex
+from itertools import islice
+from operator import attrgetter, eq, ge, gt, itemgetter, le, lt, ne
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from models.transaction import Transaction
+from validators import ordinal_ymd, parse_date_ymd, ymd_ordinal
+from exceptions import ValidationError
+
+FIELDS = {"id": "id", "account": "account_id", "account_id": "account_id", "category": "category",
+          "date": "date", "amount": "amount", "desc": "description", "description": "description"}
+_TERM = re.compile(r"^([A-Za-z_]+)(>=|<=|!=|=|>|<|~)(.*)$")
+_CASELESS = ("category", "description")
+_OPS = {"=": eq, "!=": ne, ">": gt, ">=": ge, "<": lt, "<=": le, "~": lambda text, part: part in text}
+
+
+class Term:
+    def __init__(self, field: str, op: str, value):
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def __repr__(self):
+        name = {"account_id": "account", "description": "desc"}.get(self.field, self.field)
+        return f"{name}{self.op}{self.value}"
+
+    def predicate(self) -> Callable[[Transaction], bool]:
+        field, value = self.field, self.value
+        compare = _OPS[self.op]
+        if field in _CASELESS:
+            value = value.lower()
+            return lambda tx: compare((getattr(tx, field) or "").lower(), value)
+        get = attrgetter(field)
+        return lambda tx: compare(get(tx), value)
+
+
+class Query:
+    def __init__(self, terms: List[Term], order: Optional[Tuple[str, bool]] = None, limit: Optional[int] = None):
+        self.terms = terms
+        self.order = order  # (field, descending)
+        self.limit = limit
+
+
+def _value(field: str, op: str, raw: str):
+    if op == "~" and field not in ("category", "description", "id", "account_id"):
+        raise ValidationError(f"~ only applies to text fields, not {field}")
+    if field == "amount":
+        try:
+            return float(raw)
+        except ValueError:
+            raise ValidationError(f"amount needs a number, got {raw!r}")
+    if field == "date":
+        # stored dates are zero-padded; compare against the same form
+        return ordinal_ymd(ymd_ordinal(parse_date_ymd(raw)))
+    return raw
+
+
+def compile_query(text: str) -> Query:
+    """Parse query text into a Query. Raises ValidationError on bad syntax."""
+    try:
+        tokens = shlex.split(text)
+    except ValueError as e:
+        raise ValidationError(f"Bad query: {e}")
+    terms: List[Term] = []
+    order = None
+    limit = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        word = token.lower()
+        if word == "and":
+            i += 1
+            continue
+        if word == "order":
+            if i + 2 >= len(tokens) or tokens[i + 1].lower() != "by":
+                raise ValidationError("Expected 'order by <field> [asc|desc]'")
+            field = FIELDS.get(tokens[i + 2].lower())
+            if field is None:
+                raise ValidationError(f"Unknown field {tokens[i + 2]!r}")
+            i += 3
+            descending = False
+            if i < len(tokens) and tokens[i].lower() in ("asc", "desc"):
+                descending = tokens[i].lower() == "desc"
+                i += 1
+            order = (field, descending)
+            continue
+        if word == "limit":
+            if i + 1 >= len(tokens) or not tokens[i + 1].isdigit():
+                raise ValidationError("Expected 'limit <n>'")
+            limit = int(tokens[i + 1])
+            i += 2
+            continue
+        m = _TERM.match(token)
+        if m is None:
+            raise ValidationError(f"Expected field<op>value, got {token!r}")
+        field = FIELDS.get(m.group(1).lower())
+        if field is None:
+            raise ValidationError(f"Unknown field {m.group(1)!r}")
+        terms.append(Term(field, m.group(2), _value(field, m.group(2), m.group(3))))
+        i += 1
+    return Query(terms, order, limit)
+
+
+class Plan:
+    """How execute() will answer a query: an access path plus residual filters."""
+
+    def __init__(self, access: str, rows: Callable[[], Iterable[Transaction]], estimate: int,
+                 residual: List[Term], ordered: bool, query: Query):
+        self.access = access
+        self.rows = rows          # candidate rows from the access path
+        self.estimate = estimate  # number of candidates
+        self.residual = residual
+        self.ordered = ordered    # candidates already come in (date, id) order
+        self.query = query
+
+    def explain(self) -> str:
+        lines = [f"access: {self.access} (~{self.estimate} rows)"]
+        if self.residual:
+            lines.append("filter: " + " ".join(map(repr, self.residual)))
+        order = self.query.order
+        if order is not None:
+            how = "heap top-k" if self.query.limit is not None else "sort"
+            lines.append(f"order: {order[0]} {'desc' if order[1] else 'asc'} ({how})")
+        elif not self.ordered:
+            lines.append("order: date, id (sort)")
+        if self.query.limit is not None:
+            lines.append(f"limit: {self.query.limit}")
+        return "\n".join(lines)
+
+
+def _date_bounds(terms: List[Term]) -> Tuple[Optional[str], Optional[str], bool, bool, List[Term]]:
+    """Tightest [lo, hi] over the date terms; also returns the terms a range does not cover."""
+    lo = hi = None
+    lo_open = hi_open = False
+    uncovered = []
+    for t in terms:
+        if t.field != "date" or t.op == "!=":
+            uncovered.append(t)
+            continue
+        if t.op in ("=", ">=", ">") and (lo is None or t.value > lo or (t.value == lo and t.op == ">")):
+            lo, lo_open = t.value, t.op == ">"
+        if t.op in ("=", "<=", "<") and (hi is None or t.value < hi or (t.value == hi and t.op == "<")):
+            hi, hi_open = t.value, t.op == "<"
+    return lo, hi, lo_open, hi_open, uncovered
+
+
+def plan(tm, query: Query) -> Plan:
+    """
+    Pick the access path with the fewest candidate rows. The planner reads
+    TransactionManager's indexes directly: id dict, account and category id
+    sets, and the sorted (date, id) list.
+    """
+    by_id, by_date = tm._by_id, tm._by_date
+    terms = query.terms
+    options = []
+
+    for t in terms:
+        if t.field == "id" and t.op == "=":
+            tx = by_id.get(t.value)
+            rows = [tx] if tx is not None else []
+            options.append((len(rows), f"id lookup {t.value}", (lambda rows=rows: rows), True,
+                            [x for x in terms if x is not t]))
+        elif t.field in ("account_id", "category") and t.op == "=":
+            index = tm._by_account if t.field == "account_id" else tm._by_category
+            ids = index.get(t.value if t.field == "account_id" else t.value.lower(), ())
+            name = "account" if t.field == "account_id" else "category"
+            options.append((len(ids), f"{name} index {t.value}", (lambda ids=ids: (by_id[i] for i in ids)), False,
+                            [x for x in terms if x is not t]))
+
+    lo, hi, lo_open, hi_open, uncovered = _date_bounds(terms)
+    if lo is not None or hi is not None:
+        # bisect on the date alone; any sentinel id could sort before a real one
+        date = itemgetter(0)
+        start = 0 if lo is None else (bisect.bisect_right(by_date, lo, key=date) if lo_open
+                                      else bisect.bisect_left(by_date, lo, key=date))
+        end = len(by_date) if hi is None else (bisect.bisect_left(by_date, hi, key=date) if hi_open
+                                              else bisect.bisect_right(by_date, hi, key=date))
+        end = max(start, end)
+        options.append((end - start, f"date range {lo or '-inf'}..{hi or '+inf'}",
+                        (lambda: (by_id[i] for _, i in islice(by_date, start, end))), True, uncovered))
+
+    if query.order is None:
+        options.append((len(by_id), "full scan", (lambda: (by_id[i] for _, i in by_date)), True, list(terms)))
+    else:
+        # the result gets re-ordered anyway, so skip the walk over the date index
+        options.append((len(by_id), "full scan", by_id.values, False, list(terms)))
+    estimate, access, rows, ordered, residual = min(options, key=lambda o: o[0])
+    return Plan(access, rows, estimate, residual, ordered, query)
+
+
+def _sort_key(field: str):
+    if field in _CASELESS:
+        return lambda tx: ((getattr(tx, field) or "").lower(), tx.date, tx.id)
+    if field == "date":
+        return lambda tx: (tx.date, tx.id)
+    return lambda tx: (getattr(tx, field), tx.date, tx.id)
+
+
+def execute(p: Plan) -> List[Transaction]:
+    predicates = [t.predicate() for t in p.residual]
+    rows = p.rows()
+    if len(predicates) == 1:
+        rows = filter(predicates[0], rows)
+    elif predicates:
+        rows = (tx for tx in rows if all(pred(tx) for pred in predicates))
+    query = p.query
+    limit = query.limit
+    if query.order is None:
+        if p.ordered:
+            return list(rows if limit is None else islice(rows, limit))
+        key = _sort_key("date")
+        return sorted(rows, key=key) if limit is None else heapq.nsmallest(limit, rows, key=key)
+    field, descending = query.order
+    key = _sort_key(field)
+    if limit is None:
+        return sorted(rows, key=key, reverse=descending)
+    # O(n log k): only the best `limit` rows are ever held
+    return (heapq.nlargest if descending else heapq.nsmallest)(limit, rows, key=key)
+
+
+def run_query(tm, text: str) -> List[Transaction]:
+    """Compile, plan and execute query text against tm."""
+    return execute(plan(tm, compile_query(text)))
@@ -0,0 +1,213 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from models.account import Account
+from exceptions import NotFoundError, StorageError
+
+# drift smaller than this is float noise, not a missing transaction
+TOLERANCE = 0.005
+
+
+class AccountCheck:
+    """One account's stored balance against opening balance + net flow."""
+
+    __slots__ = ("account", "flow", "transactions")
+
+    def __init__(self, account: Account, flow: float = 0.0, transactions: int = 0):
+        self.account = account
+        self.flow = flow
+        self.transactions = transactions
+
+    @property
+    def expected(self) -> Optional[float]:
+        """None when the account has no opening balance to start from."""
+        opening = self.account.opening_balance
+        return None if opening is None else opening + self.flow
+
+    @property
+    def drift(self) -> Optional[float]:
+        """Stored minus expected balance: money that moved without a transaction."""
+        expected = self.expected
+        return None if expected is None else self.account.balance - expected
+
+    @property
+    def drifted(self) -> bool:
+        drift = self.drift
+        return drift is not None and abs(drift) >= TOLERANCE
+
+
+class Reconciliation:
+    """
+    Result of one pass over the ledger. orphans maps each missing account id
+    to the ids of its transactions; duplicates maps a transaction id to the
+    number of extra copies after the first, which alone counts.
+    """
+
+    def __init__(self, accounts: List[AccountCheck], orphans: Dict[str, List[str]],
+                 duplicates: Dict[str, int], rows: int):
+        self.accounts = accounts
+        self.orphans = orphans
+        self.duplicates = duplicates
+        self.rows = rows
+
+    @property
+    def drifted(self) -> List[AccountCheck]:
+        return [c for c in self.accounts if c.drifted]
+
+    @property
+    def unbaselined(self) -> List[AccountCheck]:
+        """Accounts without an opening balance, saved before one was kept."""
+        return [c for c in self.accounts if c.account.opening_balance is None]
+
+    @property
+    def orphan_count(self) -> int:
+        return sum(len(ids) for ids in self.orphans.values())
+
+    @property
+    def clean(self) -> bool:
+        return not (self.drifted or self.unbaselined or self.orphans or self.duplicates)
+
+
+class Reconciler:
+    """
+    Streams a ledger once, in any order, and groups it by account: net flow
+    and transaction count per account, transactions of accounts that no
+    longer exist, and repeated transaction ids. Work is O(1) per row and
+    memory is one set of ids plus one entry per account, so ledgers too
+    large to load into a TransactionManager reconcile in linear time.
+
+        rec = Reconciler(am)
+        for rows in backend.iter_rows("transactions"):
+            rec.add_rows(rows)
+        report = rec.report()
+    """
+
+    def __init__(self, am: AccountManager):
+        self.am = am
+        self._known = {a.id for a in am.list_all()}
+        # account id -> [net flow, transactions, orphaned ids or None]
+        self._groups: Dict[str, list] = {}
+        self._seen = set()
+        self._duplicates: Dict[str, int] = {}
+        self.rows = 0
+
+    def add_rows(self, rows: Iterable[Dict]):
+        """Feed row dicts as the storage backends yield them."""
+        try:
+            for row in rows:
+                self._add(row["id"], row["account_id"], float(row["amount"]), row["category"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise StorageError(f"Unreadable transaction row {self.rows + 1}: {e}")
+
+    def add_transactions(self, txs: Iterable):
+        """Feed Transaction objects, e.g. a loaded manager's list_all()."""
+        for tx in txs:
+            self._add(tx.id, tx.account_id, tx.amount, tx.category)
+
+    def _add(self, tx_id: str, account_id: str, amount: float, category: str):
+        self.rows += 1
+        seen = self._seen
+        if tx_id in seen:
+            self._duplicates[tx_id] = self._duplicates.get(tx_id, 0) + 1
+            return
+        seen.add(tx_id)
+        group = self._groups.get(account_id)
+        if group is None:
+            group = self._groups[account_id] = [0.0, 0, None if account_id in self._known else []]
+        group[0] += amount if category.lower() == "income" else -amount
+        group[1] += 1
+        if group[2] is not None:
+            group[2].append(tx_id)
+
+    def report(self) -> Reconciliation:
+        accounts = []
+        orphans = {}
+        for acc in self.am.list_all():
+            group = self._groups.get(acc.id)
+            accounts.append(AccountCheck(acc) if group is None else AccountCheck(acc, group[0], group[1]))
+        for account_id, (_flow, _count, ids) in self._groups.items():
+            if ids is not None:
+                orphans[account_id] = ids
+        return Reconciliation(accounts, orphans, dict(self._duplicates), self.rows)
+
+
+def reconcile(am: AccountManager, chunks: Iterable[Iterable[Dict]]) -> Reconciliation:
+    """One pass over chunks of transaction rows (e.g. a backend's iter_rows)."""
+    rec = Reconciler(am)
+    for rows in chunks:
+        rec.add_rows(rows)
+    return rec.report()
+
+
+def reconcile_manager(am: AccountManager, tm: TransactionManager) -> Reconciliation:
+    """reconcile() over a loaded ledger. It cannot hold duplicate ids."""
+    rec = Reconciler(am)
+    rec.add_transactions(tm.list_all())
+    return rec.report()
+
+
+def without_duplicates(chunks: Iterable[Iterable[Dict]]) -> Iterator[Dict]:
+    """The rows of chunks, keeping only the first row of each transaction id."""
+    seen = set()
+    for rows in chunks:
+        for row in rows:
+            if row["id"] not in seen:
+                seen.add(row["id"])
+                yield row
+
+
+class LedgerOverlay:
+    """
+    Collects the transaction records of a journal replay (pass it to
+    Journal.replay as the "transactions" manager) so they can be laid over
+    the saved ledger while it streams, without loading the ledger.
+    """
+
+    def __init__(self):
+        # id -> latest row, or None once deleted
+        self.changes: Dict[str, Optional[Dict]] = {}
+
+    def restore(self, row: Dict):
+        self.changes[row["id"]] = row
+
+    def delete(self, tx_id: str):
+        self.changes[tx_id] = None
+
+    def apply(self, chunks: Iterable[List[Dict]]) -> Iterator[List[Dict]]:
+        changes = self.changes
+        if not changes:
+            yield from chunks
+            return
+        for rows in chunks:
+            yield [r for r in rows if r["id"] not in changes]
+        yield [r for r in changes.values() if r is not None]
+
+
+def fix(report: Reconciliation, am: AccountManager, tm: Optional[TransactionManager] = None,
+        drop_orphans: bool = False) -> Dict[str, int]:
+    """
+    Repair what report found, through the managers so the journal sees it:
+    accounts without an opening balance get the one their stored balance
+    implies, drifted balances are set back to the expected value, and with
+    drop_orphans the orphaned transactions are deleted from tm. Duplicate
+    ids cannot be loaded into tm; rewrite the ledger through
+    without_duplicates() first. Returns the number of each repair.
+    """
+    done = {"baselined": 0, "rebalanced": 0, "orphans_dropped": 0}
+    for check in report.accounts:
+        if check.account.opening_balance is None:
+            am.update(check.account.id, opening_balance=check.account.balance - check.flow)
+            done["baselined"] += 1
+        elif check.drifted:
+            am.adjust_balance(check.account.id, -check.drift)
+            done["rebalanced"] += 1
+    if drop_orphans and tm is not None:
+        for ids in report.orphans.values():
+            for tx_id in ids:
+                try:
+                    tm.delete(tx_id)
+                except NotFoundError:
+                    continue
+                done["orphans_dropped"] += 1
+    return done
@@ -0,0 +1,172 @@
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.transaction import Transaction
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; aggregates fall back to plain Python
+    np = None
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _encode(values: Iterable[str]) -> Tuple[List[int], List[str]]:
+    # categorical encoding: each distinct string gets a small int code
+    codes = []
+    labels: List[str] = []
+    lookup: Dict[str, int] = {}
+    for v in values:
+        code = lookup.get(v)
+        if code is None:
+            code = lookup[v] = len(labels)
+            labels.append(v)
+        codes.append(code)
+    return codes, labels
+
+
+class TransactionColumns:
+    """
+    Column-oriented copy of a ledger: date ordinals, amounts and categorical
+    codes for account_id and category. Aggregates run as NumPy reductions when
+    numpy is installed and as plain loops otherwise.
+    """
+
+    def __init__(self, transactions: Iterable[Transaction]):
+        txs = list(transactions)
+        self.ids: List[str] = [t.id for t in txs]
+        self.descriptions: List[str] = [t.description for t in txs]
+        account_codes, self.account_labels = _encode(t.account_id for t in txs)
+        # category codes are case-folded, the same way the summary compares them
+        category_codes, self.category_labels = _encode(t.category.lower() for t in txs)
+        self._categories = [t.category for t in txs]
+        ordinals = [t.date_ordinal for t in txs]
+        amounts = [t.amount for t in txs]
+        if np is not None:
+            self.date_ordinals = np.array(ordinals, dtype=np.int64)
+            self.amounts = np.array(amounts, dtype=np.float64)
+            self.account_codes = np.array(account_codes, dtype=np.int32)
+            self.category_codes = np.array(category_codes, dtype=np.int32)
+        else:
+            self.date_ordinals = ordinals
+            self.amounts = amounts
+            self.account_codes = account_codes
+            self.category_codes = category_codes
+
+    def __len__(self):
+        return len(self.ids)
+
+    # object view over the columns
+    def row(self, i: int) -> Transaction:
+        return Transaction(
+            self.ids[i],
+            self.account_labels[self.account_codes[i]],
+            date.fromordinal(int(self.date_ordinals[i])).isoformat(),
+            float(self.amounts[i]),
+            self._categories[i],
+            self.descriptions[i],
+        )
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for i in range(len(self.ids)):
+            yield self.row(i)
+
+    def _category_code(self, category: str) -> Optional[int]:
+        try:
+            return self.category_labels.index(category.lower())
+        except ValueError:
+            return None
+
+    def sum_by_account(self, category: Optional[str] = None, exclude: bool = False) -> Dict[str, float]:
+        """
+        Total amount per account_id. With a category, only rows of that
+        category are summed, or every other row when exclude is True.
+        """
+        n = len(self.account_labels)
+        code = None if category is None else self._category_code(category)
+        if category is not None and code is None and not exclude:
+            return {}
+        if np is not None:
+            if code is None:
+                weights = self.amounts
+            else:
+                keep = (self.category_codes != code) if exclude else (self.category_codes == code)
+                weights = np.where(keep, self.amounts, 0.0)
+            sums = np.bincount(self.account_codes, weights=weights, minlength=n)
+            return {label: float(sums[i]) for i, label in enumerate(self.account_labels)}
+        sums = [0.0] * n
+        for acc, cat, amt in zip(self.account_codes, self.category_codes, self.amounts):
+            if code is None or (cat == code) != exclude:
+                sums[acc] += amt
+        return dict(zip(self.account_labels, sums))
+
+    def sum_by_account_category(self) -> Dict[Tuple[str, str], float]:
+        n_cat = len(self.category_labels)
+        if not n_cat:
+            return {}
+        if np is not None:
+            keys = self.account_codes.astype(np.int64) * n_cat + self.category_codes
+            sums = np.bincount(keys, weights=self.amounts, minlength=len(self.account_labels) * n_cat)
+            nz = np.nonzero(sums)[0]
+            return {
+                (self.account_labels[k // n_cat], self.category_labels[k % n_cat]): float(sums[k])
+                for k in nz.tolist()
+            }
+        out: Dict[Tuple[str, str], float] = {}
+        for acc, cat, amt in zip(self.account_codes, self.category_codes, self.amounts):
+            key = (self.account_labels[acc], self.category_labels[cat])
+            out[key] = out.get(key, 0.0) + amt
+        return out
+
+    def sum_by_month(self, category: Optional[str] = None) -> Dict[str, float]:
+        """Total amount per YYYY-MM, optionally for one category only."""
+        code = None if category is None else self._category_code(category)
+        if category is not None and code is None:
+            return {}
+        if np is not None:
+            mask = slice(None) if code is None else self.category_codes == code
+            days = (self.date_ordinals[mask] - _EPOCH_ORDINAL).astype("datetime64[D]")
+            months, inverse = np.unique(days.astype("datetime64[M]"), return_inverse=True)
+            sums = np.zeros(len(months), dtype=np.float64)
+            np.add.at(sums, inverse, self.amounts[mask])
+            return {str(m): float(s) for m, s in zip(months, sums)}
+        out: Dict[str, float] = {}
+        for o, cat, amt in zip(self.date_ordinals, self.category_codes, self.amounts):
+            if code is None or cat == code:
+                month = date.fromordinal(o).isoformat()[:7]
+                out[month] = out.get(month, 0.0) + amt
+        return out
+
+    def income_expense(self, amounts=None) -> Tuple[float, float]:
+        """
+        Income and expense totals of amounts (default: self.amounts), a column
+        aligned with this one, e.g. from CurrencyConverter.convert_columns().
+        """
+        amounts = self.amounts if amounts is None else amounts
+        code = self._category_code("income")
+        if np is not None:
+            total = float(np.sum(amounts))
+            income = 0.0 if code is None else float(np.sum(amounts[self.category_codes == code]))
+            return income, total - income
+        income = expense = 0.0
+        for cat, amt in zip(self.category_codes, amounts):
+            if cat == code:
+                income += amt
+            else:
+                expense += amt
+        return income, expense
+
+    def totals_by_currency(self, currency_map: Dict[str, str]) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Income and expense totals per currency. Anything that is not "income"
+        counts as expense; transactions of unknown accounts are skipped.
+        """
+        income: Dict[str, float] = {}
+        expense: Dict[str, float] = {}
+        for totals, sums in ((income, self.sum_by_account("income")),
+                             (expense, self.sum_by_account("income", exclude=True))):
+            for acc, total in sums.items():
+                cur = currency_map.get(acc)
+                if cur is not None and total:
+                    totals[cur] = totals.get(cur, 0.0) + total
+        return income, expense
@@ -1,110 +1,372 @@
-import csv
+import bisect
 import os
-from typing import List
-from datetime import datetime
+from operator import itemgetter
+from sys import intern
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from models.transaction import Transaction
+from managers.events import ChangeNotifier
+from storage.backend import StorageBackend
+from storage.csv_storage import DEFAULT_CHUNK_SIZE, iter_transactions, write_csv_atomic
+from storage.mmap_ledger import MmapLedger, write_ledger
+from validators import parse_amount, parse_date_ymd
 from exceptions import ValidationError, NotFoundError, StorageError
 
-def _validate_amount(amount):
-    try:
-        a = float(amount)
-    except Exception:
-        raise ValidationError("Amount must be a number")
-    if a <= 0:
-        raise ValidationError("Amount must be positive")
-    return a
-
-def _validate_date(date_str: str):
-    try:
-        datetime.strptime(date_str, "%Y-%m-%d")
-    except Exception:
-        raise ValidationError("Date must be in YYYY-MM-DD format")
-    return date_str
-
-class TransactionManager:
+if TYPE_CHECKING:
+    from managers.transaction_columns import TransactionColumns
+
+# the date of a (date, id) entry in _by_date
+_DATE = itemgetter(0)
+
+TRANSACTION_FIELDS = ["id", "account_id", "date", "amount", "category", "description"]
+
+def _discard(index: Dict[str, Set[str]], key: str, tx_id: str):
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(tx_id)
+        if not ids:
+            del index[key]
+
+class TransactionManager(ChangeNotifier):
     def __init__(self):
-        self.transactions: List[Transaction] = []
+        # id -> Transaction; dicts keep insertion order, so this is both the
+        # O(1) lookup index and the ordered ledger
+        self._by_id: Dict[str, Transaction] = {}
+        # secondary indexes, maintained on every create/update/delete/load
+        self._by_account: Dict[str, Set[str]] = {}
+        self._by_category: Dict[str, Set[str]] = {}
+        self._by_date: List[Tuple[str, str]] = []  # sorted (date, id)
+        self._init_notifier()
+        self._columns: Optional["TransactionColumns"] = None
+        self._columns_version = -1
+
+    @property
+    def transactions(self) -> List[Transaction]:
+        return list(self._by_id.values())
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, tx_id):
+        return tx_id in self._by_id
 
     def create(self, tx: Transaction):
         # unique id
-        if any(t.id == tx.id for t in self.transactions):
+        if tx.id in self._by_id:
             raise ValidationError(f"Transaction with id {tx.id} already exists")
 
         # validate fields
-        tx.amount = _validate_amount(tx.amount)
-        tx.date = _validate_date(tx.date)
+        tx.amount = parse_amount(tx.amount)
+        tx.date = parse_date_ymd(tx.date)
         if not isinstance(tx.category, str) or not tx.category:
             raise ValidationError("Category must be a non-empty string")
 
-        self.transactions.append(tx)
+        self._by_id[tx.id] = tx
+        self._index(tx)
+        bisect.insort(self._by_date, (tx.date, tx.id))
+        self._changed("create", None, tx)
+
+    def create_many(self, txs: Iterable[Transaction]) -> int:
+        """
+        Add a batch of transactions. Every row is validated, and its id checked
+        against the ledger and the rest of the batch, before any is added, so a
+        bad row leaves the ledger untouched. Returns the number added.
+        """
+        batch = list(txs)
+        seen = set()
+        for tx in batch:
+            if tx.id in self._by_id or tx.id in seen:
+                raise ValidationError(f"Transaction with id {tx.id} already exists")
+            seen.add(tx.id)
+            tx.amount = parse_amount(tx.amount)
+            tx.date = parse_date_ymd(tx.date)
+            if not isinstance(tx.category, str) or not tx.category:
+                raise ValidationError("Category must be a non-empty string")
+
+        for tx in batch:
+            self._by_id[tx.id] = tx
+            self._index(tx)
+        # one sort merges the new keys in; timsort handles the already-sorted
+        # prefix in linear time, where an insort per row would be quadratic
+        self._by_date.extend((tx.date, tx.id) for tx in batch)
+        self._by_date.sort()
+        for tx in batch:
+            self._changed("create", None, tx)
+        return len(batch)
 
     def list_all(self) -> List[Transaction]:
-        return list(self.transactions)
+        return list(self._by_id.values())
 
     def get(self, tx_id: str) -> Transaction:
-        for t in self.transactions:
-            if t.id == tx_id:
-                return t
-        raise NotFoundError(f"Transaction {tx_id} not found")
+        tx = self._by_id.get(tx_id)
+        if tx is None:
+            raise NotFoundError(f"Transaction {tx_id} not found")
+        return tx
 
     def update(self, tx_id: str, **kwargs):
         tx = self.get(tx_id)
+        # validate everything first so a bad value leaves tx and indexes untouched
+        amount = date = category = None
         if "amount" in kwargs and kwargs["amount"] is not None:
-            tx.amount = _validate_amount(kwargs["amount"])
+            amount = parse_amount(kwargs["amount"])
         if "date" in kwargs and kwargs["date"] is not None:
-            tx.date = _validate_date(kwargs["date"])
+            date = parse_date_ymd(kwargs["date"])
         if "category" in kwargs and kwargs["category"] is not None:
             if not isinstance(kwargs["category"], str) or not kwargs["category"]:
                 raise ValidationError("Category must be a non-empty string")
-            tx.category = kwargs["category"]
+            category = intern(kwargs["category"])
+
+        old = tx.to_dict()
+        if amount is not None:
+            tx.amount = amount
+        if date is not None and date != tx.date:
+            self._unindex_date(tx)
+            tx.date = date
+            bisect.insort(self._by_date, (tx.date, tx.id))
+        if category is not None and category != tx.category:
+            _discard(self._by_category, tx.category.lower(), tx.id)
+            tx.category = category
+            self._by_category.setdefault(category.lower(), set()).add(tx.id)
         if "description" in kwargs and kwargs["description"] is not None:
             tx.description = str(kwargs["description"])
+        self._changed("update", old, tx)
         return tx
 
     def delete(self, tx_id: str):
         tx = self.get(tx_id)
-        self.transactions.remove(tx)
+        del self._by_id[tx_id]
+        _discard(self._by_account, tx.account_id, tx_id)
+        _discard(self._by_category, tx.category.lower(), tx_id)
+        self._unindex_date(tx)
+        self._changed("delete", tx, None)
+
+    def restore(self, row: Dict):
+        """
+        Insert or replace a transaction from a row this app wrote (journal replay).
+        """
+        tx = Transaction.from_row(row, trusted=True)
+        old = self._by_id.get(tx.id)
+        if old is not None:
+            _discard(self._by_account, old.account_id, old.id)
+            _discard(self._by_category, old.category.lower(), old.id)
+            self._unindex_date(old)
+        self._by_id[tx.id] = tx
+        self._index(tx)
+        bisect.insort(self._by_date, (tx.date, tx.id))
+        if old is None:
+            self._changed("create", None, tx)
+        else:
+            self._changed("update", old.to_dict(), tx)
+
+    def columns(self) -> "TransactionColumns":
+        """
+        Columnar view of the ledger for vectorized aggregation. Built lazily and
+        cached until the next mutation.
+        """
+        if self._columns is None or self._columns_version != self.version:
+            # imported on first use: it pulls in numpy, which commands that
+            # never aggregate should not pay for at startup
+            from managers.transaction_columns import TransactionColumns
+            self._columns = TransactionColumns(self._by_id.values())
+            self._columns_version = self.version
+        return self._columns
+
+    def query(self, account_id: Optional[str] = None, category: Optional[str] = None,
+              date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Transaction]:
+        """
+        Return transactions matching all given filters, ordered by (date, id).
+        Dates are inclusive YYYY-MM-DD bounds; category matching ignores case.
+        """
+        candidates = None
+        lookups = []
+        if account_id is not None:
+            lookups.append(self._by_account.get(account_id, set()))
+        if category is not None:
+            lookups.append(self._by_category.get(category.lower(), set()))
+        # intersect starting from the smallest set
+        for ids in sorted(lookups, key=len):
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+
+        if date_from is None and date_to is None:
+            if candidates is None:
+                keys = self._by_date
+            else:
+                keys = sorted((self._by_id[i].date, i) for i in candidates)
+            return [self._by_id[i] for _, i in keys]
+
+        # compare dates alone: no sentinel id sorts after every possible id
+        lo = 0 if date_from is None else bisect.bisect_left(self._by_date, date_from, key=_DATE)
+        hi = len(self._by_date) if date_to is None else bisect.bisect_right(self._by_date, date_to, key=_DATE)
+        if candidates is not None and len(candidates) < hi - lo:
+            keys = sorted(
+                (self._by_id[i].date, i) for i in candidates
+                if (date_from is None or self._by_id[i].date >= date_from)
+                and (date_to is None or self._by_id[i].date <= date_to)
+            )
+            return [self._by_id[i] for _, i in keys]
+        return [
+            self._by_id[i] for _, i in self._by_date[lo:hi]
+            if candidates is None or i in candidates
+        ]
+
+    def find(self, text: str) -> List[Transaction]:
+        """
+        Run a filter query such as "account=11 amount>500 order by amount desc
+        limit 10" (see managers.query for the syntax).
+        """
+        from managers.query import run_query
+        return run_query(self, text)
+
+    def explain(self, text: str) -> str:
+        """The plan find() would use for text: access path, filters, ordering."""
+        from managers.query import compile_query, plan
+        return plan(self, compile_query(text)).explain()
+
+    # ---- paging over the (date, id) order; each page costs O(log n + limit)
+    # however large the ledger, and the listing never materializes it all
+
+    def page(self, offset: int, limit: int) -> List[Transaction]:
+        """limit transactions starting at offset, in (date, id) order."""
+        offset = max(offset, 0)
+        return [self._by_id[i] for _, i in self._by_date[offset:offset + max(limit, 0)]]
+
+    def page_after(self, after: Optional[Tuple[str, str]], limit: int) -> List[Transaction]:
+        """
+        Keyset pagination: the limit transactions following the (date, id) key
+        after, or the first page when after is None. Unlike an offset, the
+        key stays valid while rows are added or removed in front of it.
+        """
+        start = 0 if after is None else bisect.bisect_right(self._by_date, tuple(after))
+        return [self._by_id[i] for _, i in self._by_date[start:start + max(limit, 0)]]
+
+    def page_before(self, before: Tuple[str, str], limit: int) -> List[Transaction]:
+        """The limit transactions preceding the (date, id) key before, in order."""
+        end = bisect.bisect_left(self._by_date, tuple(before))
+        return [self._by_id[i] for _, i in self._by_date[max(end - max(limit, 0), 0):end]]
+
+    def position(self, key: Tuple[str, str]) -> int:
+        """Offset of the (date, id) key in the page order (where it would go if absent)."""
+        return bisect.bisect_left(self._by_date, tuple(key))
+
+    def _index(self, tx: Transaction):
+        self._by_account.setdefault(tx.account_id, set()).add(tx.id)
+        self._by_category.setdefault(tx.category.lower(), set()).add(tx.id)
+
+    def _unindex_date(self, tx: Transaction):
+        pos = bisect.bisect_left(self._by_date, (tx.date, tx.id))
+        if pos < len(self._by_date) and self._by_date[pos] == (tx.date, tx.id):
+            del self._by_date[pos]
 
     # backward-compatible names
-    def save_csv(self, path: str):
-        return self.save(path)
+    def save_csv(self, path: str, force: bool = False):
+        return self.save(path, force)
 
-    def load_csv(self, path: str):
-        return self.load(path)
+    def load_csv(self, path: str, trusted: bool = False):
+        return self.load(path, trusted)
 
-    def save(self, path: str):
-        try:
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["id", "account_id", "date", "amount", "category", "description"])
-                writer.writeheader()
-                for t in self.transactions:
-                    writer.writerow(t.to_dict())
-        except Exception as e:
-            raise StorageError(e)
+    def save(self, path: str, force: bool = False) -> int:
+        """
+        Atomically write the transactions to path. Returns the bytes written, or 0
+        when nothing changed since this file was last loaded or saved.
+        """
+        if not force and not self.is_dirty(path):
+            return 0
+        written = write_csv_atomic(path, TRANSACTION_FIELDS, (t.to_dict() for t in self._by_id.values()))
+        self._mark_saved(path)
+        return written
+
+    @staticmethod
+    def iter_transactions(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, trusted: bool = False) -> Iterator[List[Transaction]]:
+        """
+        Stream validated transactions from a CSV in chunks without loading
+        them into a manager, for pipelines over ledgers larger than memory.
+        """
+        return iter_transactions(path, chunk_size, trusted)
 
-    def load(self, path: str):
-        self.transactions = []
+    def load(self, path: str, trusted: bool = False):
+        """
+        Replace the ledger with the file's contents. trusted=True skips
+        per-row validation; use it only for files this app wrote itself.
+        """
         if not os.path.exists(path):
+            self._load_chunks([])
             return
+        self._load_chunks(iter_transactions(path, trusted=trusted))
+        self._mark_saved(path)
+
+    def save_to(self, backend: StorageBackend, force: bool = False) -> Optional[int]:
+        """Like save(), against any storage backend, but a skipped write returns None."""
+        location = backend.location("transactions")
+        if not force and not self._is_dirty_at(location, backend.exists("transactions")):
+            return None
+        written = backend.save_rows("transactions", TRANSACTION_FIELDS, (t.to_dict() for t in self._by_id.values()))
+        self._mark_saved_at(location)
+        return written
+
+    def load_from(self, backend: StorageBackend, trusted: bool = False):
+        """Like load(), against any storage backend."""
+        chunks = backend.iter_rows("transactions")
+        self._load_chunks([Transaction.from_row(r, trusted) for r in rows] for rows in chunks)
+        self._mark_saved_at(backend.location("transactions"))
+
+    def save_ledger(self, path: str) -> int:
+        """
+        Write the ledger to a fixed-width binary file that open_ledger() maps
+        without reading it. Returns bytes written.
+        """
+        return write_ledger(path, self._by_id.values())
+
+    @staticmethod
+    def open_ledger(path: str) -> MmapLedger:
+        """
+        Open a file written by save_ledger() read-only through mmap. The
+        result answers get(), page() and range() straight from the mapping,
+        for histories too large to load into a manager.
+        """
+        return MmapLedger(path)
+
+    @staticmethod
+    def query_from(backend: StorageBackend, account_id: Optional[str] = None, category: Optional[str] = None,
+                   date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Transaction]:
+        """
+        Same filters as query(), evaluated by the backend without loading the
+        ledger into a manager (SQLite answers it from its indexes).
+        """
+        rows = backend.query_transactions(account_id, category, date_from, date_to)
+        return [Transaction.from_row(r, trusted=True) for r in rows]
+
+    def _load_chunks(self, chunks: Iterable[List[Transaction]]):
+        self._by_id = {}
+        self._by_account = {}
+        self._by_category = {}
+        self._by_date = []
+        by_id = self._by_id
+        by_account = self._by_account
+        by_category = self._by_category
         try:
-            with open(path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # validate while loading to catch corrupt files
-                    amt = _validate_amount(row.get("amount", 0))
-                    date = _validate_date(row.get("date", ""))
-                    tx = Transaction(
-                        id=row.get("id", ""),
-                        account_id=row.get("account_id", ""),
-                        date=date,
-                        amount=amt,
-                        category=row.get("category", ""),
-                        description=row.get("description", "")
-                    )
-                    self.transactions.append(tx)
-        except ValidationError:
+            for chunk in chunks:
+                for tx in chunk:
+                    tx_id = tx.id
+                    if tx_id in by_id:
+                        raise ValidationError(f"Transaction with id {tx_id} already exists")
+                    by_id[tx_id] = tx
+                    # inlined _index(); this loop is the hot path of every load
+                    ids = by_account.get(tx.account_id)
+                    if ids is None:
+                        ids = by_account[tx.account_id] = set()
+                    ids.add(tx_id)
+                    category = tx.category.lower()
+                    ids = by_category.get(category)
+                    if ids is None:
+                        ids = by_category[category] = set()
+                    ids.add(tx_id)
+        except (ValidationError, StorageError):
             raise
         except Exception as e:
             raise StorageError(e)
+        finally:
+            # one sort instead of an insort per row
+            self._by_date = sorted((t.date, t.id) for t in self._by_id.values())
+            self._changed("load")
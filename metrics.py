@@ -0,0 +1,195 @@
+"""
+Opt-in timing spans and counters for profiling a session.
+
+Nothing here runs unless enable() is called: instrumentation is installed by
+wrapping the hot functions (manager CRUD/load/save, the validators, the
+main.py renderers) in place, and disable() puts the originals back, so a
+normal run pays nothing. main.py turns it on with --profile.
+"""
+import cProfile
+import functools
+import importlib
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+MANAGER_METHODS = ("create", "create_many", "get", "update", "delete", "list_all", "query", "find",
+                   "load", "save", "load_from", "save_to")
+# (module, class name or None, function names); modules are imported on enable()
+TARGETS = [
+    ("managers.account_manager", "AccountManager", MANAGER_METHODS + ("adjust_balance", "adjust_balances")),
+    ("managers.transaction_manager", "TransactionManager", MANAGER_METHODS),
+    ("managers.budget_manager", "BudgetManager", MANAGER_METHODS + ("status",)),
+    ("managers.ledger_totals", "LedgerTotals", ("snapshot", "recompute", "rebuild")),
+    ("managers.budget_rollups", "MonthlyRollups", ("rebuild",)),
+    ("validators", None, ("validate_name", "validate_currency", "validate_positive_int",
+                          "validate_nonnegative_int", "validate_date_ymd", "validate_month_yyyy_mm",
+                          "validate_category_choice", "parse_amount", "parse_date_ymd",
+                          "parse_month_ym", "parse_limit")),
+]
+# wrapped in the module main.py passes to enable(); it may be __main__
+APP_FUNCTIONS = ("print_accounts", "print_transactions", "print_budgets", "print_budget_status",
+                 "browse_transactions", "show_balance_summary", "load_all", "save_all", "save_changes")
+# methods whose row count is the manager's size afterwards rather than a returned list
+_SIZED = {"load", "save", "load_from", "save_to", "create_many"}
+# modules whose `from validators import ...` names are rebound along with the originals
+_IMPORTERS = ("__main__", "main", "managers.", "models.", "storage.")
+
+
+class Stat:
+    __slots__ = ("durations", "rows")
+
+    def __init__(self):
+        self.durations: List[float] = []
+        self.rows = 0
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.durations)
+        # nearest rank
+        return ordered[max(int(round(p / 100.0 * len(ordered))) - 1, 0)]
+
+
+class Metrics:
+    def __init__(self):
+        self.stats: Dict[str, Stat] = {}
+        self.counters: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float, rows: int = 0):
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = Stat()
+        stat.durations.append(seconds)
+        stat.rows += rows
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def span(self, name: str, rows: int = 0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, rows)
+
+    def rows(self) -> List[Tuple]:
+        """(name, calls, total s, p50 ms, p95 ms, max ms, rows, rows/s), slowest total first."""
+        out = []
+        for name, stat in self.stats.items():
+            total = sum(stat.durations)
+            out.append((name, len(stat.durations), total, stat.percentile(50) * 1e3, stat.percentile(95) * 1e3,
+                        max(stat.durations) * 1e3, stat.rows, stat.rows / total if total and stat.rows else 0.0))
+        out.sort(key=lambda r: r[2], reverse=True)
+        return out
+
+    def report(self) -> str:
+        lines = [f"{'operation':44} {'calls':>7} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+                 f"{'max ms':>9} {'rows':>9} {'rows/s':>11}"]
+        for name, calls, total, p50, p95, top, rows, rate in self.rows():
+            lines.append(f"{name:44} {calls:7} {total:9.4f} {p50:9.3f} {p95:9.3f} {top:9.3f} "
+                         f"{rows or '':>9} {f'{rate:.0f}' if rate else '':>11}")
+        for name, n in sorted(self.counters.items()):
+            lines.append(f"{name:44} {n:7}")
+        return "\n".join(lines)
+
+
+# the active registry; None while profiling is off
+current: Optional[Metrics] = None
+_patched: List[Tuple[object, str, Callable]] = []
+_profiler: Optional[cProfile.Profile] = None
+
+
+def count(name: str, n: int = 1):
+    """Bump a counter; a no-op unless profiling is on."""
+    if current is not None:
+        current.count(name, n)
+
+
+def span(name: str, rows: int = 0):
+    """Time a with-block under name; a no-op unless profiling is on."""
+    return nullcontext() if current is None else current.span(name, rows)
+
+
+def _row_count(name: str, owner, result) -> int:
+    # save() returns 0 and save_to() None when they skipped the write
+    skipped = result == 0 or (result is None and name == "save_to")
+    if name in _SIZED and owner is not None and not skipped:
+        return len(owner)
+    if isinstance(result, list):
+        return len(result)
+    return 0
+
+
+def _wrap(label: str, name: str, fn: Callable, is_method: bool) -> Callable:
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        metrics = current
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            if metrics is not None:
+                metrics.record(label, time.perf_counter() - start)
+                metrics.count(label + " failed")
+            raise
+        if metrics is not None:
+            metrics.record(label, time.perf_counter() - start,
+                           _row_count(name, args[0] if is_method and args else None, result))
+        return result
+    return timed
+
+
+def _install(app):
+    targets = [(importlib.import_module(module_name), class_name, names) for module_name, class_name, names in TARGETS]
+    if app is not None:
+        targets.append((app, None, APP_FUNCTIONS))
+    for module, class_name, names in targets:
+        module_name = "main" if module.__name__ == "__main__" else module.__name__
+        owner = getattr(module, class_name) if class_name else module
+        for name in names:
+            fn = owner.__dict__.get(name) if class_name else getattr(module, name, None)
+            if fn is None or not callable(fn):
+                continue
+            label = f"{class_name or module_name}.{name}"
+            wrapped = _wrap(label, name, fn, class_name is not None)
+            _patched.append((owner, name, fn))
+            setattr(owner, name, wrapped)
+            if module_name == "validators":
+                # `from validators import parse_amount` bound the original elsewhere
+                for other_name, other in list(sys.modules.items()):
+                    if other is module or other is None or not other_name.startswith(_IMPORTERS):
+                        continue
+                    if getattr(other, name, None) is fn:
+                        _patched.append((other, name, fn))
+                        setattr(other, name, wrapped)
+
+
+def enable(cprofile: bool = False, app=None) -> Metrics:
+    """
+    Start collecting. app is the main.py module, whose renderers are timed
+    too; with cprofile, the standard profiler also runs until disable().
+    """
+    global current, _profiler
+    if current is None:
+        current = Metrics()
+        _install(app)
+    if cprofile and _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+    return current
+
+
+def disable(dump: Optional[str] = None) -> Optional[Metrics]:
+    """Stop collecting and restore the original functions. Returns what was collected."""
+    global current, _profiler
+    if _profiler is not None:
+        _profiler.disable()
+        if dump:
+            _profiler.dump_stats(dump)
+        _profiler = None
+    while _patched:
+        owner, name, fn = _patched.pop()
+        setattr(owner, name, fn)
+    metrics, current = current, None
+    return metrics
@@ -1,13 +1,19 @@
 import re
+from sys import intern
 from exceptions import ValidationError
 
 class Account:
-    def __init__(self, id, name, currency, balance=0, account_type="general"):
+    __slots__ = ("id", "name", "currency", "balance", "account_type", "opening_balance")
+
+    def __init__(self, id, name, currency, balance=0, account_type="general", opening_balance=None):
         self.id = id
         self.name = name
-        self.currency = currency
+        # a handful of distinct values shared by every account
+        self.currency = intern(currency) if type(currency) is str else currency
         self.balance = balance
-        self.account_type = account_type
+        self.account_type = intern(account_type) if type(account_type) is str else account_type
+        # balance before any transaction; None for accounts saved before it was kept
+        self.opening_balance = opening_balance
         self.validate()
 
     def validate(self):
@@ -30,6 +36,9 @@ class Account:
         if not isinstance(self.balance, (int, float)):
             raise ValidationError("Balance must be numeric.")
 
+        if self.opening_balance is not None and not isinstance(self.opening_balance, (int, float)):
+            raise ValidationError("Opening balance must be numeric.")
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -37,14 +46,19 @@ class Account:
             "account_type": self.account_type,
             "currency": self.currency,
             "balance": self.balance,
+            "opening_balance": self.opening_balance,
         }
 
 
 class CashAccount(Account):
-    def __init__(self, id, name, currency, balance=0):
-        super().__init__(id, name, currency, balance, account_type="cash")
+    __slots__ = ()
+
+    def __init__(self, id, name, currency, balance=0, opening_balance=None):
+        super().__init__(id, name, currency, balance, account_type="cash", opening_balance=opening_balance)
 
 
 class BankAccount(Account):
-    def __init__(self, id, name, currency, balance=0):
-        super().__init__(id, name, currency, balance, account_type="bank")
+    __slots__ = ()
+
+    def __init__(self, id, name, currency, balance=0, opening_balance=None):
+        super().__init__(id, name, currency, balance, account_type="bank", opening_balance=opening_balance)
@@ -1,13 +1,20 @@
 import re
+from sys import intern
 from exceptions import ValidationError
-from datetime import datetime
+from validators import is_valid_ym, parse_limit, parse_month_ym
+
+
+def _intern(value):
+    return intern(value) if type(value) is str else value
 
 
 class Budget:
+    __slots__ = ("id", "month", "category", "limit_amount")
+
     def __init__(self, id, month, category, limit_amount):
         self.id = id
-        self.month = month
-        self.category = category
+        self.month = _intern(month)
+        self.category = _intern(category)
         self.limit_amount = limit_amount
         self.validate()
 
@@ -16,9 +23,7 @@ class Budget:
             raise ValidationError("Budget ID cannot be empty")
 
         # Month must be YYYY-MM
-        try:
-            datetime.strptime(self.month, "%Y-%m")
-        except Exception:
+        if not is_valid_ym(self.month):
             raise ValidationError("Month must be in YYYY-MM format")
 
         # Limit must be positive
@@ -29,6 +34,28 @@ class Budget:
         if not isinstance(self.category, str) or not self.category.strip():
             raise ValidationError("Category cannot be empty")
 
+    @classmethod
+    def from_row(cls, row, trusted=False):
+        """
+        Build a budget from a CSV row dict, validating it on the way.
+        trusted=True skips validation for files this app wrote itself.
+        """
+        if trusted:
+            b = cls.__new__(cls)
+            b.id = row["id"]
+            b.month = intern(row["month"])
+            b.category = intern(row["category"])
+            b.limit_amount = float(row["limit_amount"])
+            return b
+        month = parse_month_ym(row.get("month", ""))
+        limit = parse_limit(row.get("limit_amount", 0))
+        return cls(
+            id=row.get("id", ""),
+            month=month,
+            category=row.get("category", ""),
+            limit_amount=limit
+        )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -1,26 +1,50 @@
 import re
-from datetime import datetime
+from sys import intern
 from exceptions import ValidationError
+from validators import parse_amount, parse_date_ymd, ymd_ordinal, ordinal_ymd
+
+
+def _intern(value):
+    return intern(value) if type(value) is str else value
 
 
 class Transaction:
+    # no per-instance __dict__: a large ledger holds millions of these
+    __slots__ = ("id", "account_id", "_date", "amount", "category", "description")
+
     def __init__(self, id, account_id, date, amount, category, description):
         self.id = id
-        self.account_id = account_id
+        self.account_id = _intern(account_id)
         self.date = date
         self.amount = amount
-        self.category = category
+        self.category = _intern(category)
         self.description = description
         self.validate()
 
+    @property
+    def date(self):
+        # kept as a day ordinal; the YYYY-MM-DD string is built on access
+        # and shared between transactions on the same day
+        d = self._date
+        return ordinal_ymd(d) if type(d) is int else d
+
+    @date.setter
+    def date(self, value):
+        ordinal = ymd_ordinal(value)
+        # an invalid value is kept as given so validate() can report it
+        self._date = value if ordinal is None else ordinal
+
+    @property
+    def date_ordinal(self):
+        d = self._date
+        return d if type(d) is int else None
+
     def validate(self):
         if not self.id.strip():
             raise ValidationError("Transaction ID cannot be empty")
 
         # Date must be YYYY-MM-DD
-        try:
-            datetime.strptime(self.date, "%Y-%m-%d")
-        except Exception:
+        if type(self._date) is not int:
             raise ValidationError("Invalid date format (expected YYYY-MM-DD)")
 
         # Amount must be positive
@@ -31,6 +55,33 @@ class Transaction:
         if not isinstance(self.category, str) or not self.category.strip():
             raise ValidationError("Category cannot be empty")
 
+    @classmethod
+    def from_row(cls, row, trusted=False):
+        """
+        Build a transaction from a CSV row dict, validating it on the way.
+        trusted=True skips validation for files this app wrote itself.
+        """
+        if trusted:
+            tx = cls.__new__(cls)
+            tx.id = row["id"]
+            tx.account_id = intern(row["account_id"])
+            # same as the date setter, minus the property call on this hot path
+            tx._date = ymd_ordinal(row["date"]) or row["date"]
+            tx.amount = float(row["amount"])
+            tx.category = intern(row["category"])
+            tx.description = row.get("description") or ""
+            return tx
+        amount = parse_amount(row.get("amount", 0))
+        date = parse_date_ymd(row.get("date", ""))
+        return cls(
+            id=row.get("id", ""),
+            account_id=row.get("account_id", ""),
+            date=date,
+            amount=amount,
+            category=row.get("category", ""),
+            description=row.get("description", "")
+        )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -0,0 +1,59 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DATASETS = ("accounts", "transactions", "budgets")
+
+# rows per chunk for the streaming readers; bounds memory regardless of file size
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class StorageBackend:
+    """
+    Where the managers keep their datasets ("accounts", "transactions",
+    "budgets"). Rows are plain dicts as produced by the models' to_dict().
+
+    Subclasses implement save_rows / iter_rows / exists / location. The query
+    methods have streaming defaults here; backends that can evaluate filters
+    and aggregates themselves (SQLite) override them.
+    """
+
+    def location(self, dataset: str) -> str:
+        """Stable identifier of where dataset lives; used for dirty tracking."""
+        raise NotImplementedError
+
+    def exists(self, dataset: str) -> bool:
+        raise NotImplementedError
+
+    def save_rows(self, dataset: str, fieldnames: List[str], rows: Iterable[Dict]) -> int:
+        """Replace dataset with rows. Returns the bytes (CSV) or rows (SQLite) written."""
+        raise NotImplementedError
+
+    def iter_rows(self, dataset: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        raise NotImplementedError
+
+    def query_transactions(self, account_id: Optional[str] = None, category: Optional[str] = None,
+                           date_from: Optional[str] = None, date_to: Optional[str] = None) -> Iterator[Dict]:
+        """Rows matching all given filters, ordered by (date, id). Category ignores case."""
+        matches = []
+        cat = category.lower() if category is not None else None
+        for chunk in self.iter_rows("transactions"):
+            for r in chunk:
+                if account_id is not None and r["account_id"] != account_id:
+                    continue
+                if cat is not None and r["category"].lower() != cat:
+                    continue
+                if date_from is not None and r["date"] < date_from:
+                    continue
+                if date_to is not None and r["date"] > date_to:
+                    continue
+                matches.append(r)
+        matches.sort(key=lambda r: (r["date"], r["id"]))
+        return iter(matches)
+
+    def transaction_totals(self) -> Dict[Tuple[str, str], float]:
+        """Sum of amounts per (account_id, lower-cased category)."""
+        totals: Dict[Tuple[str, str], float] = {}
+        for chunk in self.iter_rows("transactions"):
+            for r in chunk:
+                key = (r["account_id"], r["category"].lower())
+                totals[key] = totals.get(key, 0.0) + float(r["amount"])
+        return totals
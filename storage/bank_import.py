@@ -0,0 +1,232 @@
+import csv
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from exceptions import StorageError, ValidationError
+from models.transaction import Transaction
+from validators import parse_amount, parse_date_ymd
+
+IMPORT_FIELDS = ("id", "account_id", "date", "amount", "category", "description")
+
+# files smaller than this are parsed in-process; a pool costs more than it saves
+MIN_PARALLEL_BYTES = 1 << 20
+
+
+class ImportSpec:
+    """
+    How to read one bank's statement format.
+
+    columns maps our fields (IMPORT_FIELDS) to the statement's header names;
+    unmapped fields keep their own name. Without an id column, ids are
+    id_prefix + line number. Without an account column, every row goes to
+    account. Without a category column the sign of the amount decides:
+    negative is an expense, positive an income.
+    """
+
+    def __init__(self, columns: Optional[Dict[str, str]] = None, account: Optional[str] = None,
+                 date_format: str = "%Y-%m-%d", decimal: str = ".", delimiter: str = ",",
+                 id_prefix: str = ""):
+        unknown = set(columns or {}) - set(IMPORT_FIELDS)
+        if unknown:
+            raise ValidationError(f"Unknown import field(s): {', '.join(sorted(unknown))}")
+        self.columns = {f: f for f in IMPORT_FIELDS}
+        self.columns.update(columns or {})
+        # columns that must be in the header; the rest are used when present
+        self.required = {"date", "amount"} | set(columns or {})
+        self.account = account
+        self.date_format = date_format
+        self.decimal = decimal
+        self.delimiter = delimiter
+        self.id_prefix = id_prefix
+
+
+class ImportResult:
+    def __init__(self, imported: int, rejected: List[Tuple[int, str]], rows: int, elapsed: float):
+        self.imported = imported
+        self.rejected = rejected  # (line number, reason), in file order
+        self.rows = rows
+        self.elapsed = elapsed
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"ImportResult(imported={self.imported}, rejected={len(self.rejected)}, "
+                f"rows={self.rows}, elapsed={self.elapsed:.3f})")
+
+
+def _read_header(path: str, delimiter: str) -> Tuple[List[str], int]:
+    """The header's column names and the byte offset where the data starts."""
+    with open(path, "rb") as f:
+        line = f.readline()
+        start = f.tell()
+    if line.startswith(b"\xef\xbb\xbf"):
+        line = line[3:]
+    header = next(csv.reader([line.decode("utf-8")], delimiter=delimiter), [])
+    return [h.strip() for h in header], start
+
+
+def _split(path: str, start: int, parts: int) -> List[Tuple[int, int]]:
+    """Cut [start, EOF) into about `parts` byte ranges, each ending at a newline."""
+    size = os.path.getsize(path)
+    step = max((size - start) // max(parts, 1), 1)
+    bounds = [start]
+    with open(path, "rb") as f:
+        pos = start + step
+        while pos < size:
+            f.seek(pos)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+            pos += step
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _parse_range(path: str, start: int, end: int, header: List[str], spec: ImportSpec):
+    """
+    Parse and validate the rows in bytes [start, end). Runs in a worker
+    process, so it returns plain tuples: (accepted, rejected, lines), with
+    line numbers relative to the start of the range.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    text = data.decode("utf-8")
+    lines = text.count("\n") + (0 if not text or text.endswith("\n") else 1)
+
+    position = {name: i for i, name in enumerate(header)}
+    idx = {field: position.get(col) for field, col in spec.columns.items()}
+    width = len(header)
+    signed = idx["category"] is None
+    date_format = spec.date_format
+    iso = date_format == "%Y-%m-%d"
+    accepted = []
+    rejected = []
+    reader = csv.reader(io.StringIO(text), delimiter=spec.delimiter)
+    first = 1
+    for record in reader:
+        line = first
+        first = reader.line_num + 1
+        if not record or (len(record) == 1 and not record[0].strip()):
+            continue
+        if len(record) < width:
+            rejected.append((line, f"expected {width} columns, got {len(record)}"))
+            continue
+        try:
+            raw = record[idx["amount"]].strip() if idx["amount"] is not None else ""
+            if spec.decimal != ".":
+                raw = raw.replace(".", "").replace(" ", "").replace(spec.decimal, ".")
+            try:
+                amount = float(raw)
+            except ValueError:
+                raise ValidationError("Amount must be a number")
+            if signed:
+                category = "expense" if amount < 0 else "income"
+                amount = abs(amount)
+            else:
+                category = record[idx["category"]].strip()
+                if not category:
+                    raise ValidationError("Category cannot be empty")
+            amount = parse_amount(amount)
+
+            raw = record[idx["date"]].strip() if idx["date"] is not None else ""
+            if iso:
+                date = parse_date_ymd(raw)
+            else:
+                try:
+                    date = datetime.strptime(raw, date_format).date().isoformat()
+                except ValueError:
+                    raise ValidationError(f"Date must match {date_format}")
+
+            tx_id = record[idx["id"]].strip() if idx["id"] is not None else None
+            if tx_id == "":
+                raise ValidationError("Transaction ID cannot be empty")
+            account = record[idx["account_id"]].strip() if idx["account_id"] is not None else spec.account
+            if not account:
+                raise ValidationError("No account column and no default account")
+            description = record[idx["description"]] if idx["description"] is not None else ""
+        except ValidationError as e:
+            rejected.append((line, str(e)))
+            continue
+        accepted.append((line, tx_id, account, date, amount, category, description))
+    return accepted, rejected, lines
+
+
+def import_statement(path: str, tm, am, spec: Optional[ImportSpec] = None,
+                     workers: Optional[int] = None) -> ImportResult:
+    """
+    Import a bank statement CSV into tm and adjust the balances in am.
+
+    The file is cut into byte ranges at line boundaries and the ranges are
+    parsed and validated in a process pool (workers=1 parses in-process).
+    Valid rows are then added with one create_many() call and each
+    account's balance is adjusted once by its net total. Rows that fail
+    validation, name an unknown account or repeat an id are skipped and
+    reported by line number.
+
+    Quoted fields spanning several lines are not supported: a range may
+    start inside one.
+    """
+    spec = spec or ImportSpec()
+    started = time.perf_counter()
+    if not os.path.exists(path):
+        raise StorageError(f"Statement {path} not found")
+    header, start = _read_header(path, spec.delimiter)
+    missing = [spec.columns[field] for field in IMPORT_FIELDS
+               if field in spec.required and spec.columns[field] not in header]
+    if missing:
+        raise StorageError(f"Statement {path} has no column(s) {', '.join(missing)}")
+
+    workers = workers or os.cpu_count() or 1
+    if os.path.getsize(path) - start < MIN_PARALLEL_BYTES:
+        workers = 1
+    ranges = _split(path, start, workers * 4 if workers > 1 else 1)
+    try:
+        if workers == 1:
+            results = [_parse_range(path, s, e, header, spec) for s, e in ranges]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_parse_range, path, s, e, header, spec) for s, e in ranges]
+                results = [f.result() for f in futures]
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        raise StorageError(f"Failed to read statement {path}: {e}")
+
+    rejected: List[Tuple[int, str]] = []
+    txs: List[Transaction] = []
+    deltas: Dict[str, float] = {}
+    seen = set()
+    base = 1  # the header line
+    rows = 0
+    for accepted, bad, lines in results:
+        rejected.extend((base + line, reason) for line, reason in bad)
+        rows += len(accepted) + len(bad)
+        for line, tx_id, account, date, amount, category, description in accepted:
+            lineno = base + line
+            if tx_id is None:
+                tx_id = f"{spec.id_prefix}{lineno}"
+            if am.get_by_id(account) is None:
+                rejected.append((lineno, f"Account {account} not found"))
+                continue
+            if tx_id in tm or tx_id in seen:
+                rejected.append((lineno, f"Transaction with id {tx_id} already exists"))
+                continue
+            seen.add(tx_id)
+            txs.append(Transaction.from_row({"id": tx_id, "account_id": account, "date": date, "amount": amount,
+                                             "category": category, "description": description}, trusted=True))
+            signed = amount if category.lower() == "income" else -amount
+            deltas[account] = deltas.get(account, 0.0) + signed
+        base += lines
+    rejected.sort()
+
+    tm.create_many(txs)
+    am.adjust_balances(deltas)
+    return ImportResult(len(txs), rejected, rows, time.perf_counter() - started)
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, TypeVar
+
+from exceptions import FinanceError, StorageError, StorageErrors
+
+T = TypeVar("T")
+
+
+def _outcome(job: Callable[[], T]):
+    try:
+        return job(), None
+    except Exception as e:
+        return None, e
+
+
+def run_concurrently(jobs: Dict[str, Callable[[], T]]) -> Dict[str, T]:
+    """
+    Run independent storage jobs ({name: callable}) on a thread pool and
+    return {name: result}. Only the I/O overlaps: reads, writes and fsyncs
+    release the GIL, but CSV parsing and row building hold it, so loads run
+    mostly one after another. Saves, where fsync dominates, gain the most.
+
+    Every job runs to completion even if another fails. A single failure is
+    re-raised as is (non-FinanceErrors wrapped in StorageError); several are
+    aggregated into one StorageErrors.
+    """
+    if len(jobs) <= 1:
+        outcomes = {name: _outcome(job) for name, job in jobs.items()}
+    else:
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="storage") as pool:
+            futures = {name: pool.submit(_outcome, job) for name, job in jobs.items()}
+        outcomes = {name: f.result() for name, f in futures.items()}
+
+    results = {}
+    errors = {}
+    for name, (result, error) in outcomes.items():
+        if error is None:
+            results[name] = result
+        elif isinstance(error, FinanceError):
+            errors[name] = error
+        else:
+            wrapped = StorageError(f"{name}: {error}")
+            wrapped.__cause__ = error
+            errors[name] = wrapped
+    if len(errors) == 1:
+        raise next(iter(errors.values()))
+    if errors:
+        raise StorageErrors(errors)
+    return results
@@ -1,17 +1,103 @@
-
 import csv
-from typing import List, Dict
+import os
+import stat
+import tempfile
+import threading
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, TypeVar
 from exceptions import StorageError
+from models.transaction import Transaction
+from storage.backend import DEFAULT_CHUNK_SIZE, StorageBackend
 
-def save_dicts_to_csv(path: str, fieldnames: List[str], rows: List[Dict]):
+T = TypeVar("T")
+
+# the process umask, for new files' permissions; see _get_umask()
+_umask = None
+_umask_lock = threading.Lock()
+
+class SaveStats:
+    """Tally of a multi-file save, to check how much I/O dirty tracking saved."""
+
+    def __init__(self):
+        self.bytes_written = 0
+        self.files_written = 0
+        self.files_skipped = 0
+
+    def record(self, bytes_written: int):
+        # managers return 0 from save() when the file was already up to date
+        if bytes_written:
+            self.bytes_written += bytes_written
+            self.files_written += 1
+        else:
+            self.files_skipped += 1
+
+    def __repr__(self):
+        return (f"SaveStats(bytes_written={self.bytes_written}, "
+                f"files_written={self.files_written}, files_skipped={self.files_skipped})")
+
+def write_csv_atomic(path: str, fieldnames: List[str], rows: Iterable[Dict]) -> int:
+    """
+    Write rows to a temp file next to path, fsync it and rename it over path,
+    so a crash leaves either the old or the new file, never a torn one.
+    Returns the number of bytes written.
+    """
+    directory = os.path.dirname(path) or "."
+    tmp = None
     try:
-        with open(path, 'w', newline='', encoding='utf-8') as f:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             for r in rows:
                 writer.writerow(r)
+            f.flush()
+            written = f.tell()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; keep the permissions path had, or
+        # what a plain open() would have given a new file
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_get_umask()
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+        tmp = None
+        _fsync_dir(directory)
+        return written
     except Exception as e:
         raise StorageError(f"Failed to save CSV {path}: {e}")
+    finally:
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+
+def _get_umask() -> int:
+    # read on first need, not at import; Linux reports it without changing it
+    global _umask
+    with _umask_lock:
+        if _umask is None:
+            try:
+                with open("/proc/self/status", encoding="ascii") as f:
+                    _umask = next(int(line.split()[1], 8) for line in f if line.startswith("Umask:"))
+            except (OSError, ValueError, StopIteration):
+                # elsewhere it can only be queried by setting it; the strict
+                # stand-in keeps a racing file creation private, not open
+                _umask = os.umask(0o077)
+                os.umask(_umask)
+        return _umask
+
+def _fsync_dir(directory: str):
+    # persist the rename itself; not possible (or needed) on Windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def save_dicts_to_csv(path: str, fieldnames: List[str], rows: List[Dict]):
+    return write_csv_atomic(path, fieldnames, rows)
 
 def load_dicts_from_csv(path: str):
     try:
@@ -22,3 +108,56 @@ def load_dicts_from_csv(path: str):
         return []
     except Exception as e:
         raise StorageError(f"Failed to load CSV {path}: {e}")
+
+
+def iter_chunks(items: Iterable[T], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[T]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_dicts_from_csv(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+    """
+    Stream a CSV as lists of at most chunk_size row dicts. Only one chunk is
+    held in memory at a time. A missing file yields nothing.
+    """
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from iter_chunks(csv.DictReader(f), chunk_size)
+    except FileNotFoundError:
+        return
+    except (OSError, csv.Error, UnicodeDecodeError) as e:
+        raise StorageError(f"Failed to load CSV {path}: {e}")
+
+def iter_records(path: str, parse_row: Callable[[Dict], T], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[T]]:
+    # ValidationError from parse_row propagates unchanged so corrupt files
+    # report the same message as a full load
+    for rows in iter_dicts_from_csv(path, chunk_size):
+        yield [parse_row(r) for r in rows]
+
+def iter_transactions(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, trusted: bool = False) -> Iterator[List[Transaction]]:
+    return iter_records(path, lambda row: Transaction.from_row(row, trusted), chunk_size)
+
+
+class CsvBackend(StorageBackend):
+    """One CSV file per dataset inside data_dir (accounts.csv, ...)."""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+
+    def path(self, dataset: str) -> str:
+        return os.path.join(self.data_dir, dataset + ".csv")
+
+    def location(self, dataset: str) -> str:
+        return os.path.abspath(self.path(dataset))
+
+    def exists(self, dataset: str) -> bool:
+        return os.path.exists(self.path(dataset))
+
+    def save_rows(self, dataset: str, fieldnames: List[str], rows: Iterable[Dict]) -> int:
+        return write_csv_atomic(self.path(dataset), fieldnames, rows)
+
+    def iter_rows(self, dataset: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        return iter_dicts_from_csv(self.path(dataset), chunk_size)
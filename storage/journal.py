@@ -0,0 +1,220 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from exceptions import ConflictError, NotFoundError, StorageError
+from storage.locking import FileLock, read_versions, write_versions
+
+# bumped by every rewrite of the CSV files, so readers can tell their view
+# of the CSVs and the journal came from the same state
+GENERATION = "generation"
+
+
+class Journal:
+    """
+    Append-only write-ahead log of changes made since the last CSV snapshot.
+
+    Each record is one JSON line: {"ds": dataset, "op": "create"|"update"|"delete",
+    "id": ..., "row": to_dict() or null}, plus "delta" on account updates made
+    by adjust_balance(). Records carry full rows, so replaying
+    a record twice gives the same result; that keeps a crash between writing
+    the snapshot and truncating the journal harmless.
+
+    Several processes may share one data directory. versions.json next to
+    the journal holds a version per dataset, bumped by every flush that
+    writes to it. loaded holds the versions the in-memory state was read
+    at, so a flush from a process that is behind raises ConflictError
+    instead of overwriting rows it never saw. Writers hold lock (an
+    advisory flock on ledger.lock) only while committing; readers take no
+    lock and re-read when the versions moved underneath them.
+    """
+
+    def __init__(self, path: str, lock_timeout: Optional[float] = None):
+        self.path = path
+        directory = os.path.dirname(path) or "."
+        self.versions_path = os.path.join(directory, "versions.json")
+        self.lock = FileLock(os.path.join(directory, "ledger.lock"), timeout=lock_timeout)
+        self.loaded: Dict[str, int] = {}
+        self._pending: List[str] = []
+        # (dataset, op, old row, new row, balance delta) per pending record, for rebase
+        self._changes: List[Tuple[str, str, Optional[Dict], Optional[Dict], Optional[float]]] = []
+        self._replaying = False
+
+    def attach(self, dataset: str, manager):
+        def record(_manager, event, old, new):
+            if self._replaying or event == "load":
+                return
+            if event == "delete":
+                rec = {"ds": dataset, "op": "delete", "id": old.id, "row": None}
+                self._changes.append((dataset, "delete", old.to_dict(), None, None))
+            else:
+                rec = {"ds": dataset, "op": event, "id": new.id, "row": new.to_dict()}
+                delta = getattr(manager, "balance_delta", None) if event == "update" else None
+                if delta is not None:
+                    rec["delta"] = delta
+                self._changes.append((dataset, event, old, rec["row"], delta))
+            self._pending.append(json.dumps(rec, separators=(",", ":")))
+        manager.subscribe(record)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def discard_pending(self):
+        self._pending = []
+        self._changes = []
+
+    def versions(self) -> Dict[str, int]:
+        """The dataset versions currently committed to disk."""
+        return read_versions(self.versions_path)
+
+    def stale(self, datasets) -> List[str]:
+        """Those of datasets another process has written since they were loaded."""
+        current = self.versions()
+        return sorted(ds for ds in set(datasets) if current.get(ds, 0) != self.loaded.get(ds, 0))
+
+    def flush(self) -> int:
+        """
+        Append pending records to disk and fsync. Returns the number written.
+        Raises ConflictError, writing nothing, when another process has
+        written to one of the same datasets since this state was loaded.
+        """
+        if not self._pending:
+            return 0
+        datasets = {change[0] for change in self._changes}
+        with self.lock:
+            current = self.versions()
+            stale = sorted(ds for ds in datasets if current.get(ds, 0) != self.loaded.get(ds, 0))
+            if stale:
+                raise ConflictError(f"{', '.join(stale)} changed in another process since they were loaded", stale)
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                _drop_torn_tail(self.path)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(self._pending) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                raise StorageError(f"Failed to write journal {self.path}: {e}")
+            for ds in datasets:
+                current[ds] = current.get(ds, 0) + 1
+                self.loaded[ds] = current[ds]
+            write_versions(self.versions_path, current)
+        written = len(self._pending)
+        self.discard_pending()
+        return written
+
+    def take_inserts(self) -> Tuple[List[Dict], Dict[str, float]]:
+        """
+        The pending changes as (transaction rows created, {account_id: balance
+        delta}), to be re-applied on top of state another process committed
+        meanwhile. Inserts commute with whatever else was written, so this is
+        the one kind of conflict that merges. Only balance changes made by
+        adjust_balance() count as deltas: a balance set outright would be
+        shifted by whatever the other process added. Any other pending change
+        raises ConflictError and stays pending. Clears the pending changes.
+        """
+        rows, deltas = [], {}
+        for dataset, op, old, row, delta in self._changes:
+            if dataset == "transactions" and op == "create":
+                rows.append(row)
+            elif dataset == "accounts" and op == "update" and delta is not None:
+                deltas[row["id"]] = deltas.get(row["id"], 0.0) + delta
+            else:
+                key = (old or row)["id"]
+                raise ConflictError(f"Cannot merge the {op} of {dataset} {key} with changes from another "
+                                    f"process; reload and apply it again", [dataset])
+        self.discard_pending()
+        return rows, deltas
+
+    def replay(self, managers: Dict[str, object]) -> int:
+        """
+        Apply journaled records on top of freshly loaded managers, keyed by
+        dataset name. Records for datasets not in managers are skipped.
+        Returns the number of records applied.
+        """
+        # what was committed when reading began; load_datasets() narrows it
+        self.loaded = self.versions()
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.read().split("\n")
+        except OSError as e:
+            raise StorageError(f"Failed to read journal {self.path}: {e}")
+        applied = 0
+        self._replaying = True
+        try:
+            for lineno, line in enumerate(lines, 1):
+                if not line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    if lineno >= len(lines) - 1:
+                        # torn final write from a crash; everything before it is intact
+                        break
+                    raise StorageError(f"Corrupt journal {self.path} at line {lineno}")
+                manager = managers.get(rec["ds"])
+                if manager is None:
+                    continue
+                if rec["op"] == "delete":
+                    try:
+                        manager.delete(rec["id"])
+                    except NotFoundError:
+                        # already gone in the snapshot
+                        pass
+                else:
+                    manager.restore(rec["row"])
+                applied += 1
+        finally:
+            self._replaying = False
+        return applied
+
+    def bump_generation(self):
+        """Record that the CSV files were rewritten; call with lock held."""
+        with self.lock:
+            current = self.versions()
+            current[GENERATION] = current.get(GENERATION, 0) + 1
+            write_versions(self.versions_path, current)
+
+    def truncate(self):
+        """Drop all records; call after the snapshot has been rewritten."""
+        self.discard_pending()
+        with self.lock:
+            # before the journal goes: a reader that saw the old CSVs and
+            # then finds the journal empty must notice and read again
+            self.bump_generation()
+            try:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+            except OSError as e:
+                raise StorageError(f"Failed to truncate journal {self.path}: {e}")
+
+
+def _drop_torn_tail(path: str):
+    """
+    Cut a record left half-written by a crash off the end of path, so the
+    next append starts on a line of its own instead of merging into it.
+    """
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - 4096)
+            f.seek(start)
+            block = f.read(pos - start)
+            if pos == end and block.endswith(b"\n"):
+                return
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                pos = start + newline + 1
+                break
+            pos = start
+        f.truncate(pos)
+        f.flush()
+        os.fsync(f.fileno())
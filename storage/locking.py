@@ -0,0 +1,113 @@
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from exceptions import StorageError
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every lock is a no-op
+    fcntl = None
+
+
+class FileLock:
+    """
+    Advisory lock on a file next to the data, shared between processes that
+    use it (flock, so other tools touching the CSVs are not held off).
+    exclusive=False takes a shared lock. With timeout, StorageError is
+    raised if the lock is not granted in time; None waits indefinitely.
+    Reentrant within one object, so nested `with lock:` blocks are safe.
+    """
+
+    POLL = 0.01
+
+    def __init__(self, path: str, exclusive: bool = True, timeout: Optional[float] = None):
+        self.path = path
+        self.exclusive = exclusive
+        self.timeout = timeout
+        self._fd = None
+        self._depth = 0
+
+    @property
+    def held(self) -> bool:
+        return self._depth > 0
+
+    def acquire(self):
+        if self._depth:
+            self._depth += 1
+            return
+        if fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            except OSError as e:
+                raise StorageError(f"Failed to open lock file {self.path}: {e}")
+            mode = fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH
+            try:
+                self._lock(fd, mode)
+            except BaseException:
+                os.close(fd)
+                raise
+            self._fd = fd
+        self._depth = 1
+
+    def _lock(self, fd: int, mode: int):
+        if self.timeout is None:
+            fcntl.flock(fd, mode)
+            return
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise StorageError(f"Timed out waiting for lock {self.path}")
+                time.sleep(self.POLL)
+
+    def release(self):
+        if not self._depth:
+            return
+        self._depth -= 1
+        if self._depth or self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def read_versions(path: str) -> Dict[str, int]:
+    """
+    The version stamps in path ({dataset: n}); {} when none were written yet.
+    Written whole with os.replace, so a reader never sees a torn file and
+    needs no lock.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        raise StorageError(f"Failed to read versions {path}: {e}")
+
+
+def write_versions(path: str, versions: Dict[str, int]):
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(versions, f, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except OSError as e:
+        raise StorageError(f"Failed to write versions {path}: {e}")
@@ -0,0 +1,232 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from exceptions import NotFoundError, StorageError
+from models.transaction import Transaction
+from validators import ordinal_ymd, ymd_ordinal
+
+MAGIC = b"PFML"
+FORMAT_VERSION = 1
+# magic, format version, reserved, row count, id index offset, date index
+# offset, heap offset, string table offset, string table length
+_HEADER = struct.Struct("<4sHHQQQQQQ")
+# amount, date ordinal, account code, category code,
+# id heap offset, id length, description heap offset, description length
+_RECORD = struct.Struct("<diIIQIQI")
+# row numbers in the two sorted indexes, stored little-endian like the rest
+_INDEX_ITEM = "I"
+_INDEX_WIDTH = 4
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _index_bytes(rows: Iterable[int]) -> bytes:
+    index = array(_INDEX_ITEM, rows)
+    if not _LITTLE_ENDIAN:
+        index.byteswap()
+    return index.tobytes()
+
+
+def write_ledger(path: str, transactions: Iterable[Transaction]) -> int:
+    """
+    Write transactions to a fixed-width binary ledger for MmapLedger.
+    Returns bytes written.
+
+    Layout: header, one fixed-size record per row (file order), the row
+    numbers sorted by id, the row numbers sorted by (date, id), a heap of
+    UTF-8 ids and descriptions, and a JSON table of the interned account
+    ids and categories the records refer to by code.
+    """
+    codes: Dict[str, int] = {}
+    by_id = []
+    by_date = []
+    directory = os.path.dirname(path) or "."
+    try:
+        with tempfile.TemporaryFile(dir=directory) as heap, \
+                open(path + ".tmp", "wb") as f:
+            f.write(b"\0" * _HEADER.size)
+            heap_pos = 0
+            for row, tx in enumerate(transactions):
+                ordinal = tx.date_ordinal
+                if ordinal is None:
+                    raise StorageError(f"Transaction {tx.id} has an invalid date {tx.date!r}")
+                account = codes.setdefault(tx.account_id, len(codes))
+                category = codes.setdefault(tx.category, len(codes))
+                tx_id = tx.id.encode("utf-8")
+                desc = (tx.description or "").encode("utf-8")
+                f.write(_RECORD.pack(float(tx.amount), ordinal, account, category,
+                                     heap_pos, len(tx_id), heap_pos + len(tx_id), len(desc)))
+                heap.write(tx_id)
+                heap.write(desc)
+                heap_pos += len(tx_id) + len(desc)
+                by_id.append((tx_id, row))
+                by_date.append((ordinal, tx_id, row))
+            rows = len(by_id)
+            if rows > 0xFFFFFFFF:
+                raise StorageError("Ledger has too many rows for the binary format")
+
+            by_id.sort()
+            by_date.sort()
+            id_index = f.tell()
+            f.write(_index_bytes(r for _, r in by_id))
+            del by_id
+            date_index = f.tell()
+            f.write(_index_bytes(r for _, _, r in by_date))
+            del by_date
+
+            heap_off = f.tell()
+            heap.seek(0)
+            while True:
+                block = heap.read(1 << 20)
+                if not block:
+                    break
+                f.write(block)
+            strings = json.dumps(list(codes)).encode("utf-8")
+            strings_off = f.tell()
+            f.write(strings)
+            written = f.tell()
+
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, rows, id_index, date_index,
+                                 heap_off, strings_off, len(strings)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+    except BaseException as e:
+        if os.path.exists(path + ".tmp"):
+            os.remove(path + ".tmp")
+        if isinstance(e, OSError):
+            raise StorageError(f"Failed to write ledger {path}: {e}")
+        raise
+    return written
+
+
+class MmapLedger:
+    """
+    Read-only view of a ledger written by write_ledger(), backed by mmap.
+
+    Nothing is read up front except the header and the string table; get(),
+    page() and range() decode only the records they return, so resident
+    memory follows the rows touched rather than the file size. The two
+    indexes are used in place through memoryviews over the mapping.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise StorageError(f"Failed to open ledger {path}: {e}")
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise StorageError(f"{path} is not a ledger file")
+            (magic, version, _, self._rows, id_index, date_index,
+             self._heap, strings_off, strings_len) = _HEADER.unpack_from(self._mm)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise StorageError(f"{path} is not a ledger file (or an unsupported version)")
+            if strings_off + strings_len > len(self._mm):
+                raise StorageError(f"{path} is truncated")
+            self._strings: List[str] = json.loads(self._mm[strings_off:strings_off + strings_len])
+            width = self._rows * _INDEX_WIDTH
+            if _LITTLE_ENDIAN:
+                view = memoryview(self._mm)
+                self._id_index = view[id_index:id_index + width].cast(_INDEX_ITEM)
+                self._date_index = view[date_index:date_index + width].cast(_INDEX_ITEM)
+                view.release()
+            else:
+                # big-endian hosts get byte-swapped copies of the indexes
+                self._id_index = array(_INDEX_ITEM, self._mm[id_index:id_index + width])
+                self._id_index.byteswap()
+                self._date_index = array(_INDEX_ITEM, self._mm[date_index:date_index + width])
+                self._date_index.byteswap()
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        # the index views pin the mapping; release them before closing it
+        for name in ("_id_index", "_date_index"):
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if not self._mm.closed:
+            self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._rows
+
+    def __contains__(self, tx_id):
+        return self._find(tx_id) is not None
+
+    def row(self, i: int) -> Transaction:
+        """The i-th transaction in file order."""
+        if not 0 <= i < self._rows:
+            raise IndexError(i)
+        amount, ordinal, account, category, id_off, id_len, desc_off, desc_len = \
+            _RECORD.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)
+        heap = self._heap
+        tx = Transaction.__new__(Transaction)
+        tx.id = self._mm[heap + id_off:heap + id_off + id_len].decode("utf-8")
+        tx.account_id = self._strings[account]
+        tx.date = ordinal_ymd(ordinal)
+        tx.amount = amount
+        tx.category = self._strings[category]
+        tx.description = self._mm[heap + desc_off:heap + desc_off + desc_len].decode("utf-8")
+        return tx
+
+    def get(self, tx_id: str) -> Transaction:
+        i = self._find(tx_id)
+        if i is None:
+            raise NotFoundError(f"Transaction {tx_id} not found")
+        return self.row(i)
+
+    def page(self, offset: int, limit: int) -> List[Transaction]:
+        """limit transactions starting at offset, in (date, id) order."""
+        offset = max(offset, 0)
+        return [self.row(i) for i in self._date_index[offset:offset + max(limit, 0)]]
+
+    def range(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> Iterator[Transaction]:
+        """Transactions dated within the inclusive bounds, in (date, id) order."""
+        lo = 0 if date_from is None else bisect.bisect_left(
+            self._date_index, self._bound(date_from), key=self._ordinal)
+        hi = self._rows if date_to is None else bisect.bisect_right(
+            self._date_index, self._bound(date_to), key=self._ordinal)
+        for pos in range(lo, hi):
+            yield self.row(self._date_index[pos])
+
+    @staticmethod
+    def _bound(date_str: str) -> int:
+        ordinal = ymd_ordinal(date_str)
+        if ordinal is None:
+            raise StorageError(f"Invalid date bound {date_str!r} (expected YYYY-MM-DD)")
+        return ordinal
+
+    def _ordinal(self, i: int) -> int:
+        return struct.unpack_from("<i", self._mm, _HEADER.size + i * _RECORD.size + 8)[0]
+
+    def _id_bytes(self, i: int) -> bytes:
+        id_off, id_len = struct.unpack_from("<QI", self._mm, _HEADER.size + i * _RECORD.size + 20)
+        start = self._heap + id_off
+        return self._mm[start:start + id_len]
+
+    def _find(self, tx_id) -> Optional[int]:
+        if not isinstance(tx_id, str):
+            return None
+        key = tx_id.encode("utf-8")
+        pos = bisect.bisect_left(self._id_index, key, key=self._id_bytes)
+        if pos < self._rows and self._id_bytes(self._id_index[pos]) == key:
+            return self._id_index[pos]
+        return None
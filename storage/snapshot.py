@@ -0,0 +1,130 @@
+import io
+import json
+import os
+import pickle
+import struct
+import zlib
+from itertools import repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from exceptions import StorageError
+from storage.backend import DEFAULT_CHUNK_SIZE, StorageBackend
+
+MAGIC = b"PFMS"
+FORMAT_VERSION = 1
+# magic, format version, stamps length, crc32 of stamps + payload, payload length
+_HEADER = struct.Struct("<4sHIIQ")
+
+
+class _RowsOnlyUnpickler(pickle.Unpickler):
+    # the payload is built from lists, tuples, dicts, str and float only, none
+    # of which need find_class; refusing it means a tampered file cannot
+    # import and call arbitrary code
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Snapshot may not reference {module}.{name}")
+
+
+def _stamp(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def write_snapshot(path: str, datasets: Dict[str, Tuple[List[str], Iterable[Dict]]],
+                   sources: Dict[str, str]) -> int:
+    """
+    Write a binary snapshot of datasets ({name: (fieldnames, row dicts)})
+    next to the CSV files they were saved to (sources: {name: csv path}).
+    The CSVs' mtimes and sizes are stamped into the header so a later reader
+    can tell whether the snapshot still mirrors them. Returns bytes written.
+    """
+    payload = {
+        name: {"fields": list(fields), "rows": [tuple(r[f] for f in fields) for r in rows]}
+        for name, (fields, rows) in datasets.items()
+    }
+    stamps = json.dumps({name: [os.path.abspath(p), _stamp(p)] for name, p in sources.items()}).encode("utf-8")
+    body = pickle.dumps(payload, protocol=5)
+    crc = zlib.crc32(body, zlib.crc32(stamps))
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(stamps), crc, len(body)))
+            f.write(stamps)
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+            written = f.tell()
+        os.replace(tmp, path)
+    except OSError as e:
+        raise StorageError(f"Failed to write snapshot {path}: {e}")
+    return written
+
+
+class SnapshotBackend(StorageBackend):
+    """
+    Read-only backend over a snapshot that has been verified to mirror the
+    CSV files. It reports each dataset's CSV location, so managers loaded
+    from it count as up to date with those files for dirty tracking.
+    """
+
+    def __init__(self, path: str, payload: Dict, sources: Dict[str, str]):
+        self.path = path
+        self._payload = payload
+        self._sources = sources
+
+    def location(self, dataset: str) -> str:
+        return self._sources[dataset]
+
+    def exists(self, dataset: str) -> bool:
+        return dataset in self._payload
+
+    def save_rows(self, dataset, fieldnames, rows):
+        raise StorageError("Snapshots are written with write_snapshot()")
+
+    def iter_rows(self, dataset: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        data = self._payload.get(dataset)
+        if data is None:
+            return
+        fields, rows = data["fields"], data["rows"]
+        for start in range(0, len(rows), chunk_size):
+            yield list(map(dict, map(zip, repeat(fields), rows[start:start + chunk_size])))
+
+
+def open_snapshot(path: str, sources: Dict[str, str]) -> Optional[SnapshotBackend]:
+    """
+    Return a backend over the snapshot at path if it is intact and still
+    matches the CSV files in sources (same paths, mtimes and sizes), else
+    None so the caller falls back to the CSVs.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, stamps_len, crc, body_len = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    stamps = data[_HEADER.size:_HEADER.size + stamps_len]
+    body = memoryview(data)[_HEADER.size + stamps_len:]
+    if len(body) != body_len or zlib.crc32(body, zlib.crc32(stamps)) != crc:
+        return None
+
+    recorded = json.loads(stamps.decode("utf-8"))
+    snapshot_mtime = os.stat(path).st_mtime_ns
+    for name, csv_path in sources.items():
+        stamp = _stamp(csv_path)
+        if recorded.get(name) != [os.path.abspath(csv_path), stamp]:
+            return None
+        if stamp is not None and stamp[0] > snapshot_mtime:
+            return None
+    try:
+        payload = _RowsOnlyUnpickler(io.BytesIO(body)).load()
+    except (pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    return SnapshotBackend(path, payload, {name: os.path.abspath(p) for name, p in sources.items()})
@@ -0,0 +1,213 @@
+import argparse
+import os
+import sqlite3
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from exceptions import StorageError
+from storage.backend import DEFAULT_CHUNK_SIZE, DATASETS, StorageBackend
+
+# rows per executemany() call inside one write transaction
+BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    account_type TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    balance REAL NOT NULL,
+    opening_balance REAL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT PRIMARY KEY,
+    account_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_account ON transactions(account_id, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category COLLATE NOCASE, date);
+CREATE TABLE IF NOT EXISTS budgets (
+    id TEXT PRIMARY KEY,
+    month TEXT NOT NULL,
+    category TEXT NOT NULL,
+    limit_amount REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    name TEXT PRIMARY KEY
+);
+"""
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Keeps all three datasets in one SQLite file. Transactions are indexed by
+    id, account_id, date and category, so query_transactions() and
+    transaction_totals() run inside SQLite instead of over a loaded ledger.
+    Rows come back in insertion (rowid) order, like the CSV files.
+
+    main.py always works on the CSV directory; this backend is reached
+    through the managers' load_from()/save_to() and migrate_csv_to_sqlite().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.conn = sqlite3.connect(path)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.executescript(_SCHEMA)
+            self._migrate()
+        except sqlite3.Error as e:
+            raise StorageError(f"Failed to open SQLite database {path}: {e}")
+
+    def _migrate(self):
+        # databases created before accounts kept an opening balance
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(accounts)")}
+        if "opening_balance" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE accounts ADD COLUMN opening_balance REAL")
+
+    def close(self):
+        self.conn.close()
+
+    def location(self, dataset: str) -> str:
+        return os.path.abspath(self.path) + "#" + dataset
+
+    def exists(self, dataset: str) -> bool:
+        # a dataset that was saved empty still "exists"
+        row = self.conn.execute("SELECT 1 FROM datasets WHERE name = ?", (dataset,)).fetchone()
+        return row is not None
+
+    def _table(self, dataset: str) -> str:
+        if dataset not in DATASETS:
+            raise StorageError(f"Unknown dataset {dataset}")
+        return dataset
+
+    def save_rows(self, dataset: str, fieldnames: List[str], rows: Iterable[Dict]) -> int:
+        """Replace the table's contents in one transaction. Returns the rows written."""
+        table = self._table(dataset)
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            table, ", ".join(fieldnames), ", ".join("?" for _ in fieldnames))
+        count = 0
+        it = iter(rows)
+        try:
+            with self.conn:
+                self.conn.execute(f"DELETE FROM {table}")
+                while True:
+                    batch = [tuple(r[f] for f in fieldnames) for r in islice(it, BATCH_SIZE)]
+                    if not batch:
+                        break
+                    self.conn.executemany(sql, batch)
+                    count += len(batch)
+                self.conn.execute("INSERT OR IGNORE INTO datasets (name) VALUES (?)", (dataset,))
+        except sqlite3.Error as e:
+            raise StorageError(f"Failed to save {dataset} to {self.path}: {e}")
+        return count
+
+    def _iter_sql(self, sql: str, params=(), chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        try:
+            cur = self.conn.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield [dict(r) for r in rows]
+        except sqlite3.Error as e:
+            raise StorageError(f"Failed to read from {self.path}: {e}")
+
+    def iter_rows(self, dataset: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+        table = self._table(dataset)
+        return self._iter_sql(f"SELECT * FROM {table} ORDER BY rowid", (), chunk_size)
+
+    def query_transactions(self, account_id: Optional[str] = None, category: Optional[str] = None,
+                           date_from: Optional[str] = None, date_to: Optional[str] = None) -> Iterator[Dict]:
+        sql, params = self._transaction_filter(account_id, category, date_from, date_to)
+        for chunk in self._iter_sql("SELECT * FROM transactions" + sql + " ORDER BY date, id", params):
+            yield from chunk
+
+    def explain_query(self, **filters) -> str:
+        """SQLite's plan for query_transactions(**filters); handy to confirm index use."""
+        sql, params = self._transaction_filter(**filters)
+        rows = self.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM transactions" + sql + " ORDER BY date, id", params).fetchall()
+        return "\n".join(r["detail"] for r in rows)
+
+    @staticmethod
+    def _transaction_filter(account_id=None, category=None, date_from=None, date_to=None) -> Tuple[str, list]:
+        clauses, params = [], []
+        if account_id is not None:
+            clauses.append("account_id = ?")
+            params.append(account_id)
+        if category is not None:
+            clauses.append("category = ? COLLATE NOCASE")
+            params.append(category)
+        if date_from is not None:
+            clauses.append("date >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            clauses.append("date <= ?")
+            params.append(date_to)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def transaction_totals(self) -> Dict[Tuple[str, str], float]:
+        rows = self.conn.execute(
+            "SELECT account_id, lower(category) AS category, SUM(amount) AS total "
+            "FROM transactions GROUP BY account_id, lower(category)").fetchall()
+        return {(r["account_id"], r["category"]): r["total"] for r in rows}
+
+
+def migrate_csv_to_sqlite(data_dir: str, db_path: str) -> Dict[str, int]:
+    """
+    Copy accounts.csv, transactions.csv and budgets.csv from data_dir into the
+    SQLite database at db_path, validating every row on the way. Transactions
+    are streamed, so the ledger never has to fit in memory at once.
+    Returns the number of rows copied per dataset.
+    """
+    # imported here: the managers import the storage modules themselves
+    from managers.account_manager import AccountManager
+    from managers.budget_manager import BudgetManager
+    from managers.transaction_manager import TransactionManager, TRANSACTION_FIELDS
+    from storage.csv_storage import CsvBackend
+
+    csv_backend = CsvBackend(data_dir)
+    db = SqliteBackend(db_path)
+    counts = {}
+    try:
+        am = AccountManager()
+        am.load_from(csv_backend)
+        am.save_to(db, force=True)
+        counts["accounts"] = len(am)
+
+        bm = BudgetManager()
+        bm.load_from(csv_backend)
+        bm.save_to(db, force=True)
+        counts["budgets"] = len(bm.list_all())
+
+        counted = [0]
+
+        def rows():
+            for chunk in TransactionManager.iter_transactions(csv_backend.path("transactions")):
+                counted[0] += len(chunk)
+                for tx in chunk:
+                    yield tx.to_dict()
+
+        db.save_rows("transactions", TRANSACTION_FIELDS, rows())
+        counts["transactions"] = counted[0]
+    finally:
+        db.close()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the CSV data directory into a SQLite database.")
+    parser.add_argument("data_dir", help="directory holding accounts.csv, transactions.csv, budgets.csv")
+    parser.add_argument("db_path", help="SQLite file to create or overwrite")
+    args = parser.parse_args()
+    result = migrate_csv_to_sqlite(args.data_dir, args.db_path)
+    print(", ".join(f"{n} {name}" for name, n in result.items()) + f" migrated to {args.db_path}")
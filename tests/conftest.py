@@ -0,0 +1,25 @@
+import pytest
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+from models.account import CashAccount, BankAccount
+
+
+@pytest.fixture
+def am():
+    """Two accounts in different currencies: A1 (cash, HUF 1000) and A2 (bank, EUR 500)."""
+    am = AccountManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 1000))
+    am.create(BankAccount("A2", "Main", "EUR", 500))
+    return am
+
+
+@pytest.fixture
+def tm():
+    return TransactionManager()
+
+
+@pytest.fixture
+def bm():
+    return BudgetManager()
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+import main
+from managers.balance_history import BalanceHistory
+from models.transaction import Transaction
+from exceptions import NotFoundError
+
+
+def _replayed_balance(am, tm, account_id, date):
+    # the slow way: current balance minus every later flow
+    later = sum(t.amount if t.category == "income" else -t.amount
+                for t in tm.list_all() if t.account_id == account_id and t.date > date)
+    return am.get(account_id).balance - later
+
+
+@pytest.fixture
+def history(am, tm):
+    return BalanceHistory(am, tm)
+
+
+def test_balance_as_of_and_net_flow(tm, history):
+    tm.create(Transaction("T1", "A1", "2025-06-10", 300, "income", ""))
+    tm.create(Transaction("T2", "A1", "2025-07-01", 100, "expense", ""))
+    tm.create(Transaction("T3", "A1", "2025-05-01", 50, "expense", ""))
+    assert history.balance_as_of("A1", "2025-06-30") == 1100
+    assert history.balance_as_of("A1", "2025-04-30") == 850
+    assert history.balance_as_of("A1", "2025-07-01") == 1000
+    assert history.balance_as_of("A2", "2025-01-01") == 500
+    assert history.net_flow("A1", "2025-05-01", "2025-06-30") == 250
+    assert history.net_flow("A1", date_from="2025-06-11") == -100
+    assert history.net_flow("A2") == 0
+    assert history.balances_as_of("2025-06-30") == {"A1": 1100, "A2": 500}
+    with pytest.raises(NotFoundError):
+        history.balance_as_of("NOPE", "2025-06-30")
+
+
+def test_follows_creates_updates_and_deletes(am, tm, history):
+    rng = random.Random(3)
+    history.balances_as_of("2025-01-01")  # built now, maintained from here on
+    live = []
+    for i in range(400):
+        action = rng.random()
+        if live and action < 0.2:
+            tm.delete(live.pop(rng.randrange(len(live))))
+        elif live and action < 0.4:
+            tm.update(rng.choice(live), date=f"2025-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}",
+                      amount=rng.randint(1, 500), category=rng.choice(["income", "expense"]))
+        else:
+            tx_id = f"T{i}"
+            tm.create(Transaction(tx_id, rng.choice(["A1", "A2"]),
+                                  f"2025-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}",
+                                  rng.randint(1, 500), rng.choice(["income", "expense"]), ""))
+            live.append(tx_id)
+    for date in ("2024-12-31", "2025-03-15", "2025-08-01", "2025-12-31"):
+        for account_id in ("A1", "A2"):
+            assert history.balance_as_of(account_id, date) == pytest.approx(
+                _replayed_balance(am, tm, account_id, date))
+    assert history.net_flow("A1", "2025-03-01", "2025-05-31") == pytest.approx(sum(
+        t.amount if t.category == "income" else -t.amount for t in tm.query("A1", None, "2025-03-01", "2025-05-31")))
+
+
+def test_rebuilds_after_load(tmp_path, tm, history):
+    tm.create(Transaction("T1", "A1", "2025-06-10", 300, "income", ""))
+    assert history.balance_as_of("A1", "2025-01-01") == 700
+    path = str(tmp_path / "tx.csv")
+    tm.save(path)
+    tm.create(Transaction("T2", "A1", "2025-06-11", 200, "income", ""))
+    tm.load(path)
+    assert history.balance_as_of("A1", "2025-01-01") == 700
+
+
+def test_balance_command(tmp_path, monkeypatch, capsys, am, tm):
+    for name in ("DATA_DIR", "ACC_CSV", "TX_CSV", "BUD_CSV", "JOURNAL", "SNAPSHOT", "RATES_CSV"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    tm.create(Transaction("T1", "A1", "2025-06-10", 300, "income", ""))
+    am.save(str(tmp_path / "accounts.csv"))
+    tm.save(str(tmp_path / "transactions.csv"))
+    base = ["--plain", "--data-dir", str(tmp_path), "balance"]
+    assert main.main(base + ["--as-of", "2025-06-09", "--account", "A1", "--since", "2025-01-01"]) == 0
+    assert capsys.readouterr().out.splitlines() == ["ID\tName\tBalance\tCurrency\tNet flow",
+                                                    "A1\tWallet\t700.00\tHUF\t+0.00"]
+    assert main.main(base + ["--as-of", "2025-13-01"]) == 1
+
+
+def test_backdated_entries_are_point_updates(monkeypatch, am, tm, history):
+    from managers import balance_history
+    tm.create(Transaction("T0", "A1", "2025-01-01", 1, "expense", ""))
+    tm.create(Transaction("T1", "A1", "2025-12-31", 1, "expense", ""))
+    history.balances_as_of("2025-01-01")
+    rebuilds = []
+    real = balance_history._Series._rebuild
+    monkeypatch.setattr(balance_history._Series, "_rebuild", lambda self: rebuilds.append(1) or real(self))
+    # a statement imported newest first: every row lands before the last one
+    tm.create_many(Transaction(f"T{i}", "A1", f"2025-{12 - i // 28:02}-{28 - i % 28:02}", 1, "expense", "")
+                   for i in range(2, 302))
+    assert history.balance_as_of("A1", "2025-01-31") == pytest.approx(
+        _replayed_balance(am, tm, "A1", "2025-01-31"))
+    assert history.net_flow("A1", "2025-12-01", "2025-12-31") == -27
+    assert rebuilds == []
+
+    # dates outside the span grow it, once per side here
+    tm.create(Transaction("T900", "A1", "2023-06-01", 5, "income", ""))
+    tm.create(Transaction("T901", "A1", "2027-06-01", 5, "income", ""))
+    assert len(rebuilds) == 2
+    assert history.balance_as_of("A1", "2023-05-31") == pytest.approx(1000 + 302 - 10)
+    assert history.balance_as_of("A1", "2026-01-01") == pytest.approx(1000 - 5)
+    assert history.net_flow("A1", "2023-01-01", "2025-01-01") == 4
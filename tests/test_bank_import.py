@@ -0,0 +1,86 @@
+import pytest
+
+import storage.bank_import as bank_import
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from models.account import CashAccount
+from models.transaction import Transaction
+from storage.bank_import import ImportSpec, import_statement
+from exceptions import StorageError, ValidationError
+
+
+def _managers():
+    am, tm = AccountManager(), TransactionManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 1000))
+    am.create(CashAccount("A2", "Spare", "EUR", 0))
+    tm.create(Transaction("T1", "A1", "2025-11-15", 700, "expense", "Grocery"))
+    return am, tm
+
+
+def test_import_reports_rejected_lines_and_adjusts_balances(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text(
+        "Ref,Account,Booked,Value,Text\n"
+        "R1,A1,2025-12-01,-100.5,Rent\n"
+        "R2,A2,2025-12-02,40,Refund\n"
+        "R3,A1,2025-13-01,5,Bad date\n"
+        "\n"
+        "R4,NOPE,2025-12-03,5,Unknown account\n"
+        "T1,A1,2025-12-04,5,Clashes with the ledger\n"
+        "R2,A2,2025-12-05,5,Repeated id\n"
+        "R5,A1,2025-12-06\n"
+        "R6,A1,2025-12-07,20,Salary\n",
+        encoding="utf-8")
+    am, tm = _managers()
+    spec = ImportSpec({"id": "Ref", "account_id": "Account", "date": "Booked",
+                       "amount": "Value", "description": "Text"})
+    result = import_statement(str(path), tm, am, spec, workers=1)
+
+    assert result.imported == 3
+    assert [line for line, _ in result.rejected] == [4, 6, 7, 8, 9]
+    assert "Date" in result.rejected[0][1]
+    assert tm.get("R1").category == "expense" and tm.get("R1").amount == 100.5
+    assert tm.get("R6").category == "income"
+    assert am.get("A1").balance == pytest.approx(1000 - 100.5 + 20)
+    assert am.get("A2").balance == 40
+    assert [t.id for t in tm.query(date_from="2025-12-01")] == ["R1", "R2", "R6"]
+
+
+def test_import_requires_mapped_columns(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text("date,amount\n2025-12-01,5\n", encoding="utf-8")
+    am, tm = _managers()
+    with pytest.raises(StorageError):
+        import_statement(str(path), tm, am, ImportSpec({"description": "Memo"}, account="A1"))
+    with pytest.raises(ValidationError):
+        ImportSpec({"colour": "Memo"})
+
+
+def test_parallel_import_matches_serial(tmp_path, monkeypatch):
+    lines = ["date,amount,description"]
+    for i in range(3000):
+        amount = "oops" if i % 500 == 7 else f"{(-1) ** i * (i % 90 + 1)}.25"
+        lines.append(f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d},{amount},row {i}")
+    path = tmp_path / "statement.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    monkeypatch.setattr(bank_import, "MIN_PARALLEL_BYTES", 0)
+
+    results = []
+    for workers in (1, 3):
+        am, tm = _managers()
+        result = import_statement(str(path), tm, am, ImportSpec(account="A1", id_prefix="S"), workers=workers)
+        results.append((result.imported, result.rejected, am.get("A1").balance,
+                        [t.to_dict() for t in tm.list_all()]))
+    assert results[0] == results[1]
+    assert results[0][0] == 2994
+    assert [line for line, _ in results[0][1]] == [i + 2 for i in range(3000) if i % 500 == 7]
+
+
+def test_create_many_is_all_or_nothing():
+    am, tm = _managers()
+    with pytest.raises(ValidationError):
+        tm.create_many([Transaction("N1", "A1", "2025-01-01", 5, "expense", ""),
+                        Transaction("N1", "A1", "2025-01-02", 5, "expense", "")])
+    assert len(tm) == 1
+    assert tm.create_many([Transaction("N2", "A1", "2025-01-01", 5, "expense", "")]) == 1
+    assert [t.id for t in tm.query()] == ["N2", "T1"]
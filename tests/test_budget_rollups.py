@@ -0,0 +1,84 @@
+import pytest
+
+from managers.budget_rollups import MonthlyRollups
+from models.transaction import Transaction
+from models.budget import Budget
+from exceptions import ValidationError
+
+
+@pytest.fixture
+def bm(bm):
+    bm.create(Budget("B1", "2025-11", "Grocery", 1000))
+    bm.create(Budget("B2", "2025-11", "Rent", 300))
+    bm.create(Budget("B3", "2025-12", "Grocery", 50))
+    return bm
+
+
+@pytest.fixture
+def rollups(am, tm, bm):
+    return MonthlyRollups(am, tm, bm)
+
+
+def _fresh(am, tm, bm):
+    return MonthlyRollups(am, tm, bm).totals()
+
+
+def test_status_reports_spent_remaining_and_percent(tm, bm, rollups):
+    tm.create(Transaction("T1", "A1", "2025-11-03", 400, "expense", "Grocery"))
+    tm.create(Transaction("T2", "A1", "2025-11-20", 200, "expense", "grocery"))
+    tm.create(Transaction("T3", "A1", "2025-11-21", 999, "income", "Grocery"))
+    tm.create(Transaction("T4", "A2", "2025-11-22", 30, "expense", "Grocery"))
+    tm.create(Transaction("T5", "A1", "2025-12-01", 80, "expense", "Grocery"))
+
+    status = {s.budget.id: s for s in bm.status("2025-11", rollups)}
+    assert set(status) == {"B1", "B2"}
+    assert status["B1"].currency == "HUF"
+    assert status["B1"].spent == 600
+    assert status["B1"].remaining == 400
+    assert status["B1"].percent_used == pytest.approx(60.0)
+    assert status["B1"].other_spending == {"EUR": 30}
+    assert status["B2"].spent == 0
+
+    dec = bm.status("2025-12", rollups)[0]
+    assert dec.remaining == -30 and dec.percent_used == pytest.approx(160.0)
+    with pytest.raises(ValidationError):
+        bm.status("2025-13", rollups)
+
+
+def test_rollups_follow_every_change(tmp_path, am, tm, bm, rollups):
+    rollups.totals()  # build, then maintain incrementally
+    tm.create(Transaction("T1", "A1", "2025-11-03", 400, "expense", "Grocery"))
+    tm.create(Transaction("T2", "A2", "2025-11-04", 100, "expense", "Rent"))
+    assert rollups.totals() == _fresh(am, tm, bm)
+
+    tm.update("T1", date="2025-12-01", amount=40)
+    tm.update("T2", description="Grocery")
+    assert rollups.totals() == _fresh(am, tm, bm)
+    assert rollups.spending("2025-12", "grocery") == {"HUF": 40}
+
+    tm.update("T1", category="income")
+    assert rollups.spending("2025-12", "Grocery") == {}
+
+    am.update("A2", currency="USD")
+    assert rollups.spending("2025-11", "Grocery") == {"USD": 100}
+    am.delete("A2")
+    tm.delete("T1")
+    assert rollups.totals() == _fresh(am, tm, bm) == {}
+
+    # a reload marks them stale; the next read rebuilds
+    tm.create(Transaction("T9", "A1", "2025-11-05", 5, "expense", "Rent"))
+    tm.load(str(tmp_path / "missing.csv"))
+    assert rollups.totals() == {}
+
+
+def test_only_budgeted_categories_get_buckets(tm, bm, rollups):
+    rollups.totals()
+    for i in range(50):
+        tm.create(Transaction(f"T{i}", "A1", "2025-11-03", 10, "expense", f"Shop {i}"))
+    tm.create(Transaction("T99", "A1", "2025-11-04", 5, "expense", "Grocery"))
+    assert rollups.totals() == {("2025-11", "grocery", "HUF"): 5}
+
+    # a budget naming a new category brings its spending in
+    bm.create(Budget("B4", "2025-11", "Shop 7", 20))
+    assert rollups.spending("2025-11", "shop 7") == {"HUF": 10}
+    assert len(rollups.totals()) == 2
@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import main
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from models.account import CashAccount
+from models.transaction import Transaction
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    am, tm = AccountManager(), TransactionManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 1000))
+    tm.create(Transaction("T1", "A1", "2025-11-15", 700, "expense", "Grocery"))
+    am.save(str(tmp_path / "accounts.csv"))
+    tm.save(str(tmp_path / "transactions.csv"))
+    # main keeps the data paths in module globals; put them back afterwards
+    for name in ("DATA_DIR", "ACC_CSV", "TX_CSV", "BUD_CSV", "JOURNAL", "SNAPSHOT", "RATES_CSV"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    return str(tmp_path)
+
+
+def test_subcommands_round_trip(data_dir, capsys):
+    base = ["--plain", "--data-dir", data_dir]
+    assert main.main(base + ["tx", "add", "T2", "--account", "A1", "--date", "2025-11-20",
+                             "--amount", "50", "--category", "income", "--description", "Refund"]) == 0
+    capsys.readouterr()
+
+    assert main.main(base + ["tx", "list", "--from", "2025-11-16"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].split("\t")[0] == "ID"
+    assert [l.split("\t")[0] for l in lines[1:]] == ["T2"]
+    assert main.main(base + ["tx", "list", "--from", "2025-11-9", "--to", "2025-11-16"]) == 0
+    assert [l.split("\t")[0] for l in capsys.readouterr().out.splitlines()[1:]] == ["T1"]
+
+    assert main.main(base + ["tx", "find", "amount>60 order by date desc"]) == 0
+    assert [l.split("\t")[0] for l in capsys.readouterr().out.splitlines()[1:]] == ["T1"]
+    assert main.main(base + ["tx", "find", "--explain", "date>=2025-11-16"]) == 0
+    assert capsys.readouterr().out.startswith("access: date range")
+
+    assert main.main(base + ["account", "list"]) == 0
+    assert "1050.00 HUF" in capsys.readouterr().out
+
+    assert main.main(base + ["export", "transactions", "--format", "json"]) == 0
+    assert [r["id"] for r in json.loads(capsys.readouterr().out)] == ["T1", "T2"]
+
+    assert main.main(base + ["summary"]) == 0
+    summary = capsys.readouterr().out.splitlines()[1].split("\t")
+    assert summary[0] == "HUF" and summary[2] == "50.00 HUF" and summary[3] == "700.00 HUF"
+
+
+def test_subcommand_errors_exit_nonzero(data_dir, capsys):
+    base = ["--plain", "--data-dir", data_dir]
+    rc = main.main(base + ["tx", "add", "T1", "--account", "A1", "--date", "2025-11-20",
+                           "--amount", "5", "--category", "expense"])
+    assert rc == 1
+    assert "already exists" in capsys.readouterr().err
+    assert main.main(base + ["tx", "add", "T9", "--account", "NOPE", "--date", "2025-11-20",
+                             "--amount", "5", "--category", "expense"]) == 1
+    capsys.readouterr()
+    assert main.main(base + ["tx", "list", "--to", "2025-11-31"]) == 1
+    assert "YYYY-MM-DD" in capsys.readouterr().err
+
+
+def test_plain_subcommands_do_not_import_rich(data_dir):
+    code = ("import sys, main; main.main(['--plain', '--data-dir', sys.argv[1], 'account', 'list']); "
+            "print('rich' in sys.modules, 'multiprocessing' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code, data_dir], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.splitlines()[-1] == "False False"
+
+
+def test_plain_summary_of_a_small_ledger_skips_numpy(data_dir):
+    (Path(data_dir) / "rates.csv").write_text("date,currency,rate\n2025-01-01,HUF,1\n", encoding="utf-8")
+    code = ("import sys, main; main.main(['--plain', '--data-dir', sys.argv[1], 'summary']); "
+            "print('numpy' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", code, data_dir], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.splitlines()[-2:] == ["All in HUF\t0.00 HUF\t0.00 HUF\t700.00 HUF\t1000.00 HUF", "False"]
+
+
+def test_browse_pages_through_ledger(monkeypatch, capsys):
+    am, tm = AccountManager(), TransactionManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 1000))
+    for i in range(12):
+        tm.create(Transaction(f"T{i:02d}", "A1", f"2025-01-{i + 1:02d}", 10, "expense", ""))
+
+    main._load_rich()
+    answers = iter(["n", "n", "n", "p", "j", "1", "j", "2025-01-07", "j", "bogus", "q"])
+    monkeypatch.setattr(main.Prompt, "ask", lambda *a, **k: next(answers))
+    main.browse_transactions(tm, am, page_size=5)
+    out = capsys.readouterr().out
+    for caption in ("rows 1-5 of 12", "rows 6-10 of 12", "rows 11-12 of 12", "Already on the last page",
+                    "rows 7-11 of 12"):
+        assert caption in out
+    assert "YYYY-MM-DD" in out
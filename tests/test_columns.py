@@ -0,0 +1,46 @@
+import pytest
+
+import managers.transaction_columns as columns_mod
+from managers.transaction_manager import TransactionManager
+from models.transaction import Transaction
+
+
+def _ledger():
+    tm = TransactionManager()
+    tm.create(Transaction("T1", "A1", "2025-11-15", 700, "expense", "Grocery"))
+    tm.create(Transaction("T2", "A1", "2025-10-01", 50, "Income", "Refund"))
+    tm.create(Transaction("T3", "A2", "2025-11-02", 500, "expense", "Rent"))
+    tm.create(Transaction("T4", "A3", "2025-11-03", 20, "expense", "Orphan"))
+    return tm
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columns_mod, "np", None)
+    return request.param
+
+
+def test_columns_aggregates(backend):
+    cols = _ledger().columns()
+
+    income, expense = cols.totals_by_currency({"A1": "HUF", "A2": "EUR"})
+    assert income == {"HUF": 50}
+    assert expense == {"HUF": 700, "EUR": 500}
+
+    assert cols.sum_by_account("expense") == {"A1": 700, "A2": 500, "A3": 20}
+    assert cols.sum_by_account_category()[("A1", "income")] == 50
+    assert cols.sum_by_month("expense") == {"2025-11": 1220}
+
+
+def test_columns_object_view_and_cache(backend):
+    tm = _ledger()
+    cols = tm.columns()
+    assert tm.columns() is cols
+    assert [t.to_dict() for t in cols] == [t.to_dict() for t in tm.list_all()]
+
+    tm.delete("T4")
+    assert tm.columns() is not cols
+    assert len(tm.columns()) == 3
@@ -0,0 +1,151 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+import storage.locking as locking
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+from models.account import CashAccount
+from models.transaction import Transaction
+from models.budget import Budget
+from storage.journal import Journal
+from exceptions import ConflictError, StorageError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    for name in ("DATA_DIR", "ACC_CSV", "TX_CSV", "BUD_CSV", "JOURNAL", "SNAPSHOT", "RATES_CSV"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    main.set_data_dir(str(tmp_path))
+    am, bm = AccountManager(), BudgetManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 1000))
+    bm.create(Budget("B1", "2025-11", "Grocery", 500))
+    am.save(main.ACC_CSV)
+    bm.save(main.BUD_CSV)
+    return str(tmp_path)
+
+
+def _process():
+    """A stand-in for another process: its own managers and journal."""
+    managers = {"accounts": AccountManager(), "transactions": TransactionManager(), "budgets": BudgetManager()}
+    journal = Journal(main.JOURNAL)
+    for name, manager in managers.items():
+        journal.attach(name, manager)
+    main.load_datasets(managers, journal)
+    return managers, journal
+
+
+def _add(managers, tx_id, amount):
+    managers["transactions"].create(Transaction(tx_id, "A1", "2025-11-15", amount, "expense", ""))
+    managers["accounts"].adjust_balance("A1", -amount)
+
+
+def test_stale_writer_gets_conflict(data_dir):
+    (a, ja), (b, jb) = _process(), _process()
+    b["budgets"].update("B1", limit_amount=600)
+    assert jb.flush() == 1
+    a["budgets"].update("B1", limit_amount=700)
+    with pytest.raises(ConflictError) as err:
+        main.save_changes(a, ja)
+    assert err.value.datasets == ("budgets",)
+    assert ja.pending == 1  # kept, nothing was overwritten
+    assert _process()[0]["budgets"].get("B1").limit_amount == 600
+
+
+def test_concurrent_inserts_are_merged(data_dir):
+    (a, ja), (b, jb) = _process(), _process()
+    _add(b, "T1", 100)
+    _add(a, "T2", 30)
+    assert main.save_changes(b, jb) == 2
+    assert main.save_changes(a, ja) == 2
+    assert a["accounts"].get("A1").balance == 870
+    fresh, _ = _process()
+    assert sorted(t.id for t in fresh["transactions"].list_all()) == ["T1", "T2"]
+    assert fresh["accounts"].get("A1").balance == 870
+
+
+def test_merge_refuses_taken_ids(data_dir):
+    (a, ja), (b, jb) = _process(), _process()
+    _add(b, "T1", 100)
+    _add(a, "T1", 30)
+    main.save_changes(b, jb)
+    with pytest.raises(ConflictError, match="T1"):
+        main.save_changes(a, ja)
+    assert _process()[0]["accounts"].get("A1").balance == 900
+
+
+def test_balance_set_outright_is_not_rebased(data_dir):
+    (a, ja), (b, jb) = _process(), _process()
+    b["transactions"].create(Transaction("T1", "A1", "2025-11-15", 100, "income", ""))
+    b["accounts"].adjust_balance("A1", 100)
+    main.save_changes(b, jb)
+    a["accounts"].update("A1", balance=5000)
+    with pytest.raises(ConflictError, match="A1"):
+        main.save_changes(a, ja)
+    assert ja.pending == 1
+    assert _process()[0]["accounts"].get("A1").balance == 1100
+
+
+def test_compaction_keeps_other_writers_records(data_dir):
+    (a, ja), (b, jb) = _process(), _process()
+    _add(b, "T1", 100)
+    main.save_changes(b, jb)
+    main.compact(a["accounts"], a["transactions"], a["budgets"], ja)
+    assert not os.path.exists(main.JOURNAL)
+    fresh, journal = _process()
+    assert [t.id for t in fresh["transactions"].list_all()] == ["T1"]
+    assert fresh["accounts"].get("A1").balance == 900
+    assert journal.versions()["generation"] == 1
+
+
+def test_reads_retry_while_versions_move(data_dir, monkeypatch):
+    managers, journal = _process()
+    calls = []
+    real = journal.versions
+
+    def moving():
+        # a writer commits on every look for a while
+        calls.append(1)
+        return {"transactions": len(calls)} if len(calls) <= 4 else real()
+
+    monkeypatch.setattr(journal, "versions", moving)
+    main.load_datasets(managers, journal)
+    assert len(calls) > 4 and journal.loaded == real()
+
+
+@pytest.mark.skipif(locking.fcntl is None, reason="no advisory locks on this platform")
+def test_lock_timeout(tmp_path):
+    path = str(tmp_path / "ledger.lock")
+    with locking.FileLock(path) as held:
+        with held:  # reentrant
+            pass
+        with pytest.raises(StorageError):
+            locking.FileLock(path, timeout=0.05).acquire()
+        # shared locks wait for the exclusive one too
+        with pytest.raises(StorageError):
+            locking.FileLock(path, exclusive=False, timeout=0.05).acquire()
+    with locking.FileLock(path, exclusive=False), locking.FileLock(path, exclusive=False, timeout=0.05):
+        pass
+
+
+@pytest.mark.skipif(locking.fcntl is None, reason="no advisory locks on this platform")
+def test_processes_adding_at_once_lose_nothing(data_dir):
+    code = ("import sys, main\n"
+            "for i in range(8):\n"
+            "    rc = main.main(['--plain', '--data-dir', sys.argv[1], 'tx', 'add', f'{sys.argv[2]}-{i}',\n"
+            "                    '--account', 'A1', '--date', '2025-11-15', '--amount', '5', '--category', 'expense'])\n"
+            "    assert rc == 0, rc\n")
+    workers = [subprocess.Popen([sys.executable, "-c", code, data_dir, f"P{n}"], cwd=ROOT,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+               for n in range(4)]
+    for w in workers:
+        assert w.wait(timeout=120) == 0, w.stderr.read()
+    fresh, _ = _process()
+    assert len(fresh["transactions"]) == 32
+    assert fresh["accounts"].get("A1").balance == 1000 - 32 * 5
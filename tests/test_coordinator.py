@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+from storage.coordinator import run_concurrently
+from exceptions import StorageError, StorageErrors, ValidationError
+
+
+def test_jobs_run_side_by_side():
+    # each job waits for the other, so this only finishes if they overlap
+    barrier = threading.Barrier(2, timeout=5)
+
+    def job(value):
+        def run():
+            barrier.wait()
+            return value
+        return run
+
+    assert run_concurrently({"a": job(1), "b": job(2)}) == {"a": 1, "b": 2}
+    assert run_concurrently({}) == {}
+
+
+def test_errors_surface_and_aggregate():
+    done = []
+
+    def ok():
+        done.append("ok")
+        return 1
+
+    def bad_validation():
+        raise ValidationError("bad row")
+
+    def bad_io():
+        raise OSError("disk full")
+
+    with pytest.raises(ValidationError, match="bad row"):
+        run_concurrently({"ok": ok, "bad": bad_validation})
+    # the other jobs still ran to completion
+    assert done == ["ok"]
+
+    with pytest.raises(StorageError, match="disk full"):
+        run_concurrently({"io": bad_io})
+
+    with pytest.raises(StorageErrors) as info:
+        run_concurrently({"ok": ok, "v": bad_validation, "io": bad_io})
+    assert set(info.value.errors) == {"v", "io"}
+    assert isinstance(info.value.errors["io"], StorageError)
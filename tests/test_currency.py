@@ -0,0 +1,117 @@
+import pytest
+
+import main
+import managers.ledger_totals as ledger_totals
+import managers.transaction_columns as transaction_columns
+from managers.budget_rollups import MonthlyRollups
+from managers.ledger_totals import LedgerTotals
+from managers.currency import CurrencyConverter
+from models.account import BankAccount
+from models.transaction import Transaction
+from models.budget import Budget
+from exceptions import NotFoundError, StorageError
+
+RATES = [
+    ("2025-01-01", "EUR", 1.0),
+    ("2025-01-01", "HUF", 0.0025),
+    ("2025-06-01", "HUF", 0.002),
+    ("2025-01-01", "usd", 0.5),
+]
+
+
+@pytest.fixture
+def ledger(am, tm, bm):
+    am.create(BankAccount("A3", "Travel", "USD", 10))
+    tm.create(Transaction("T1", "A1", "2025-03-01", 40000, "expense", "Grocery"))
+    tm.create(Transaction("T2", "A1", "2025-07-01", 50000, "expense", "Grocery"))
+    tm.create(Transaction("T3", "A2", "2025-07-02", 20, "expense", "Grocery"))
+    tm.create(Transaction("T4", "A3", "2025-07-03", 100, "income", "Refund"))
+    tm.create(Transaction("T5", "ZZ", "2025-07-03", 999, "expense", "Orphan"))
+    bm.create(Budget("B1", "2025-07", "Grocery", 100000))
+    return am, tm, bm
+
+
+def test_rates_apply_on_or_before_the_date():
+    rates = CurrencyConverter(RATES)
+    assert rates.currencies == ["EUR", "HUF", "USD"]
+    assert rates.convert(1000, "HUF", "EUR", on="2025-05-31") == pytest.approx(2.5)
+    assert rates.convert(1000, "HUF", "EUR", on="2025-06-01") == pytest.approx(2.0)
+    assert rates.convert(1000, "HUF", "EUR") == pytest.approx(2.0)
+    # before the first rate, the earliest one is used
+    assert rates.convert(1000, "HUF", "EUR", on="2020-01-01") == pytest.approx(2.5)
+    assert rates.convert(10, "EUR", "USD", on="2025-07-01") == pytest.approx(20)
+    assert rates.convert(7, "JPY", "JPY") == 7
+    with pytest.raises(NotFoundError):
+        rates.convert(1, "JPY", "EUR")
+
+
+def test_rate_lookups_are_cached():
+    rates = CurrencyConverter(RATES)
+    for _ in range(5):
+        rates.convert(1, "HUF", "EUR", on="2025-03-01")
+    info = rates.rate.cache_info()
+    assert info.misses == 2 and info.hits == 8
+
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_convert_columns(monkeypatch, ledger, vectorized):
+    if not vectorized:
+        monkeypatch.setattr(transaction_columns, "np", None)
+    elif transaction_columns.np is None:
+        pytest.skip("numpy not installed")
+    am, tm, _ = ledger
+    rates = CurrencyConverter(RATES)
+    cols = transaction_columns.TransactionColumns(tm.list_all())
+    converted = [float(v) for v in rates.convert_columns(cols, am.currency_map(), "EUR")]
+    assert converted == pytest.approx([100, 100, 20, 50, 0])
+    assert cols.income_expense(rates.convert_columns(cols, am.currency_map(), "EUR")) == pytest.approx((50, 220))
+
+
+@pytest.mark.parametrize("columnar", [True, False])
+def test_consolidated_summary_and_budget_status(monkeypatch, ledger, columnar):
+    if columnar:
+        monkeypatch.setattr(ledger_totals, "COLUMNAR_MIN_ROWS", 0)
+    am, tm, bm = ledger
+    rates = CurrencyConverter(RATES)
+    c = LedgerTotals(am, tm, bm).consolidated(rates, "EUR")
+    assert c["balance"] == pytest.approx(1000 * 0.002 + 500 + 5)
+    assert c["income"] == pytest.approx(50)
+    assert c["expense"] == pytest.approx(220)
+    assert c["budget"] == pytest.approx(200)
+
+    status = bm.status("2025-07", MonthlyRollups(am, tm, bm), rates)[0]
+    assert status.spent == 50000
+    assert status.other_spending == {"EUR": 20}
+    assert status.total_spent == pytest.approx(60000)
+    assert status.remaining == pytest.approx(40000)
+    assert bm.status("2025-07", MonthlyRollups(am, tm, bm))[0].total_spent is None
+
+
+def test_load_rates_csv(tmp_path):
+    path = tmp_path / "rates.csv"
+    path.write_text("date,currency,rate\n2025-01-01,EUR,1\n2025-01-01,HUF,0.0025\n", encoding="utf-8")
+    assert CurrencyConverter.load(str(path)).convert(400, "HUF", "EUR") == pytest.approx(1)
+    assert not CurrencyConverter.load(str(tmp_path / "missing.csv"))
+    path.write_text("date,currency,rate\n2025-01-01,EUR,abc\n", encoding="utf-8")
+    with pytest.raises(StorageError):
+        CurrencyConverter.load(str(path))
+    with pytest.raises(StorageError):
+        CurrencyConverter([("2025-01-01", "EUR", 0)])
+
+
+def test_summary_command_adds_consolidated_row(tmp_path, monkeypatch, capsys, ledger):
+    for name in ("DATA_DIR", "ACC_CSV", "TX_CSV", "BUD_CSV", "JOURNAL", "SNAPSHOT", "RATES_CSV"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    am, tm, bm = ledger
+    tm.delete("T5")
+    am.save(str(tmp_path / "accounts.csv"))
+    tm.save(str(tmp_path / "transactions.csv"))
+    base = ["--plain", "--data-dir", str(tmp_path)]
+    assert main.main(base + ["summary", "--currency", "eur"]) == 1
+    assert "No exchange rates" in capsys.readouterr().err
+
+    (tmp_path / "rates.csv").write_text(
+        "date,currency,rate\n" + "".join(f"{d},{c},{r}\n" for d, c, r in RATES), encoding="utf-8")
+    assert main.main(base + ["summary", "--currency", "eur"]) == 0
+    last = capsys.readouterr().out.splitlines()[-1].split("\t")
+    assert last == ["All in EUR", "0.00 EUR", "50.00 EUR", "220.00 EUR", "507.00 EUR"]
@@ -171,3 +171,100 @@ def test_not_found_errors():
 
     with pytest.raises(NotFoundError):
         am.delete("UNKNOWN-ID")
+
+    with pytest.raises(NotFoundError):
+        BudgetManager().get("UNKNOWN-ID")
+
+
+def test_account_batch_lookup():
+    am = AccountManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 100))
+    am.create(BankAccount("A2", "Main", "EUR", 200))
+
+    found = am.get_many(["A1", "A2", "NOPE", "A1"])
+    assert set(found) == {"A1", "A2"}
+    assert am.currency_map() == {"A1": "HUF", "A2": "EUR"}
+
+    am.delete("A1")
+    assert am.get_by_id("A1") is None
+    assert am.currency_map() == {"A2": "EUR"}
+
+
+def test_budget_lookup_by_id(tmp_path):
+    bm = BudgetManager()
+    bm.create(Budget("B1", "2025-01", "Food", 200))
+    bm.create(Budget("B2", "2025-01", "Rent", 500))
+    bm.restore({"id": "B1", "month": "2025-02", "category": "Food", "limit_amount": "250"})
+    assert [b.id for b in bm.list_all()] == ["B1", "B2"]
+    assert bm.get("B1").limit_amount == 250
+    bm.delete("B1")
+    with pytest.raises(NotFoundError):
+        bm.get("B1")
+
+    path = tmp_path / "budgets.csv"
+    path.write_text("id,month,category,limit_amount\nB1,2025-01,Food,1\nB1,2025-02,Food,2\n", encoding="utf-8")
+    with pytest.raises(ValidationError):
+        bm.load(str(path))
+
+
+def test_transaction_query_indexes():
+    tm = TransactionManager()
+    tm.create(Transaction("T1", "A1", "2025-11-15", 700, "expense", "Grocery"))
+    tm.create(Transaction("T2", "A1", "2025-10-01", 50, "income", "Refund"))
+    tm.create(Transaction("T3", "A2", "2025-11-02", 500, "expense", "Rent"))
+
+    got = tm.query(account_id="A1", category="expense", date_from="2025-11-01", date_to="2025-11-30")
+    assert [t.id for t in got] == ["T1"]
+    assert [t.id for t in tm.query(date_from="2025-11-01")] == ["T3", "T1"]
+
+    # moving a transaction's date/category moves its index entries
+    tm.update("T2", date="2025-11-20", category="expense")
+    assert [t.id for t in tm.query(category="expense", date_from="2025-11-01")] == ["T3", "T1", "T2"]
+    assert tm.query(category="income") == []
+
+    tm.delete("T1")
+    assert [t.id for t in tm.query(account_id="A1")] == ["T2"]
+
+    # ids beyond the BMP sort after any single-character sentinel
+    tm.create(Transaction("\U0001F600x", "A1", "2025-01-31", 5, "expense", ""))
+    assert [t.id for t in tm.query(date_to="2025-01-31")] == ["\U0001F600x"]
+    assert [t.id for t in tm.find("date<=2025-01-31")] == ["\U0001F600x"]
+    assert [t.id for t in tm.find("date>2025-01-31")] == ["T3", "T2"]
+
+
+def test_models_are_compact():
+    t1 = Transaction.from_row({"id": "T1", "account_id": "A" + "1", "date": "2025-01-05",
+                               "amount": "10", "category": "".join(["ex", "pense"]), "description": ""})
+    t2 = Transaction("T2", "".join(["A", "1"]), "2025-1-5", 20, "".join(["expe", "nse"]), "")
+    for obj in (t1, t2, CashAccount("A1", "Wallet", "HUF", 0), Budget("B1", "2025-01", "Food", 10)):
+        assert not hasattr(obj, "__dict__")
+
+    # repeated values share one string object
+    assert t1.category is t2.category
+    assert t1.account_id is t2.account_id
+    # dates are held as ordinals and read back in canonical form
+    assert t1.date_ordinal == t2.date_ordinal == datetime(2025, 1, 5).toordinal()
+    assert t2.date == "2025-01-05"
+    assert t1.date is t2.date
+
+
+def test_transaction_paging():
+    tm = TransactionManager()
+    for i in range(10):
+        tm.create(Transaction(f"T{i}", "A1", f"2025-01-{10 - i:02d}", 10, "expense", ""))
+    order = [t.id for t in tm.query()]
+    assert order == [f"T{i}" for i in range(9, -1, -1)]
+
+    assert [t.id for t in tm.page(0, 4)] == order[:4]
+    assert [t.id for t in tm.page(8, 4)] == order[8:]
+    assert tm.page(20, 4) == []
+
+    first = tm.page_after(None, 4)
+    second = tm.page_after((first[-1].date, first[-1].id), 4)
+    assert [t.id for t in second] == order[4:8]
+    assert [t.id for t in tm.page_before((second[0].date, second[0].id), 4)] == order[:4]
+    assert tm.position((second[0].date, second[0].id)) == 4
+
+    # rows added in front of a page do not shift what follows its key
+    tm.create(Transaction("T99", "A1", "2024-12-31", 10, "expense", ""))
+    assert [t.id for t in tm.page_after((first[-1].date, first[-1].id), 4)] == order[4:8]
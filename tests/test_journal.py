@@ -0,0 +1,147 @@
+import os
+
+import pytest
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+from models.account import CashAccount
+from models.transaction import Transaction
+from models.budget import Budget
+from storage.journal import Journal
+
+
+def _managers(tmp_path, journal):
+    am, tm, bm = AccountManager(), TransactionManager(), BudgetManager()
+    am.load(str(tmp_path / "accounts.csv"))
+    tm.load(str(tmp_path / "transactions.csv"))
+    bm.load(str(tmp_path / "budgets.csv"))
+    journal.replay({"accounts": am, "transactions": tm, "budgets": bm})
+    journal.attach("accounts", am)
+    journal.attach("transactions", tm)
+    journal.attach("budgets", bm)
+    return am, tm, bm
+
+
+def test_journal_replays_on_top_of_snapshot(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    am, tm, bm = _managers(tmp_path, Journal(path))
+    am.create(CashAccount("A1", "Wallet", "HUF", 100))
+    am.save(str(tmp_path / "accounts.csv"))
+
+    journal = Journal(path)
+    am, tm, bm = _managers(tmp_path, journal)
+    tm.create(Transaction("T1", "A1", "2025-01-01", 40, "expense", "Food"))
+    am.adjust_balance("A1", -40)
+    tm.create(Transaction("T2", "A1", "2025-01-02", 5, "expense", "Tea"))
+    tm.update("T2", amount=6)
+    bm.create(Budget("B1", "2025-01", "Food", 200))
+    bm.delete("B1")
+    assert journal.flush() == 6
+    # only the changes were written, not the ledger
+    assert not os.path.exists(tmp_path / "transactions.csv")
+
+    am2, tm2, bm2 = _managers(tmp_path, Journal(path))
+    assert am2.get("A1").balance == 60
+    assert [t.to_dict() for t in tm2.list_all()] == [t.to_dict() for t in tm.list_all()]
+    assert bm2.list_all() == []
+
+
+def test_compaction_and_torn_tail(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(str(path))
+    am, tm, bm = _managers(tmp_path, journal)
+    tm.create(Transaction("T1", "A1", "2025-01-01", 40, "expense", "Food"))
+    journal.flush()
+    # a crash left half a record at the end
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"ds":"transactions","op":"cre')
+
+    am2, tm2, bm2 = _managers(tmp_path, Journal(str(path)))
+    assert [t.id for t in tm2.list_all()] == ["T1"]
+
+    tm2.save(str(tmp_path / "transactions.csv"))
+    Journal(str(path)).truncate()
+    assert not path.exists()
+    am3, tm3, bm3 = _managers(tmp_path, Journal(str(path)))
+    assert [t.id for t in tm3.list_all()] == ["T1"]
+
+
+def test_dirty_tracking_skips_unchanged_files(tmp_path):
+    from storage.csv_storage import SaveStats
+    am, tm = AccountManager(), TransactionManager()
+    acc_path, tx_path = str(tmp_path / "accounts.csv"), str(tmp_path / "transactions.csv")
+    am.create(CashAccount("A1", "Wallet", "HUF", 100))
+    tm.create(Transaction("T1", "A1", "2025-01-01", 40, "expense", "Food"))
+
+    stats = SaveStats()
+    stats.record(am.save(acc_path))
+    stats.record(tm.save(tx_path))
+    assert (stats.files_written, stats.files_skipped) == (2, 0)
+    assert stats.bytes_written == os.path.getsize(acc_path) + os.path.getsize(tx_path)
+
+    tm.update("T1", amount=41)
+    stats = SaveStats()
+    stats.record(am.save(acc_path))
+    stats.record(tm.save(tx_path))
+    assert (stats.files_written, stats.files_skipped) == (1, 1)
+    assert not am.dirty and not tm.dirty
+
+    # a fresh load is clean; a different target path or force always writes
+    am2 = AccountManager()
+    am2.load(acc_path)
+    assert am2.save(acc_path) == 0
+    assert am2.save(str(tmp_path / "copy.csv")) > 0
+    assert am2.save(acc_path, force=True) > 0
+    # no temp files left behind by the atomic rename
+    assert sorted(os.listdir(tmp_path)) == ["accounts.csv", "copy.csv", "transactions.csv"]
+
+
+def test_flush_after_torn_tail_starts_a_new_line(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = Journal(str(path))
+    am, tm, bm = _managers(tmp_path, journal)
+    tm.create(Transaction("T1", "A1", "2025-01-01", 40, "expense", "Food"))
+    journal.flush()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"ds":"transactions","op":"cre')
+
+    journal = Journal(str(path))
+    am, tm, bm = _managers(tmp_path, journal)
+    tm.create(Transaction("T2", "A1", "2025-01-02", 5, "expense", "Tea"))
+    journal.flush()
+    tm.create(Transaction("T3", "A1", "2025-01-03", 6, "expense", "Tea"))
+    journal.flush()
+
+    am2, tm2, bm2 = _managers(tmp_path, Journal(str(path)))
+    assert [t.id for t in tm2.list_all()] == ["T1", "T2", "T3"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+def test_atomic_save_keeps_file_permissions(tmp_path):
+    import stat
+    path = str(tmp_path / "accounts.csv")
+    am = AccountManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 100))
+    am.save(path)
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
+    os.chmod(path, 0o640)
+    am.save(path, force=True)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="umask readable from /proc on Linux")
+def test_new_file_mode_leaves_the_umask_alone(tmp_path, monkeypatch):
+    import stat
+    import storage.csv_storage as csv_storage
+    umask = os.umask(0)
+    os.umask(umask)
+    monkeypatch.setattr(csv_storage, "_umask", None)
+    monkeypatch.setattr(os, "umask", lambda mask: pytest.fail("umask changed"))
+    path = str(tmp_path / "accounts.csv")
+    am = AccountManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 100))
+    am.save(path)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o666 & ~umask
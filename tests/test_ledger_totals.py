@@ -0,0 +1,75 @@
+import pytest
+
+from managers.ledger_totals import LedgerTotals
+from models.transaction import Transaction
+from models.budget import Budget
+from exceptions import ConsistencyError
+
+
+@pytest.fixture
+def totals(am, tm, bm):
+    return LedgerTotals(am, tm, bm, check=True)
+
+
+def test_totals_follow_every_change(am, tm, bm, totals):
+    tm.create(Transaction("T1", "A1", "2025-11-01", 200, "income", "Salary"))
+    am.adjust_balance("A1", 200)
+    tm.create(Transaction("T2", "A2", "2025-11-02", 50, "expense", "Food"))
+    am.adjust_balance("A2", -50)
+    bm.create(Budget("B1", "2025-11", "Food", 300))
+
+    snap = totals.snapshot()
+    assert snap["balance"] == {"HUF": 1200, "EUR": 450}
+    assert snap["income"] == {"HUF": 200}
+    assert snap["expense"] == {"EUR": 50}
+    assert snap["budget"] == {"HUF": 300}
+
+    # category flip moves the amount from income to expense
+    tm.update("T1", category="expense", amount=150)
+    am.adjust_balance("A1", -200 - 150)
+    bm.update("B1", limit_amount=100)
+    snap = totals.snapshot()
+    assert snap["income"] == {}
+    assert snap["expense"] == {"HUF": 150, "EUR": 50}
+    assert snap["balance"]["HUF"] == 850
+    assert snap["budget"] == {"HUF": 100}
+
+    # currency change moves the account and its transactions
+    am.update("A2", currency="USD")
+    am.delete("A1")
+    tm.delete("T2")
+    bm.delete("B1")
+    snap = totals.snapshot()
+    assert snap["balance"] == {"USD": 450}
+    assert snap["expense"] == {}
+    assert snap["budget"] == {}
+
+
+def test_totals_detect_drift(am, totals):
+    totals.snapshot()
+    # bypass the manager: nothing tells the totals about this
+    am.get("A1").balance = 5
+    assert totals.verify() == {("balance", "HUF"): (1000, 5)}
+    with pytest.raises(ConsistencyError):
+        totals.snapshot()
+
+
+def test_totals_rebuild_after_load(tmp_path, tm, totals):
+    tm.create(Transaction("T1", "A1", "2025-11-01", 200, "income", "Salary"))
+    path = str(tmp_path / "tx.csv")
+    tm.save(path)
+    tm.delete("T1")
+    assert totals.snapshot()["income"] == {}
+    tm.load(path)
+    assert totals.snapshot()["income"] == {"HUF": 200}
+
+
+def test_one_off_summaries_do_not_leave_listeners(monkeypatch, am, tm, bm, totals):
+    import io
+    import main
+    main._load_rich()
+    monkeypatch.setattr(main, "console", main.console.__class__(file=io.StringIO()))
+    listeners = len(tm._listeners)
+    for _ in range(3):
+        main.show_balance_summary(am, tm, bm)
+    assert len(tm._listeners) == listeners
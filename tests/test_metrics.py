@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import main
+import metrics
+import models.transaction
+import validators
+from managers.transaction_manager import TransactionManager
+from models.transaction import Transaction
+from exceptions import ValidationError
+
+
+@pytest.fixture
+def profiling():
+    collected = metrics.enable(app=main)
+    yield collected
+    metrics.disable()
+
+
+def test_enable_wraps_and_disable_restores():
+    create = TransactionManager.__dict__["create"]
+    parse_amount = validators.parse_amount
+    metrics.enable(app=main)
+    try:
+        assert TransactionManager.__dict__["create"] is not create
+        # names bound by `from validators import ...` are wrapped too
+        assert models.transaction.parse_amount is not parse_amount
+    finally:
+        metrics.disable()
+    assert TransactionManager.__dict__["create"] is create
+    assert models.transaction.parse_amount is parse_amount
+    assert validators.parse_amount is parse_amount
+    assert metrics.current is None
+
+
+def test_records_calls_rows_and_failures(profiling, tmp_path):
+    tm = TransactionManager()
+    for i in range(20):
+        tm.create(Transaction(f"T{i}", "A1", "2025-01-01", 10 + i, "expense", ""))
+    with pytest.raises(ValidationError):
+        tm.create(Transaction("T0", "A1", "2025-01-01", 10, "expense", ""))
+    path = str(tmp_path / "tx.csv")
+    tm.save(path)
+    TransactionManager().load(path)
+    with metrics.span("custom", rows=5):
+        pass
+
+    stats = profiling.stats
+    assert len(stats["TransactionManager.create"].durations) == 21
+    assert profiling.counters["TransactionManager.create failed"] == 1
+    assert stats["TransactionManager.save"].rows == 20
+    assert stats["TransactionManager.load"].rows == 20
+    assert len(stats["validators.parse_amount"].durations) >= 20
+    assert stats["custom"].rows == 5
+    report = profiling.report()
+    assert "p95 ms" in report and "TransactionManager.load" in report
+
+
+def test_percentiles_use_nearest_rank():
+    m = metrics.Metrics()
+    for ms in range(1, 101):
+        m.record("op", ms / 1000.0)
+    name, calls, total, p50, p95, top, rows, rate = m.rows()[0]
+    assert (calls, round(p50), round(p95), round(top)) == (100, 50, 95, 100)
+
+
+def test_profile_flag_reports_on_stderr(tmp_path, monkeypatch, capsys):
+    for name in ("DATA_DIR", "ACC_CSV", "TX_CSV", "BUD_CSV", "JOURNAL", "SNAPSHOT", "RATES_CSV"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    dump = str(tmp_path / "run.prof")
+    assert main.main(["--plain", "--data-dir", str(tmp_path), "--profile-dump", dump, "account", "list"]) == 0
+    out, err = capsys.readouterr()
+    assert out.startswith("ID\t")
+    assert "command account list" in err and "AccountManager.load" in err
+    assert os.path.getsize(dump) > 0
+    assert metrics.current is None
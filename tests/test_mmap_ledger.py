@@ -0,0 +1,70 @@
+import tracemalloc
+
+import pytest
+
+from managers.transaction_manager import TransactionManager
+from models.transaction import Transaction
+from exceptions import NotFoundError, StorageError
+
+
+def _manager():
+    tm = TransactionManager()
+    tm.create(Transaction("T1", "A1", "2025-11-15", 700, "expense", "Grocery"))
+    tm.create(Transaction("T2", "A1", "2025-10-01", 50, "Income", "Refund ✓"))
+    tm.create(Transaction("T3", "A2", "2025-11-02", 500, "expense", ""))
+    tm.create(Transaction("T0", "A2", "2025-11-02", 12.5, "expense", "Coffee"))
+    return tm
+
+
+def test_ledger_get_page_and_range(tmp_path):
+    tm = _manager()
+    path = str(tmp_path / "ledger.bin")
+    assert tm.save_ledger(path) > 0
+
+    with TransactionManager.open_ledger(path) as ledger:
+        assert len(ledger) == 4
+        for tx in tm.list_all():
+            assert ledger.get(tx.id).to_dict() == tx.to_dict()
+        assert "T3" in ledger and "T9" not in ledger
+        with pytest.raises(NotFoundError):
+            ledger.get("T9")
+
+        # (date, id) order, same as query()
+        assert [t.id for t in ledger.page(0, 10)] == [t.id for t in tm.query()]
+        assert [t.id for t in ledger.page(1, 2)] == ["T0", "T3"]
+        assert ledger.page(10, 5) == []
+        got = [t.id for t in ledger.range("2025-11-02", "2025-11-15")]
+        assert got == [t.id for t in tm.query(date_from="2025-11-02", date_to="2025-11-15")]
+        assert [t.id for t in ledger.range(date_to="2025-10-31")] == ["T2"]
+
+
+def test_empty_and_invalid_ledger_files(tmp_path):
+    path = str(tmp_path / "empty.bin")
+    TransactionManager().save_ledger(path)
+    with TransactionManager.open_ledger(path) as ledger:
+        assert len(ledger) == 0
+        assert list(ledger.range()) == []
+
+    bogus = tmp_path / "bogus.bin"
+    bogus.write_bytes(b"not a ledger at all, just some bytes padding it out past the header")
+    with pytest.raises(StorageError):
+        TransactionManager.open_ledger(str(bogus))
+
+
+def test_open_does_not_read_the_whole_ledger(tmp_path):
+    tm = TransactionManager()
+    for i in range(20000):
+        tm.create(Transaction(f"T{i:05d}", f"A{i % 7}", "2025-01-01", 10.0, "expense", "x" * 40))
+    path = str(tmp_path / "big.bin")
+    tm.save_ledger(path)
+
+    tracemalloc.start()
+    try:
+        with TransactionManager.open_ledger(path) as ledger:
+            assert ledger.get("T12345").account_id == "A4"
+            assert len(ledger.page(500, 10)) == 10
+            _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # a full load holds well over 100 bytes per row; opening holds a few KB
+    assert peak < 64 * 1024
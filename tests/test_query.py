@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from managers.transaction_manager import TransactionManager
+from managers.query import compile_query, plan
+from models.transaction import Transaction
+from exceptions import ValidationError
+
+
+def _ledger():
+    tm = TransactionManager()
+    tm.create(Transaction("T1", "11", "2025-10-30", 900, "expense", "Rent"))
+    tm.create(Transaction("T2", "11", "2025-11-02", 620, "expense", "Grocery run"))
+    tm.create(Transaction("T3", "11", "2025-11-05", 40, "expense", "grocery"))
+    tm.create(Transaction("T4", "12", "2025-11-06", 700, "expense", "Grocery"))
+    tm.create(Transaction("T5", "11", "2025-11-09", 2500, "income", "Salary"))
+    tm.create(Transaction("T6", "11", "2025-11-20", 510, "expense", "GROCERY"))
+    return tm
+
+
+def _ids(txs):
+    return [t.id for t in txs]
+
+
+def test_find_applies_every_term():
+    tm = _ledger()
+    assert _ids(tm.find("account=11 category=expense date>=2025-11-01 amount>500 desc~grocery")) == ["T2", "T6"]
+    assert _ids(tm.find("category=EXPENSE date<2025-11-05")) == ["T1", "T2"]
+    assert _ids(tm.find("account!=11")) == ["T4"]
+    assert _ids(tm.find('desc="grocery run"')) == ["T2"]
+    assert _ids(tm.find("id=T3 amount<=40")) == ["T3"]
+    assert _ids(tm.find("id=T3 amount>40")) == []
+    assert _ids(tm.find("")) == ["T1", "T2", "T3", "T4", "T5", "T6"]
+    # dates without zero padding mean the same day
+    assert _ids(tm.find("date>=2025-11-5 date<2025-11-9")) == ["T3", "T4"]
+    assert _ids(tm.find("account=11 date=2025-11-5")) == ["T3"]
+
+
+def test_order_by_and_limit():
+    tm = _ledger()
+    assert _ids(tm.find("category=expense order by amount desc limit 2")) == ["T1", "T4"]
+    assert _ids(tm.find("order by amount limit 3")) == ["T3", "T6", "T2"]
+    assert _ids(tm.find("account=11 order by date desc")) == ["T6", "T5", "T3", "T2", "T1"]
+    assert _ids(tm.find("account=11 limit 2")) == ["T1", "T2"]
+    assert _ids(tm.find("desc~grocery order by desc limit 1")) == ["T3"]
+    assert _ids(tm.find("desc~grocery order by desc desc limit 1")) == ["T2"]
+
+
+def test_planner_picks_cheapest_access_path():
+    tm = TransactionManager()
+    for i in range(200):
+        tm.create(Transaction(f"T{i:03}", "A1" if i % 50 else "A2", f"2025-{1 + i % 12:02}-10",
+                              i + 1, "expense", ""))
+    assert plan(tm, compile_query("id=T007 account=A1")).access.startswith("id lookup")
+    assert plan(tm, compile_query("account=A2 date>=2025-01-01")).access == "account index A2"
+    p = plan(tm, compile_query("account=A1 date=2025-03-10"))
+    assert p.access.startswith("date range") and p.estimate == 17
+    assert [repr(t) for t in p.residual] == ["account=A1"]
+    assert plan(tm, compile_query("amount>5")).access == "full scan"
+    assert "heap top-k" in tm.explain("amount>5 order by amount desc limit 3")
+
+
+def test_results_match_brute_force():
+    rng = random.Random(7)
+    tm = TransactionManager()
+    for i in range(500):
+        tm.create(Transaction(f"T{i}", rng.choice("ABC"), f"2025-{rng.randint(1, 12):02}-{rng.randint(1, 28):02}",
+                              rng.randint(1, 1000), rng.choice(["income", "expense"]), rng.choice(["x", "Food", ""])))
+    txs = sorted(tm.list_all(), key=lambda t: (t.date, t.id))
+    cases = [
+        ("account=B date>2025-03-15 date<=2025-07-01",
+         lambda t: t.account_id == "B" and "2025-03-15" < t.date <= "2025-07-01"),
+        ("category=income amount>=500 desc~fo",
+         lambda t: t.category == "income" and t.amount >= 500 and "fo" in t.description.lower()),
+        ("date=2025-05-05", lambda t: t.date == "2025-05-05"),
+        ("date>2025-12-31", lambda t: False),
+    ]
+    for text, pred in cases:
+        assert _ids(tm.find(text)) == [t.id for t in txs if pred(t)], text
+    top = sorted((t for t in txs if t.account_id == "C"), key=lambda t: (t.amount, t.date, t.id), reverse=True)[:7]
+    assert _ids(tm.find("account=C order by amount desc limit 7")) == _ids(top)
+
+
+@pytest.mark.parametrize("text", [
+    "amount>lots", "colour=red", "date>=2025-13-01", "amount~5", "order amount", "limit", "limit x",
+    "account", 'desc="unterminated',
+])
+def test_bad_queries_raise_validation_error(text):
+    with pytest.raises(ValidationError):
+        compile_query(text)
@@ -0,0 +1,112 @@
+import pytest
+
+import main
+from managers.account_manager import AccountManager
+from managers.reconcile import LedgerOverlay, fix, reconcile, reconcile_manager, without_duplicates
+from models.account import BankAccount
+from models.transaction import Transaction
+from storage.journal import Journal
+from exceptions import StorageError
+
+
+@pytest.fixture
+def ledger(am, tm):
+    am.create(BankAccount("A3", "Old", "EUR", 0))
+    for tx in (Transaction("T1", "A1", "2025-11-15", 700, "expense", "Grocery"),
+               Transaction("T2", "A1", "2025-11-20", 50, "Income", "Refund"),
+               Transaction("T3", "A2", "2025-11-02", 100, "expense", "Rent"),
+               Transaction("T4", "A3", "2025-11-03", 20, "income", "Interest")):
+        tm.create(tx)
+        am.adjust_balance(tx.account_id, tx.amount if tx.category.lower() == "income" else -tx.amount)
+    return am, tm
+
+
+def _rows(tm):
+    return [t.to_dict() for t in tm.list_all()]
+
+
+def test_consistent_ledger_is_clean(ledger):
+    am, tm = ledger
+    report = reconcile(am, [_rows(tm)])
+    assert report.clean and report.rows == 4
+    assert [(c.account.id, c.expected, c.transactions) for c in report.accounts] == [
+        ("A1", 350, 2), ("A2", 400, 1), ("A3", 20, 1)]
+
+
+def test_reports_drift_orphans_and_duplicates(ledger):
+    am, tm = ledger
+    am.update("A2", balance=999)  # "Set new balance" without a transaction
+    am.delete("A3")
+    rows = _rows(tm)
+    rows.insert(1, dict(rows[0], amount="1"))
+    report = reconcile(am, [rows[:2], rows[2:]])
+    assert [c.account.id for c in report.drifted] == ["A2"]
+    assert report.drifted[0].drift == pytest.approx(599)
+    assert report.accounts[0].expected == 350  # the second T1 is ignored
+    assert report.orphans == {"A3": ["T4"]}
+    assert report.duplicates == {"T1": 1}
+    assert not report.clean
+    assert [r["amount"] for r in without_duplicates([rows])] == [700, 50, 100, 20]
+
+    done = fix(reconcile_manager(am, tm), am, tm, drop_orphans=True)
+    assert done == {"baselined": 0, "rebalanced": 1, "orphans_dropped": 1}
+    assert am.get("A2").balance == 400
+    assert "T4" not in tm
+    assert reconcile_manager(am, tm).clean
+
+
+def test_accounts_without_opening_balance_are_baselined(tmp_path, tm):
+    path = tmp_path / "accounts.csv"
+    path.write_text("id,name,account_type,currency,balance\nA1,Wallet,cash,HUF,350\n", encoding="utf-8")
+    am = AccountManager()
+    am.load(str(path))
+    tm.create(Transaction("T1", "A1", "2025-11-15", 650, "expense", ""))
+    report = reconcile_manager(am, tm)
+    assert [c.account.id for c in report.unbaselined] == ["A1"]
+    assert report.accounts[0].drift is None
+    fix(report, am)
+    assert am.get("A1").opening_balance == 1000
+    assert reconcile_manager(am, tm).clean
+
+
+def test_overlay_applies_journal_records(tmp_path, ledger):
+    am, tm = ledger
+    saved = _rows(tm)
+    journal = Journal(str(tmp_path / "journal.jsonl"))
+    journal.attach("transactions", tm)
+    tm.delete("T3")
+    tm.update("T1", amount=600)
+    journal.flush()
+    overlay = LedgerOverlay()
+    journal.replay({"transactions": overlay})
+    merged = [r for rows in overlay.apply([saved]) for r in rows]
+    assert sorted((r["id"], r["amount"]) for r in merged) == [("T1", 600), ("T2", 50), ("T4", 20)]
+
+
+def test_unreadable_rows_raise_storage_error(ledger):
+    am, _ = ledger
+    with pytest.raises(StorageError):
+        reconcile(am, [[{"id": "T1", "account_id": "A1", "amount": "abc", "category": "expense"}]])
+
+
+def test_reconcile_command_fixes_ledger(tmp_path, monkeypatch, capsys, ledger):
+    for name in ("DATA_DIR", "ACC_CSV", "TX_CSV", "BUD_CSV", "JOURNAL", "SNAPSHOT", "RATES_CSV"):
+        monkeypatch.setattr(main, name, getattr(main, name))
+    am, tm = ledger
+    am.update("A1", balance=400)
+    am.save(str(tmp_path / "accounts.csv"))
+    tm.save(str(tmp_path / "transactions.csv"))
+    with open(tmp_path / "transactions.csv", "a", encoding="utf-8") as f:
+        f.write("T2,A1,2025-11-20,50.0,Income,Refund\n")
+    base = ["--plain", "--data-dir", str(tmp_path), "reconcile"]
+
+    assert main.main(base) == 2
+    out, err = capsys.readouterr()
+    assert out.splitlines()[1].split("\t") == ["A1", "Wallet", "400.00 HUF", "350.00", "+50.00", "2"]
+    assert "appears 2 times" in err
+
+    assert main.main(base + ["--fix"]) == 0
+    assert "corrected 1 balance(s)" in capsys.readouterr().out
+    assert main.main(base) == 0
+    assert main.main(["--plain", "--data-dir", str(tmp_path), "account", "list"]) == 0
+    assert "350.00 HUF" in capsys.readouterr().out
@@ -0,0 +1,108 @@
+import csv
+import time
+
+from managers.transaction_manager import TransactionManager
+from models.transaction import Transaction
+
+
+def _write_ledger(path, n):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "account_id", "date", "amount", "category", "description"])
+        for i in range(n):
+            writer.writerow([f"T{i}", "A1", "2025-01-01", 10.0, "expense", "Row"])
+
+
+def _best_load_time(path, repeat=3):
+    best = None
+    for _ in range(repeat):
+        tm = TransactionManager()
+        start = time.perf_counter()
+        tm.load(str(path))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, tm
+
+
+def test_transaction_load_scales_linearly(tmp_path):
+    small, large = 4000, 16000
+    _write_ledger(tmp_path / "small.csv", small)
+    _write_ledger(tmp_path / "large.csv", large)
+
+    t_small, _ = _best_load_time(tmp_path / "small.csv")
+    t_large, tm = _best_load_time(tmp_path / "large.csv")
+
+    assert len(tm.list_all()) == large
+    # 4x the rows: linear is ~4x, quadratic would be ~16x
+    assert t_large / t_small < 8
+
+
+def test_transaction_index_keeps_insertion_order():
+    tm = TransactionManager()
+    for i in range(5):
+        tm.create(Transaction(f"T{i}", "A1", "2025-01-01", 10, "income", ""))
+    tm.delete("T2")
+    tm.create(Transaction("T2", "A1", "2025-01-02", 5, "expense", ""))
+
+    assert [t.id for t in tm.list_all()] == ["T0", "T1", "T3", "T4", "T2"]
+    assert tm.get("T3").id == "T3"
+
+
+def _peak_stream_memory(path):
+    import tracemalloc
+    tracemalloc.start()
+    count = 0
+    for chunk in TransactionManager.iter_transactions(str(path), chunk_size=1000):
+        count += len(chunk)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak
+
+
+def test_streaming_ingest_memory_is_flat(tmp_path):
+    _write_ledger(tmp_path / "small.csv", 2000)
+    _write_ledger(tmp_path / "large.csv", 16000)
+
+    n_small, peak_small = _peak_stream_memory(tmp_path / "small.csv")
+    n_large, peak_large = _peak_stream_memory(tmp_path / "large.csv")
+
+    assert (n_small, n_large) == (2000, 16000)
+    # 8x the rows, but only one chunk is alive at a time
+    assert peak_large < peak_small * 2
+
+
+def _page_walk_time(tm, pages=200):
+    start = time.perf_counter()
+    after = None
+    for _ in range(pages):
+        page = tm.page_after(after, 50)
+        after = (page[-1].date, page[-1].id)
+    return time.perf_counter() - start
+
+
+def test_page_latency_does_not_grow_with_ledger():
+    small, large = TransactionManager(), TransactionManager()
+    small.create_many(Transaction(f"T{i:06d}", "A1", "2025-01-01", 10.0, "expense", "") for i in range(12000))
+    large.create_many(Transaction(f"T{i:06d}", "A1", "2025-01-01", 10.0, "expense", "") for i in range(120000))
+
+    t_small = min(_page_walk_time(small) for _ in range(3))
+    t_large = min(_page_walk_time(large) for _ in range(3))
+    # 10x the rows; only the O(log n) bisect grows
+    assert t_large / t_small < 3
+
+
+def test_bench_suite_runs_and_flags_regressions():
+    from benchmarks.bench_suite import compare, run_suite
+
+    results = run_suite([200], repeat=1)
+    ops = {key.split("@")[0] for key in results}
+    for name in ("accounts", "transactions", "budgets"):
+        assert {f"{name}.{op}" for op in ("create", "get", "list", "save", "load", "delete")} <= ops
+    assert "summary.show_balance_summary" in ops
+    assert results["transactions.create@200"]["ops"] == 200
+
+    baseline = {"transactions.load@1": {"seconds": 0.010, "ops": 1}, "budgets.get@1": {"seconds": 0.010, "ops": 10}}
+    slower = {"transactions.load@1": {"seconds": 0.020, "ops": 1},
+              "budgets.get@1": {"seconds": 0.011, "ops": 10, "timed_out": True}}
+    assert len(compare(slower, baseline, 0.25)) == 2
+    assert compare(baseline, baseline, 0.25) == []
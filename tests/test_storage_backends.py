@@ -0,0 +1,160 @@
+import shutil
+
+import pytest
+
+from managers.account_manager import AccountManager
+from managers.transaction_manager import TransactionManager
+from managers.budget_manager import BudgetManager
+from models.account import CashAccount, BankAccount
+from models.transaction import Transaction
+from models.budget import Budget
+from storage.csv_storage import CsvBackend
+from storage.sqlite_storage import SqliteBackend, migrate_csv_to_sqlite
+from storage.snapshot import open_snapshot, write_snapshot
+
+
+def _populate():
+    am, tm, bm = AccountManager(), TransactionManager(), BudgetManager()
+    am.create(CashAccount("A1", "Wallet", "HUF", 1000))
+    am.create(BankAccount("A2", "Main", "EUR", 500))
+    tm.create(Transaction("T1", "A1", "2025-11-15", 700, "expense", "Grocery"))
+    tm.create(Transaction("T2", "A1", "2025-10-01", 50, "Income", "Refund"))
+    tm.create(Transaction("T3", "A2", "2025-11-02", 500, "expense", "Rent"))
+    bm.create(Budget("B1", "2025-11", "Grocery", 900))
+    return am, tm, bm
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "csv":
+        yield CsvBackend(str(tmp_path))
+    else:
+        db = SqliteBackend(str(tmp_path / "ledger.db"))
+        yield db
+        db.close()
+
+
+def test_backend_round_trip_and_pushdown(backend):
+    am, tm, bm = _populate()
+    for m in (am, tm, bm):
+        assert m.save_to(backend) > 0
+        assert m.save_to(backend) is None  # unchanged: skipped
+
+    am2, tm2, bm2 = AccountManager(), TransactionManager(), BudgetManager()
+    am2.load_from(backend)
+    tm2.load_from(backend)
+    bm2.load_from(backend)
+    assert [a.to_dict() for a in am2.list_all()] == [a.to_dict() for a in am.list_all()]
+    assert [t.to_dict() for t in tm2.list_all()] == [t.to_dict() for t in tm.list_all()]
+    assert bm2.get("B1").limit_amount == 900
+
+    got = TransactionManager.query_from(backend, account_id="A1", date_from="2025-11-01")
+    assert [t.id for t in got] == ["T1"]
+    got = TransactionManager.query_from(backend, category="income")
+    assert [t.id for t in got] == ["T2"]
+    assert backend.transaction_totals() == {
+        ("A1", "expense"): 700, ("A1", "income"): 50, ("A2", "expense"): 500,
+    }
+
+
+def test_sqlite_filters_use_indexes(tmp_path):
+    db = SqliteBackend(str(tmp_path / "ledger.db"))
+    try:
+        assert "idx_transactions_account" in db.explain_query(account_id="A1")
+        assert "idx_transactions_date" in db.explain_query(date_from="2025-01-01")
+        assert "idx_transactions_category" in db.explain_query(category="expense")
+    finally:
+        db.close()
+
+
+def test_sqlite_save_reports_rows_written(tmp_path):
+    db = SqliteBackend(str(tmp_path / "ledger.db"))
+    try:
+        am, tm, bm = _populate()
+        assert tm.save_to(db) == 3
+        assert BudgetManager().save_to(db, force=True) == 0  # empty, but written
+        assert db.exists("budgets")
+    finally:
+        db.close()
+
+
+def test_migrate_csv_to_sqlite(tmp_path):
+    am, tm, bm = _populate()
+    csv_dir = tmp_path / "csv"
+    am.save(str(csv_dir / "accounts.csv"))
+    tm.save(str(csv_dir / "transactions.csv"))
+    bm.save(str(csv_dir / "budgets.csv"))
+
+    db_path = str(tmp_path / "ledger.db")
+    counts = migrate_csv_to_sqlite(str(csv_dir), db_path)
+    assert counts == {"accounts": 2, "budgets": 1, "transactions": 3}
+
+    db = SqliteBackend(db_path)
+    tm2 = TransactionManager()
+    tm2.load_from(db)
+    db.close()
+    assert [t.id for t in tm2.list_all()] == ["T1", "T2", "T3"]
+
+
+def test_snapshot_round_trip_and_staleness(tmp_path):
+    from managers.account_manager import ACCOUNT_FIELDS
+    from managers.transaction_manager import TRANSACTION_FIELDS
+    from managers.budget_manager import BUDGET_FIELDS
+
+    am, tm, bm = _populate()
+    csv = CsvBackend(str(tmp_path))
+    for m in (am, tm, bm):
+        m.save_to(csv)
+    sources = {ds: csv.path(ds) for ds in ("accounts", "transactions", "budgets")}
+    snap_path = str(tmp_path / "snapshot.bin")
+    write_snapshot(snap_path, {
+        "accounts": (ACCOUNT_FIELDS, (a.to_dict() for a in am.list_all())),
+        "transactions": (TRANSACTION_FIELDS, (t.to_dict() for t in tm.list_all())),
+        "budgets": (BUDGET_FIELDS, (b.to_dict() for b in bm.list_all())),
+    }, sources)
+
+    snap = open_snapshot(snap_path, sources)
+    assert snap is not None
+    am2, tm2 = AccountManager(), TransactionManager()
+    am2.load_from(snap, trusted=True)
+    tm2.load_from(snap, trusted=True)
+    assert [t.to_dict() for t in tm2.list_all()] == [t.to_dict() for t in tm.list_all()]
+    assert tm2.query(account_id="A1")[0].id == "T2"
+    # loaded from a verified mirror, so the CSV counts as saved
+    assert not tm2.is_dirty(sources["transactions"])
+
+    # a flipped payload byte fails the checksum
+    data = bytearray(open(snap_path, "rb").read())
+    data[-5] ^= 0xFF
+    bad = str(tmp_path / "bad.bin")
+    with open(bad, "wb") as f:
+        f.write(data)
+    assert open_snapshot(bad, sources) is None
+
+    # editing a CSV behind the snapshot's back makes it stale
+    with open(sources["budgets"], "a", encoding="utf-8") as f:
+        f.write("B2,2025-12,Rent,100\n")
+    assert open_snapshot(snap_path, sources) is None
+    assert open_snapshot(str(tmp_path / "missing.bin"), sources) is None
+
+
+def test_sqlite_adds_opening_balance_to_old_databases(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE accounts (id TEXT PRIMARY KEY, name TEXT NOT NULL, account_type TEXT NOT NULL, "
+                 "currency TEXT NOT NULL, balance REAL NOT NULL)")
+    conn.execute("INSERT INTO accounts VALUES ('A1', 'Wallet', 'cash', 'HUF', 300)")
+    conn.commit()
+    conn.close()
+    db = SqliteBackend(path)
+    try:
+        am = AccountManager()
+        am.load_from(db)
+        assert am.get("A1").opening_balance is None
+        am.update("A1", opening_balance=1000)
+        am.save_to(db, force=True)
+        am.load_from(db)
+        assert am.get("A1").opening_balance == 1000
+    finally:
+        db.close()
@@ -53,3 +53,35 @@ def test_account_save_load(tmp_path):
     am2.load(str(p))
     assert len(am2.list_all()) == 1
     assert am2.list_all()[0].balance == 100.0
+
+def test_bulk_date_check_matches_strptime():
+    from validators import ymd_ordinal, parse_date_ymd
+    from datetime import datetime
+    assert ymd_ordinal("2025-01-05") == datetime(2025, 1, 5).toordinal()
+    # non-padded form is still accepted, like strptime does
+    assert ymd_ordinal("2025-1-5") == datetime(2025, 1, 5).toordinal()
+    assert ymd_ordinal("2025-02-30") is None
+    assert ymd_ordinal(None) is None
+    with pytest.raises(ValidationError, match="Date must be in YYYY-MM-DD format"):
+        parse_date_ymd("2025-13-01")
+
+def test_corrupt_file_messages_and_trusted_load(tmp_path):
+    from managers.transaction_manager import TransactionManager
+    from managers.budget_manager import BudgetManager
+    p = tmp_path / "tx.csv"
+    p.write_text("id,account_id,date,amount,category,description\n"
+                 "T1,A1,2025-01-32,10,income,x\n", encoding="utf-8")
+    with pytest.raises(ValidationError, match="Date must be in YYYY-MM-DD format"):
+        TransactionManager().load(str(p))
+
+    b = tmp_path / "b.csv"
+    b.write_text("id,month,category,limit_amount\nB1,2025-13,Food,10\n", encoding="utf-8")
+    with pytest.raises(ValidationError, match="Month must be in YYYY-MM format"):
+        BudgetManager().load(str(b))
+
+    p.write_text("id,account_id,date,amount,category,description\n"
+                 "T1,A1,2025-01-05,10.5,income,x\n", encoding="utf-8")
+    tm = TransactionManager()
+    tm.load(str(p), trusted=True)
+    assert tm.get("T1").amount == 10.5
+    assert tm.get("T1").to_dict() == TransactionManager.iter_transactions(str(p)).__next__()[0].to_dict()
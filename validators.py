@@ -1,6 +1,8 @@
 # validators.py
 import re
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional
 from exceptions import ValidationError
 
 def validate_name(name: str, field_name="Name", max_len=15):
@@ -76,3 +78,74 @@ def validate_category_choice(choice_str: str):
     if s in ("2", "expense"):
         return "expense"
     raise ValidationError("Category must be '1' (income) or '2' (expense).")
+
+
+# Bulk-load checks: plain values as read from CSV, messages match the managers'.
+# Ledgers repeat the same few thousand dates, so each distinct string is parsed
+# once and memoized; the common fixed-width form skips strptime entirely.
+@lru_cache(maxsize=65536)
+def _ymd_ordinal(s: str) -> Optional[int]:
+    if len(s) == 10 and s[4] == "-" and s[7] == "-" and s.isascii():
+        y, m, d = s[:4], s[5:7], s[8:]
+        if y.isdigit() and m.isdigit() and d.isdigit():
+            try:
+                return date(int(y), int(m), int(d)).toordinal()
+            except ValueError:
+                return None
+    # strptime also accepts forms like 2025-1-5; keep accepting them
+    try:
+        return datetime.strptime(s, "%Y-%m-%d").toordinal()
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=4096)
+def _is_ym(s: str) -> bool:
+    if len(s) == 7 and s[4] == "-" and s.isascii() and s[:4].isdigit() and s[5:].isdigit():
+        return 1 <= int(s[:4]) and 1 <= int(s[5:]) <= 12
+    try:
+        datetime.strptime(s, "%Y-%m")
+    except ValueError:
+        return False
+    return True
+
+def ymd_ordinal(date_str) -> Optional[int]:
+    """Proleptic ordinal of a YYYY-MM-DD string, or None if it is not a valid date."""
+    if not isinstance(date_str, str):
+        return None
+    return _ymd_ordinal(date_str)
+
+@lru_cache(maxsize=65536)
+def ordinal_ymd(ordinal: int) -> str:
+    """YYYY-MM-DD string of a proleptic ordinal; cached, so equal dates share one string."""
+    return date.fromordinal(ordinal).isoformat()
+
+def is_valid_ym(month_str) -> bool:
+    return isinstance(month_str, str) and _is_ym(month_str)
+
+def parse_amount(amount):
+    try:
+        a = float(amount)
+    except Exception:
+        raise ValidationError("Amount must be a number")
+    if a <= 0:
+        raise ValidationError("Amount must be positive")
+    return a
+
+def parse_date_ymd(date_str: str):
+    if ymd_ordinal(date_str) is None:
+        raise ValidationError("Date must be in YYYY-MM-DD format")
+    return date_str
+
+def parse_month_ym(month_str: str):
+    if not is_valid_ym(month_str):
+        raise ValidationError("Month must be in YYYY-MM format")
+    return month_str
+
+def parse_limit(limit):
+    try:
+        l = float(limit)
+    except Exception:
+        raise ValidationError("Limit must be a number")
+    if l <= 0:
+        raise ValidationError("Limit must be positive")
+    return l